@@ -1,10 +1,14 @@
-from querydata import QueryData
+from gaugedesign import GaugeDesignEngine, GaugeDesignError, ToleranceGradeError, GAUGE_DIMENSION_SUFFIXES, fmt, parseNumber
+from resultcache import CachedDesignEngine, ResultCache, cachePathFromEnv
 from buildtime import buildTime
+from worksheet import POLL_INTERVAL_MS, WorksheetFrame
 
+import queue
+import threading
 import tkinter as tk
-from decimal import Decimal, getcontext, InvalidOperation
-
-getcontext().prec = 10
+from tkinter import ttk
+from decimal import Decimal
+from typing import Callable
 
 class Application(tk.Frame):
     def __init__(self, master=None):
@@ -12,11 +16,29 @@ class Application(tk.Frame):
         self.master = master
         self.pack()
 
-        self.queryData = QueryData()
+        self.engine = GaugeDesignEngine()
+        cachePath = cachePathFromEnv()
+        if cachePath is not None:
+            # 界面每次只算一个，结果立即写入磁盘缓存
+            self.engine = CachedDesignEngine(self.engine, ResultCache(cachePath, writeBatchSize=1))
+        self.queryData = self.engine.queryData
+        # 输入变化时合并到空闲时再计算一次，见 scheduleUpdateCalc
+        self._updateCalcPending = None
+        # 输出框是否已经清空，已清空时不再重复清空
+        self._goNoGoGaugeBlank = True
+        self._settingPlugGaugeBlank = True
+        # 见 backgroundEngine
+        self._backgroundEngine = None
         self.createWidgets()
         self.onUpdateCalc()
 
     def createWidgets(self):
+        self.menuBarUi()
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        # 单个零件页
+        self.singlePage = tk.Frame(self.notebook)
+        self.notebook.add(self.singlePage, text='单个零件')
         self.userInputBoxUi().grid(row=0, column=0, sticky=tk.NSEW)
         self.goGaugeBoxUi().grid(row=0, column=1, sticky=tk.NSEW)
         self.noGoGaugeBoxUi().grid(row=0, column=2, sticky=tk.NSEW)
@@ -24,16 +46,36 @@ class Application(tk.Frame):
         self.goWearSettingPlugGaugeBoxUi().grid(row=1, column=1, sticky=tk.NSEW)
         self.noGoGoSettingPlugGaugeBoxUi().grid(row=1, column=2, sticky=tk.NSEW)
         self.infoBoxUi().grid(row=2, column=0, columnspan=3, sticky=tk.NSEW)
-        tk.Label(self, text=f'{buildTime}').grid(row=3, column=0, columnspan=3, sticky=tk.W)
-        tk.Label(self, text='IYATT-yx iyatt@iyatt.com').grid(row=4, column=0, columnspan=3, sticky=tk.W)
-        tk.Label(self, text='计算依据《GB/T 1957-2006 光滑极限量规 技术条件》').grid(row=5, column=0, columnspan=3, sticky=tk.W)
+        tk.Label(self.singlePage, text=f'{buildTime}').grid(row=3, column=0, columnspan=3, sticky=tk.W)
+        tk.Label(self.singlePage, text='IYATT-yx iyatt@iyatt.com').grid(row=4, column=0, columnspan=3, sticky=tk.W)
+        tk.Label(self.singlePage, text='计算依据《GB/T 1957-2006 光滑极限量规 技术条件》').grid(row=5, column=0, columnspan=3, sticky=tk.W)
+        # 零件表页
+        self.worksheet = WorksheetFrame(self.notebook, self.backgroundEngine, onOpenRow=self.openPart)
+        self.notebook.add(self.worksheet, text='零件表')
 
 
+    def menuBarUi(self):
+        """
+        菜单栏：导出等不常用的操作放在菜单中，不占用固定大小窗口中的输入框
+        """
+        menuBar = tk.Menu(self.master)
+        self.exportMenu = tk.Menu(menuBar, tearoff=False)
+        self.exportMenu.add_command(label='按尺寸导出…', command=self.exportSizeSweep)
+        self.exportMenu.add_command(label='按公差等级导出…', command=self.exportGradeSweep)
+        self.exportMenu.add_separator()
+        self.exportMenu.add_command(label='导出量规数据表…', command=self.exportDataSheet)
+        menuBar.add_cascade(label='导出', menu=self.exportMenu)
+        self.toolsMenu = tk.Menu(menuBar, tearoff=False)
+        self.toolsMenu.add_command(label='量规合并分析…', command=self.analyzeGaugeSharing)
+        menuBar.add_cascade(label='工具', menu=self.toolsMenu)
+        self.winfo_toplevel().config(menu=menuBar)
+        return menuBar
+
     def infoBoxUi(self):
         """
         信息
         """
-        infoBox = tk.LabelFrame(self, text='信息', padx=10, pady=10)
+        infoBox = tk.LabelFrame(self.singlePage, text='信息', padx=10, pady=10)
 
         self.infoVar = tk.StringVar()
         tk.Entry(infoBox, textvariable=self.infoVar, state='readonly').pack(fill=tk.BOTH)
@@ -44,30 +86,36 @@ class Application(tk.Frame):
         """
         用户输入框 - 设计参数
         """
-        userInputBox = tk.LabelFrame(self, text='设计参数', padx=10, pady=10)
+        userInputBox = tk.LabelFrame(self.singlePage, text='设计参数', padx=10, pady=10)
         
         self.feature = tk.StringVar(value='shaft')
-        tk.Radiobutton(userInputBox, text='轴尺寸', variable=self.feature, value='shaft', command=self.onUpdateCalc).grid(row=0, column=0, sticky=tk.NSEW)
-        tk.Radiobutton(userInputBox, text='孔尺寸', variable=self.feature, value='hole', command=self.onUpdateCalc).grid(row=0, column=1, sticky=tk.NSEW)
+        tk.Radiobutton(userInputBox, text='轴尺寸', variable=self.feature, value='shaft', command=self.scheduleUpdateCalc).grid(row=0, column=0, sticky=tk.NSEW)
+        tk.Radiobutton(userInputBox, text='孔尺寸', variable=self.feature, value='hole', command=self.scheduleUpdateCalc).grid(row=0, column=1, sticky=tk.NSEW)
 
         tk.Label(userInputBox, text='名义尺寸：').grid(row=1, column=0, sticky=tk.W)
-        tk.Label(userInputBox, text='上偏差：').grid(row=2, column=0, sticky=tk.W)
-        tk.Label(userInputBox, text='下偏差：').grid(row=3, column=0, sticky=tk.W)
-        tk.Label(userInputBox, text='公差等级：').grid(row=4, column=0, sticky=tk.W)
+        tk.Label(userInputBox, text='公差带代号：').grid(row=2, column=0, sticky=tk.W)
+        tk.Label(userInputBox, text='上偏差：').grid(row=3, column=0, sticky=tk.W)
+        tk.Label(userInputBox, text='下偏差：').grid(row=4, column=0, sticky=tk.W)
+        tk.Label(userInputBox, text='公差等级：').grid(row=5, column=0, sticky=tk.W)
 
         self.norminalSizeVar = tk.StringVar(value="20")
+        # 公差带代号（如 h7、Ø20H8），不为空时由代号查得零件特征和上下偏差
+        self.fitCodeVar = tk.StringVar()
         self.upperDeviationVar = tk.StringVar(value="0.01")
         self.lowerDeviationVar = tk.StringVar(value="-0.01")
         self.internationalToleranceGradeVar = tk.StringVar()
 
-        self.norminalSizeVar.trace_add('write', self.onUpdateCalc)
-        self.upperDeviationVar.trace_add('write', self.onUpdateCalc)
-        self.lowerDeviationVar.trace_add('write', self.onUpdateCalc)
+        self.norminalSizeVar.trace_add('write', self.scheduleUpdateCalc)
+        self.fitCodeVar.trace_add('write', self.scheduleUpdateCalc)
+        self.upperDeviationVar.trace_add('write', self.scheduleUpdateCalc)
+        self.lowerDeviationVar.trace_add('write', self.scheduleUpdateCalc)
 
         tk.Entry(userInputBox, textvariable=self.norminalSizeVar).grid(row=1, column=1, sticky=tk.NSEW)
-        tk.Entry(userInputBox, textvariable=self.upperDeviationVar).grid(row=2, column=1, sticky=tk.NSEW)
-        tk.Entry(userInputBox, textvariable=self.lowerDeviationVar).grid(row=3, column=1, sticky=tk.NSEW)
-        tk.Entry(userInputBox, textvariable=self.internationalToleranceGradeVar, state='readonly').grid(row=4, column=1, sticky=tk.NSEW)
+        tk.Entry(userInputBox, textvariable=self.fitCodeVar).grid(row=2, column=1, sticky=tk.NSEW)
+        tk.Entry(userInputBox, textvariable=self.upperDeviationVar).grid(row=3, column=1, sticky=tk.NSEW)
+        tk.Entry(userInputBox, textvariable=self.lowerDeviationVar).grid(row=4, column=1, sticky=tk.NSEW)
+        tk.Entry(userInputBox, textvariable=self.internationalToleranceGradeVar, state='readonly').grid(row=5, column=1, sticky=tk.NSEW)
+
 
         return userInputBox
     
@@ -81,156 +129,295 @@ class Application(tk.Frame):
         Returns:
             Decimal | None | False: None 则带表输入空，可不作处理； False 则表示输入值不是数字； Decimal 则转为浮点数的结果
         """
-        val = number.get().strip()
-        if val in ('', '.', '-', '-.', '0.', '-0.'):
-            return None
-        try:
-            return Decimal(val)
-        except InvalidOperation:
-            return False
+        return parseNumber(number.get())
+
+    def scheduleUpdateCalc(self, *args):
+        """
+        输入变化后在 Tk 空闲时更新计算，连续多次输入（含程序设置）只计算一次
+        """
+        if self._updateCalcPending is None:
+            self._updateCalcPending = self.after_idle(self._runScheduledUpdateCalc)
+
+    def _runScheduledUpdateCalc(self):
+        self._updateCalcPending = None
+        self.onUpdateCalc()
 
-    
     def onUpdateCalc(self, *args):
         """
         更新计算
         """
-        errors = []
-
-        # 验证名义尺寸
-        norminalSize = self.validateNumber(self.norminalSizeVar)
-        if norminalSize is None:
-            errors.append('名义尺寸：未输完整')
-        elif norminalSize is False:
-            errors.append('名义尺寸：只能输入数字')
-
-        # 验证上偏差
-        upperDeviation = self.validateNumber(self.upperDeviationVar)
-        if upperDeviation is None:
-            errors.append('上偏差：未输完整')
-        elif upperDeviation is False:
-            errors.append('上偏差：只能输入数字')
-
-        # 验证下偏差
-        lowerDeviation = self.validateNumber(self.lowerDeviationVar)
-        if lowerDeviation is None:
-            errors.append('下偏差：未输完整')
-        elif lowerDeviation is False:
-            errors.append('下偏差：只能输入数字')
-
-        # 如果有错误，显示并退出
-        if errors:
-            self.infoVar.set('；'.join(errors))
+        if self.fitCodeVar.get().strip() and not self.applyFitCode():
+            return
+        try:
+            record = self.engine.designFromText(
+                self.feature.get(),
+                self.norminalSizeVar.get(),
+                self.upperDeviationVar.get(),
+                self.lowerDeviationVar.get()
+            ).asRecord()
+        except ToleranceGradeError as e:
+            self._setVar(self.infoVar, str(e))
+            self.goNoGoGaugeClear()
+            self.settingPlugGaugeClear()
+            return
+        except GaugeDesignError as e:
+            # 如果有错误，显示并退出
+            self._setVar(self.infoVar, str(e))
             return
 
-        # 计算上下限和公差
-        upperLimit = norminalSize + upperDeviation
-        lowerLimit = norminalSize + lowerDeviation
-        tolerance = upperDeviation - lowerDeviation
+        self._goNoGoGaugeBlank = False
+        self._setVar(self.internationalToleranceGradeVar, record['it'])
+        self._setVar(self.infoVar, '')
 
-        itT1Z1 = self.queryData.queryItT1Z1(norminalSize, tolerance)
-        if itT1Z1 is None:
-            self.infoVar.set('轴孔公差等级过低或过高，仅适用于IT6-IT16公差等级尺寸')
-            self.goNoGoGaugeClear()
+        self._setGaugeVars('goGauge', record)
+        self._setVar(self.goGaugeWearLimitVar, record['goGaugeWearLimit'])
+        self._setGaugeVars('noGoGauge', record)
+
+        if record['feature'] == 'shaft':
+            self._settingPlugGaugeBlank = False
+            self._setGaugeVars('goWearSettingPlugGauge', record)
+            self._setGaugeVars('goGoSettingPlugGauge', record)
+            self._setGaugeVars('noGoGoSettingPlugGauge', record)
+        else:
             self.settingPlugGaugeClear()
+
+    def applyFitCode(self) -> bool:
+        """
+        由公差带代号查得零件特征、上下偏差（代号含尺寸时还有名义尺寸）并写入对应的输入框
+
+        Returns:
+            bool: 代号无效时在“信息”栏显示原因并返回 False
+        """
+        from fits import FitCodeError, FitData, parseFitCode
+
+        try:
+            # 代号中的尺寸优先于名义尺寸输入框
+            size, _, _ = parseFitCode(self.fitCodeVar.get())
+            fit = FitData().resolve(self.fitCodeVar.get(), '' if size is not None else self.norminalSizeVar.get())
+        except FitCodeError as e:
+            self._setVar(self.infoVar, str(e))
+            return False
+        self._setVar(self.feature, fit.feature)
+        if parseNumber(self.norminalSizeVar.get()) != fit.norminalSize:
+            self._setVar(self.norminalSizeVar, fmt(fit.norminalSize))
+        self._setVar(self.upperDeviationVar, fmt(fit.upperDeviation))
+        self._setVar(self.lowerDeviationVar, fmt(fit.lowerDeviation))
+        return True
+
+    def exportSizeSweep(self):
+        """
+        把当前公差带代号（为空时为当前零件特征和上下偏差）在 1-500 mm 全部 R40 优先尺寸上的量规表导出为 CSV
+        """
+        from fits import FitCodeError, parseFitCode
+        from sweep import preferredSizes, sweepRows
+
+        try:
+            if self.fitCodeVar.get().strip():
+                _, code, it = parseFitCode(self.fitCodeVar.get())
+                rows = sweepRows(preferredSizes('R40'), [f'{code}{it}'])
+                name = f'{code}{it}'
+            else:
+                upper, lower = parseNumber(self.upperDeviationVar.get()), parseNumber(self.lowerDeviationVar.get())
+                if not (isinstance(upper, Decimal) and isinstance(lower, Decimal)):
+                    raise GaugeDesignError('上偏差、下偏差：未输完整')
+                rows = sweepRows(preferredSizes('R40'), feature=self.feature.get(), upperDeviations=[upper], lowerDeviations=[lower])
+                name = f'{fmt(upper)}_{fmt(lower)}'
+        except (FitCodeError, GaugeDesignError) as e:
+            self._setVar(self.infoVar, str(e))
+            return
+        self._exportSweep(rows, f'{name}.csv')
+
+    def exportGradeSweep(self):
+        """
+        把当前名义尺寸下公差带代号的基本偏差在 IT6-IT16 上的量规表导出为 CSV
+        """
+        from fits import FitCodeError, parseFitCode
+        from sweep import sweepRows
+
+        if not self.fitCodeVar.get().strip():
+            self._setVar(self.infoVar, '按公差等级导出需要先输入公差带代号，如 h7')
+            return
+        try:
+            _, code, _ = parseFitCode(self.fitCodeVar.get())
+        except FitCodeError as e:
+            self._setVar(self.infoVar, str(e))
+            return
+        size = parseNumber(self.norminalSizeVar.get())
+        if not isinstance(size, Decimal):
+            self._setVar(self.infoVar, '名义尺寸：未输完整')
+            return
+        rows = sweepRows([size], [f'{code}{it}' for it in range(6, 17)])
+        self._exportSweep(rows, f'Ø{fmt(size)}{code}6-16.csv')
+
+    def _exportSweep(self, rows, initialFile: str):
+        """
+        选择文件后逐行计算、逐行写出扫描表
+        """
+        from tkinter import filedialog
+        from batch import RecordWriter, designRows, runBatch
+
+        path = filedialog.asksaveasfilename(
+            parent=self, initialfile=initialFile, defaultextension='.csv', filetypes=[('CSV', '*.csv')]
+        )
+        if not path:
+            return
+        try:
+            # 带 BOM 以便 Excel 正确显示中文
+            with open(path, 'w', encoding='utf-8-sig', newline='') as stream:
+                total, failed = runBatch(designRows(rows, self.engine), RecordWriter(stream, 'csv'))
+        except OSError as e:
+            self._setVar(self.infoVar, f'导出失败：{e}')
+            return
+        self._setVar(self.infoVar, f'已导出 {total} 行，{failed} 行出错：{path}')
+
+    def exportDataSheet(self):
+        """
+        把当前零件的量规数据表导出为 HTML、XLSX 或 CSV，代替截图交给量规车间
+        """
+        from contextlib import ExitStack
+        from tkinter import filedialog
+        from batch import designRows, runBatch
+        from report import ReportWriter, detectReportFormat, openReportStream
+
+        fitCode = self.fitCodeVar.get().strip()
+        name = fitCode or f'Ø{self.norminalSizeVar.get().strip()}'
+        path = filedialog.asksaveasfilename(
+            parent=self, initialfile=f'{name}.html', defaultextension='.html',
+            filetypes=[('HTML', '*.html'), ('Excel', '*.xlsx'), ('CSV', '*.csv')]
+        )
+        if not path:
             return
+        row = {
+            'id': name,
+            'feature': self.feature.get(),
+            'norminalSize': self.norminalSizeVar.get(),
+            'upperDeviation': self.upperDeviationVar.get(),
+            'lowerDeviation': self.lowerDeviationVar.get()
+        }
+        reportFormat = detectReportFormat(path)
+        engine = self.backgroundEngine
+
+        def work(progress):
+            with ExitStack() as stack:
+                stream = openReportStream(stack, path, reportFormat)
+                with ReportWriter(stream, reportFormat, 'sheets') as writer:
+                    _, failed = runBatch(designRows([row], engine), writer)
+            return failed
+
+        def done(failed):
+            if isinstance(failed, Exception):
+                self._setVar(self.infoVar, f'导出失败：{failed}')
+                return
+            self._setVar(self.infoVar, f'已导出：{path}' if not failed else f'已导出，但当前输入有误：{path}')
+
+        self.runInBackground(work, done, f'正在导出：{path}')
+
+    def analyzeGaugeSharing(self):
+        """
+        读入零件目录（与批量计算的输入相同），用与界面相同的计算找出可以共用的工作量规，导出合并后的量规清单
+        """
+        from tkinter import filedialog
+        from batch import RecordWriter, designRows, detectFormat, readRows
+        from sharing import BILL_FIELDS, gaugeZones, shareGauges
+
+        source = filedialog.askopenfilename(
+            parent=self, title='选择零件目录', filetypes=[('CSV', '*.csv'), ('JSONL', '*.jsonl'), ('全部文件', '*')]
+        )
+        if not source:
+            return
+        target = filedialog.asksaveasfilename(
+            parent=self, title='保存量规清单', initialfile='量规清单.csv', defaultextension='.csv', filetypes=[('CSV', '*.csv')]
+        )
+        if not target:
+            return
+        engine = self.backgroundEngine
+
+        def work(progress):
+            def counted(rows):
+                for count, row in enumerate(rows, 1):
+                    if count % 1000 == 0:
+                        progress(f'正在计算零件目录：{count} 行')
+                    yield row
+
+            with open(source, encoding='utf-8-sig', newline='') as stream:
+                zones = gaugeZones(designRows(counted(readRows(stream, detectFormat(source))), engine))
+            progress(f'正在合并 {len(zones)} 只工作量规')
+            bill = shareGauges(zones)
+            with open(target, 'w', encoding='utf-8-sig', newline='') as stream:
+                writer = RecordWriter(stream, 'csv', BILL_FIELDS)
+                for number, gauge in enumerate(bill, 1):
+                    writer.write(gauge.asRecord(number))
+            return len(zones), len(bill)
+
+        def done(result):
+            if isinstance(result, Exception):
+                self._setVar(self.infoVar, f'量规合并分析失败：{result}')
+                return
+            zoneCount, gaugeCount = result
+            self._setVar(self.infoVar, f'{zoneCount} 只工作量规可合并为 {gaugeCount} 只：{target}')
+
+        self.runInBackground(work, done, f'正在读取零件目录：{source}')
+
+    @property
+    def backgroundEngine(self) -> GaugeDesignEngine:
+        """
+        后台线程（零件表、导出、量规合并分析）共用的计算引擎，不带磁盘结果缓存：
+        成批计算的零件不写入 self.engine 的结果缓存，也不与单个零件页争用缓存的锁
+        """
+        if self._backgroundEngine is None:
+            self._backgroundEngine = GaugeDesignEngine(self.queryData)
+        return self._backgroundEngine
 
-        it, t1, z1 = itT1Z1
-        self.internationalToleranceGradeVar.set(f'IT{it}')
-
-        feature = self.feature.get()
-        self.infoVar.set('')
-
-        def fmt(x):
-            if isinstance(x, Decimal):
-                s = format(x, 'f')
-                if '.' in s:
-                    s = s.rstrip('0').rstrip('.')
-                return s
-            elif x is None:
-                return '—'
-            return str(x)
-
-
-        match feature:
-            case 'shaft':
-                goNorminalSize = upperLimit - z1 - t1 / 2
-                goUpperDeviation = t1
-                goLowerDeviation = Decimal('0')
-                goWearLimit = upperLimit
-                goRa = self.queryData.queryRa(feature, goNorminalSize, it)
-
-                self.goGaugeNorminalSizeVar.set(fmt(goNorminalSize))
-                self.goGaugeUpperDeviationVar.set(fmt(goUpperDeviation))
-                self.goGaugeLowerDeviationVar.set(fmt(goLowerDeviation))
-                self.goGaugeWearLimitVar.set(fmt(goWearLimit))
-                self.goGaugeRaVar.set(fmt(goRa))
-
-                noGoNorminalSize = lowerLimit
-                noGoUpperDeviation = t1
-                noGoLowerDeviation = Decimal('0')
-                noGoRa = self.queryData.queryRa(feature, noGoNorminalSize, it)
-
-                self.noGoGaugeNorminalSizeVar.set(fmt(noGoNorminalSize))
-                self.noGoGaugeUpperDeviationVar.set(fmt(noGoUpperDeviation))
-                self.noGoGaugeLowerDeviationVar.set(fmt(noGoLowerDeviation))
-                self.noGoGaugeRaVar.set(fmt(noGoRa))
-
-                goWearNorminalSize = upperLimit
-                goWearUpperDeviation = Decimal('0')
-                goWearLowerDeviation = -t1 / 2
-                goWearRa = self.queryData.querySettingPlugGaugeRa(goWearNorminalSize, it)
-
-                self.goWearSettingPlugGaugeNorminalSizeVar.set(fmt(goWearNorminalSize))
-                self.goWearSettingPlugGaugeUpperDeviationVar.set(fmt(goWearUpperDeviation))
-                self.goWearSettingPlugGaugeLowerDeviationVar.set(fmt(goWearLowerDeviation))
-                self.goWearSettingPlugGaugeRaVar.set(fmt(goWearRa))
-
-                goGoNorminalSize = upperLimit - z1
-                goGoUpperDeviation = Decimal('0')
-                goGoLowerDeviation = -t1 / 2
-                goGoRa = self.queryData.querySettingPlugGaugeRa(goGoNorminalSize, it)
-
-                self.goGoSettingPlugGaugeNorminalSizeVar.set(fmt(goGoNorminalSize))
-                self.goGoSettingPlugGaugeUpperDeviationVar.set(fmt(goGoUpperDeviation))
-                self.goGoSettingPlugGaugeLowerDeviationVar.set(fmt(goGoLowerDeviation))
-                self.goGoSettingPlugGaugeRaVar.set(fmt(goGoRa))
-
-                noGoGoLowerDeviation = -t1 / 2
-                noGoGoUpperDeviation = Decimal('0')
-                noGoGoNorminalSize = lowerLimit - noGoGoLowerDeviation
-                noGoGoRa = self.queryData.querySettingPlugGaugeRa(noGoGoNorminalSize, it)
-
-                self.noGoGoSettingPlugGaugeNorminalSizeVar.set(fmt(noGoGoNorminalSize))
-                self.noGoGoSettingPlugGaugeUpperDeviationVar.set(fmt(noGoGoUpperDeviation))
-                self.noGoGoSettingPlugGaugeLowerDeviationVar.set(fmt(noGoGoLowerDeviation))
-                self.noGoGoSettingPlugGaugeRaVar.set(fmt(noGoGoRa))
-
-            case 'hole':
-                goNorminalSize = lowerLimit + z1 + t1 / 2
-                goUpperDeviation = Decimal('0')
-                goLowerDeviation = -t1
-                goWearLimit = lowerLimit
-                goRa = self.queryData.queryRa(feature, goNorminalSize, it)
-
-                self.goGaugeNorminalSizeVar.set(fmt(goNorminalSize))
-                self.goGaugeUpperDeviationVar.set(fmt(goUpperDeviation))
-                self.goGaugeLowerDeviationVar.set(fmt(goLowerDeviation))
-                self.goGaugeWearLimitVar.set(fmt(goWearLimit))
-                self.goGaugeRaVar.set(fmt(goRa))
-
-                noGoNorminalSize = upperLimit
-                noGoUpperDeviation = Decimal('0')
-                noGoLowerDeviation = -t1
-                noGoRa = self.queryData.queryRa(feature, noGoNorminalSize, it)
-
-                self.noGoGaugeNorminalSizeVar.set(fmt(noGoNorminalSize))
-                self.noGoGaugeUpperDeviationVar.set(fmt(noGoUpperDeviation))
-                self.noGoGaugeLowerDeviationVar.set(fmt(noGoLowerDeviation))
-                self.noGoGaugeRaVar.set(fmt(noGoRa))
-
-                self.settingPlugGaugeClear()
+    def runInBackground(self, work: Callable[[Callable[[str], None]], object], done: Callable[[object], None], busyText: str):
+        """
+        在后台线程中执行 work，完成后在主循环中调用 done；与零件表（worksheet.py）一样用 after() 定时取回，窗口不会卡住
+
+        Args:
+            work (Callable): 以 progress(text) 为参数，progress 更新“信息”栏中的进度；不应访问 Tk 对象
+            done (Callable): 以 work 的返回值调用，work 抛出异常时以该异常调用
+            busyText (str): 开始时“信息”栏显示的内容
+        """
+        results = queue.SimpleQueue()
+        status = [busyText]
+
+        def run():
+            try:
+                results.put(work(lambda text: status.__setitem__(0, text)))
+            except Exception as e:
+                results.put(e)
+
+        def poll():
+            try:
+                value = results.get_nowait()
+            except queue.Empty:
+                self._setVar(self.infoVar, status[0])
+                self.after(POLL_INTERVAL_MS, poll)
+                return
+            done(value)
+
+        self._setVar(self.infoVar, busyText)
+        threading.Thread(target=run, name='background', daemon=True).start()
+        self.after(POLL_INTERVAL_MS, poll)
+
+    @staticmethod
+    def _setVar(var: tk.StringVar, value: str):
+        """
+        只在显示内容变化时写入，避免只读输入框无谓重绘
+        """
+        if var.get() != value:
+            var.set(value)
+
+    def _setGaugeVars(self, prefix, record: dict[str, str]):
+        """
+        把 asRecord() 中一个量规的字段写入同名的 StringVar
+        """
+        for suffix in GAUGE_DIMENSION_SUFFIXES:
+            self._setVar(getattr(self, f'{prefix}{suffix}Var'), record[f'{prefix}{suffix}'])
 
     def goNoGoGaugeClear(self):
+        if self._goNoGoGaugeBlank:
+            return
+        self._goNoGoGaugeBlank = True
         for var in [
             self.internationalToleranceGradeVar,
             self.goGaugeNorminalSizeVar, self.goGaugeUpperDeviationVar,
@@ -239,9 +426,12 @@ class Application(tk.Frame):
             self.noGoGaugeNorminalSizeVar, self.noGoGaugeUpperDeviationVar,
             self.noGoGaugeLowerDeviationVar
         ]:
-            var.set('')
+            self._setVar(var, '')
 
     def settingPlugGaugeClear(self):
+        if self._settingPlugGaugeBlank:
+            return
+        self._settingPlugGaugeBlank = True
         for var in [
             self.goGoSettingPlugGaugeNorminalSizeVar, self.goGoSettingPlugGaugeUpperDeviationVar,
             self.goGoSettingPlugGaugeLowerDeviationVar, self.goWearSettingPlugGaugeNorminalSizeVar,
@@ -250,13 +440,13 @@ class Application(tk.Frame):
             self.noGoGoSettingPlugGaugeLowerDeviationVar, self.goGoSettingPlugGaugeRaVar,
             self.goWearSettingPlugGaugeRaVar, self.noGoGoSettingPlugGaugeRaVar
         ]:
-            var.set('')
+            self._setVar(var, '')
 
     def goGaugeBoxUi(self):
         """
         通规尺寸
         """
-        box = tk.LabelFrame(self, text='T 通规尺寸', padx=10, pady=10)
+        box = tk.LabelFrame(self.singlePage, text='T 通规尺寸', padx=10, pady=10)
         labels = ['名义尺寸：', '上偏差：', '下偏差：', '磨损极限：', '粗糙度Ra']
         vars_ = [
             'goGaugeNorminalSizeVar', 'goGaugeUpperDeviationVar',
@@ -272,7 +462,7 @@ class Application(tk.Frame):
         """
         止规尺寸
         """
-        box = tk.LabelFrame(self, text='Z 止规尺寸', padx=10, pady=10)
+        box = tk.LabelFrame(self.singlePage, text='Z 止规尺寸', padx=10, pady=10)
         labels = ['名义尺寸：', '上偏差：', '下偏差：', '粗糙度Ra']
         vars_ = [
             'noGoGaugeNorminalSizeVar', 'noGoGaugeUpperDeviationVar',
@@ -303,7 +493,7 @@ class Application(tk.Frame):
         return self._createSettingPlugBox('ZT “校止-通” 塞规尺寸', 'noGoGoSettingPlugGauge')
     
     def _createSettingPlugBox(self, title, prefix):
-        box = tk.LabelFrame(self, text=title, padx=10, pady=10)
+        box = tk.LabelFrame(self.singlePage, text=title, padx=10, pady=10)
         labels = ['名义尺寸', '上偏差', '下偏差', '粗糙度Ra']
         names = ["NorminalSizeVar", "UpperDeviationVar", "LowerDeviationVar", "RaVar"]
         for i, text in enumerate(labels):
@@ -0,0 +1,291 @@
+"""
+预先计算的设计图集：表 3 的全部尺寸段 × 公差等级、表 4 和表 A.1 的全部粗糙度区间，
+以及 ISO 优先数（R40）名义尺寸在 IT6-IT16 下按 h（轴）、H（孔）配合的完整量规设计，
+保存为定长记录的二进制文件。
+
+读取端（DesignAtlas）只用 mmap 映射文件，查询时不解析、不构造 Decimal，也不导入 querydata.py，
+多个进程共用同一份只读、由操作系统缓存的文件。所有尺寸单位为 nm（int64）。
+
+文件格式（小端序）：
+    文件头 128 字节：魔数 8 字节、查询表 SHA-256 32 字节、HEADER_FIELDS 共 11 个 int64
+    之后依次为 int64 数组：
+        尺寸段       nBands × (下限, 上限)
+        公差等级     nBands × nGrades × (公差值, IT, T1, Z1)
+        粗糙度索引   3 × nGrades × (起始行, 行数)，3 为 孔用量规、轴用量规、校对塞规
+        粗糙度区间   nRaRows × (量规尺寸下限, 上限, 粗糙度)
+        优先尺寸     nSizes（升序）
+        设计         2 × nSizes × nGrades × recordWidth，2 为 孔（H）、轴（h），字段见 DESIGN_FIELDS
+"""
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left, bisect_right
+
+MAGIC = b'PLGDATL\x01'
+FORMAT_VERSION = 1
+HEADER_SIZE = 128
+HEADER_FIELDS = ('formatVersion', 'nBands', 'nGrades', 'itMin', 'nRaRows', 'nSizes', 'recordWidth', 'reserved1', 'reserved2', 'reserved3', 'reserved4')
+
+# 不存在的值（粗糙度表中没有的 Ra、孔用量规没有的校对塞规）
+NONE = -(2 ** 63)
+
+# 粗糙度索引中各表的序号
+RA_KINDS = ('hole', 'shaft', 'settingPlugGauge')
+# 设计记录中零件特征的序号
+FEATURES = ('hole', 'shaft')
+
+# 设计记录的字段，单位 nm，it 为公差等级
+DESIGN_FIELDS = (
+    'it', 't1', 'z1',
+    'goGaugeNorminalSize', 'goGaugeUpperDeviation', 'goGaugeLowerDeviation', 'goGaugeRa', 'goGaugeWearLimit',
+    'noGoGaugeNorminalSize', 'noGoGaugeUpperDeviation', 'noGoGaugeLowerDeviation', 'noGoGaugeRa',
+    *(
+        f'{name}{suffix}'
+        for name in ('goGoSettingPlugGauge', 'goWearSettingPlugGauge', 'noGoGoSettingPlugGauge')
+        for suffix in ('NorminalSize', 'UpperDeviation', 'LowerDeviation', 'Ra')
+    )
+)
+
+# ISO 3 R40 优先数（1-10），乘以 10 的整数次幂得到 1-500 mm 的名义尺寸
+R40 = (
+    '1', '1.06', '1.12', '1.18', '1.25', '1.32', '1.4', '1.5', '1.6', '1.7',
+    '1.8', '1.9', '2', '2.12', '2.24', '2.36', '2.5', '2.65', '2.8', '3',
+    '3.15', '3.35', '3.55', '3.75', '4', '4.25', '4.5', '4.75', '5', '5.3',
+    '5.6', '6', '6.3', '6.7', '7.1', '7.5', '8', '8.5', '9', '9.5'
+)
+
+DEFAULT_ATLAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'atlas.bin')
+
+def preferredSizes() -> list[int]:
+    """
+    Returns:
+        list[int]: 1-500 mm 的 R40 优先数尺寸，单位 nm，升序
+    """
+    from fixedpoint import parseNm
+
+    sizes = set()
+    for exponent in range(3):
+        for text in R40:
+            size = parseNm(text) * 10 ** exponent
+            if size <= parseNm('500'):
+                sizes.add(size)
+    return sorted(sizes)
+
+def buildAtlas(path: str = DEFAULT_ATLAS_PATH) -> dict:
+    """
+    由当前查询表生成图集文件（先写临时文件再替换，读取端不会看到写了一半的文件）
+
+    Args:
+        path (str): 输出文件
+
+    Returns:
+        dict: 文件头各字段
+    """
+    from querydata import DECIMAL_CONTEXT, TABLES_VERSION
+    from fixedpoint import FixedPointGaugeDesignEngine, FixedPointTables
+    from decimal import localcontext
+
+    tables = FixedPointTables.shared()
+    engine = FixedPointGaugeDesignEngine(cacheSize=0)
+    nBands = len(tables.bandMaxs)
+    nGrades = len(tables.bandItT1Z1s[0])
+    itMin = tables.bandItT1Z1s[0][0][0]
+
+    def raNm(ra) -> int:
+        if ra is None:
+            return NONE
+        with localcontext(DECIMAL_CONTEXT):
+            return int(ra * 1000)
+
+    values = []
+    for band in range(nBands):
+        values += (tables.bandMins[band], tables.bandMaxs[band])
+    for band in range(nBands):
+        for tol, (it, t1, z1) in zip(tables.bandTols[band], tables.bandItT1Z1s[band]):
+            values += (tol, it, t1, z1)
+
+    raIndex, raRows = [], []
+    for kind in RA_KINDS:
+        index = tables.settingPlugGaugeRaIndex if kind == 'settingPlugGauge' else tables.gaugeRaIndex[kind]
+        for it in range(itMin, itMin + nGrades):
+            norminalMins, norminalMaxs, ras = index.get(it, ((), (), ()))
+            raIndex += (len(raRows) // 3, len(norminalMins))
+            for norminalMin, norminalMax, ra in zip(norminalMins, norminalMaxs, ras):
+                raRows += (norminalMin, norminalMax, raNm(ra))
+    values += raIndex + raRows
+
+    sizes = preferredSizes()
+    values += sizes
+    for feature in FEATURES:
+        for size in sizes:
+            band = tables.queryBand(size)
+            for tol in tables.bandTols[band]:
+                upper, lower = (tol, 0) if feature == 'hole' else (0, -tol)
+                design = engine.design(feature, size, upper, lower)
+                record = [design.it, design.t1, design.z1]
+                for i, gauge in enumerate((design.goGauge, design.noGoGauge, design.goGoSettingPlugGauge, design.goWearSettingPlugGauge, design.noGoGoSettingPlugGauge)):
+                    if gauge is None:
+                        record += (NONE,) * 4
+                    else:
+                        record += (gauge.norminalSize, gauge.upperDeviation, gauge.lowerDeviation, raNm(gauge.ra))
+                    if i == 0:
+                        record.append(design.goGaugeWearLimit)
+                values += record
+
+    header = dict(
+        formatVersion=FORMAT_VERSION, nBands=nBands, nGrades=nGrades, itMin=itMin,
+        nRaRows=len(raRows) // 3, nSizes=len(sizes), recordWidth=len(DESIGN_FIELDS),
+        reserved1=0, reserved2=0, reserved3=0, reserved4=0
+    )
+    data = MAGIC + bytes.fromhex(TABLES_VERSION) + struct.pack(f'<{len(HEADER_FIELDS)}q', *(header[name] for name in HEADER_FIELDS))
+    assert len(data) == HEADER_SIZE
+    data += struct.pack(f'<{len(values)}q', *values)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+    return header
+
+class AtlasError(ValueError):
+    """
+    图集文件无效或格式版本不支持
+    """
+
+class DesignAtlas:
+    """
+    只读映射图集文件并查询，可在多个线程中共用
+    """
+    def __init__(self, path: str = DEFAULT_ATLAS_PATH):
+        if sys.byteorder != 'little':
+            raise AtlasError('图集文件为小端序，不支持当前平台')
+        self.path = path
+        with open(path, 'rb') as f:
+            # 空文件不能映射，长度不足文件头的也不是图集文件
+            if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+                raise AtlasError(f'不是图集文件：{path}')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise AtlasError(f'不是图集文件：{path}')
+            header = dict(zip(HEADER_FIELDS, struct.unpack_from(f'<{len(HEADER_FIELDS)}q', self._mmap, len(MAGIC) + 32)))
+            if header['formatVersion'] != FORMAT_VERSION:
+                raise AtlasError(f'不支持的图集格式版本：{header["formatVersion"]}')
+            nBands, nGrades, nSizes, width = header['nBands'], header['nGrades'], header['nSizes'], header['recordWidth']
+            bandsOffset = 0
+            gradesOffset = bandsOffset + 2 * nBands
+            raIndexOffset = gradesOffset + nBands * nGrades * 4
+            raRowsOffset = raIndexOffset + len(RA_KINDS) * nGrades * 2
+            sizesOffset = raRowsOffset + header['nRaRows'] * 3
+            designsOffset = sizesOffset + nSizes
+            nValues = designsOffset + len(FEATURES) * nSizes * nGrades * width
+            if min(nBands, nGrades, nSizes, width, header['nRaRows']) < 0 or len(self._mmap) < HEADER_SIZE + nValues * 8:
+                raise AtlasError(f'图集文件不完整：{path}')
+        except BaseException:
+            self._mmap.close()
+            raise
+
+        # 检查完成后才取 memoryview，出错时不会有未释放的视图使映射无法关闭
+        self.tablesVersion = self._mmap[len(MAGIC):len(MAGIC) + 32].hex()
+        self.header = header
+        self.nGrades = nGrades
+        self.itMin = header['itMin']
+        self.recordWidth = width
+        self._values = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + nValues * 8].cast('q')
+        self._bandMins = self._values[bandsOffset:bandsOffset + 2 * nBands:2]
+        self._bandMaxs = self._values[bandsOffset + 1:bandsOffset + 2 * nBands:2]
+        self._gradesOffset = gradesOffset
+        self._raIndexOffset = raIndexOffset
+        self._raRowsOffset = raRowsOffset
+        self._sizes = self._values[sizesOffset:sizesOffset + nSizes]
+        self._designsOffset = designsOffset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for name in ('_bandMins', '_bandMaxs', '_sizes', '_values'):
+            getattr(self, name).release()
+        self._mmap.close()
+
+    @property
+    def sizes(self) -> list[int]:
+        """
+        Returns:
+            list[int]: 图集中有完整设计的名义尺寸，单位 nm
+        """
+        return self._sizes.tolist()
+
+    def queryBand(self, norminalSize: int) -> int | None:
+        """
+        同 QueryData.queryBand，参数单位为 nm
+        """
+        band = bisect_left(self._bandMaxs, norminalSize)
+        if band == len(self._bandMaxs) or not self._bandMins[band] < norminalSize:
+            return None
+        return band
+
+    def queryItT1Z1(self, norminalSize: int, tolerance: int) -> tuple[int, int, int] | None:
+        """
+        同 QueryData.queryItT1Z1，参数和结果单位为 nm
+        """
+        band = self.queryBand(norminalSize)
+        if band is None:
+            return None
+        start = self._gradesOffset + band * self.nGrades * 4
+        i = bisect_right(self._values[start:start + self.nGrades * 4:4], tolerance) - 1
+        if i < 0:
+            return None
+        _, it, t1, z1 = self._values[start + i * 4:start + i * 4 + 4]
+        return it, t1, z1
+
+    def _lookupRa(self, kind: int, gaugeNorminal: int, it: int) -> int | None:
+        if not self.itMin <= it < self.itMin + self.nGrades:
+            return None
+        indexAt = self._raIndexOffset + (kind * self.nGrades + it - self.itMin) * 2
+        first, count = self._values[indexAt], self._values[indexAt + 1]
+        start = self._raRowsOffset + first * 3
+        i = bisect_right(self._values[start:start + count * 3:3], gaugeNorminal) - 1
+        if i >= 0 and gaugeNorminal < self._values[start + i * 3 + 1]:
+            return self._values[start + i * 3 + 2]
+        return None
+
+    def queryRa(self, feature: str, gaugeNorminal: int, it: int) -> int | None:
+        """
+        同 QueryData.queryRa，量规尺寸和粗糙度单位为 nm
+        """
+        return self._lookupRa(RA_KINDS.index(feature), gaugeNorminal, it)
+
+    def querySettingPlugGaugeRa(self, gaugeNorminal: int, it: int) -> int | None:
+        """
+        同 QueryData.querySettingPlugGaugeRa，量规尺寸和粗糙度单位为 nm
+        """
+        return self._lookupRa(2, gaugeNorminal, it)
+
+    def design(self, feature: str, norminalSize: int, it: int) -> dict[str, int | None] | None:
+        """
+        查询优先尺寸按 h（轴）或 H（孔）配合的完整设计
+
+        Args:
+            feature (str): 'hole' 或 'shaft'
+            norminalSize (int): 名义尺寸，单位 nm，须为 sizes 中的尺寸
+            it (int): 公差等级 IT6-IT16
+
+        Returns:
+            dict | None: DESIGN_FIELDS -> 数值（nm），不存在的值为 None；图集中没有时为 None
+        """
+        if feature not in FEATURES or not self.itMin <= it < self.itMin + self.nGrades:
+            return None
+        i = bisect_left(self._sizes, norminalSize)
+        if i == len(self._sizes) or self._sizes[i] != norminalSize:
+            return None
+        start = self._designsOffset + ((FEATURES.index(feature) * len(self._sizes) + i) * self.nGrades + it - self.itMin) * self.recordWidth
+        return {
+            name: None if value == NONE else value
+            for name, value in zip(DESIGN_FIELDS, self._values[start:start + self.recordWidth].tolist())
+        }
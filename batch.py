@@ -0,0 +1,333 @@
+from gaugedesign import GaugeDesignEngine, GaugeDesignError, RECORD_FIELDS, fmt
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, Literal, TextIO
+
+# 输入文件中识别的列；fit 为公差带代号（如 h7、Ø20H8），不为空时代替 feature 和上下偏差
+INPUT_FIELDS = ('id', 'feature', 'norminalSize', 'upperDeviation', 'lowerDeviation', 'fit')
+
+# 输出记录的列：行号、输入编号、设计结果、错误信息
+OUTPUT_FIELDS = ('row', 'id', *RECORD_FIELDS, 'error')
+
+# 计算方式：fixed 为整数（nm）计算，decimal 与界面相同，numpy 按块向量化计算
+ENGINES = ('fixed', 'decimal', 'numpy')
+
+# 多进程计算时每块的行数
+PARALLEL_CHUNK_SIZE = 4096
+
+def detectFormat(path: str, default: Literal['csv', 'jsonl'] = 'csv') -> Literal['csv', 'jsonl']:
+    """
+    根据文件扩展名判断格式
+
+    Args:
+        path (str): 文件路径，'-' 表示标准输入/输出
+        default (str): 无法判断时使用的格式
+
+    Returns:
+        str: 'csv' 或 'jsonl'
+    """
+    lower = path.lower()
+    if lower.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if lower.endswith(('.csv', '.txt')):
+        return 'csv'
+    return default
+
+def readRows(stream: TextIO, inputFormat: Literal['csv', 'jsonl']) -> Iterator[dict]:
+    """
+    逐行读取零件尺寸，不会一次性读入整个文件
+
+    Args:
+        stream (TextIO): 输入流
+        inputFormat (str): 'csv' 或 'jsonl'
+
+    Yields:
+        dict: 一行输入；JSONL 中无法解析的行以 {'error': ...} 表示
+    """
+    match inputFormat:
+        case 'csv':
+            yield from csv.DictReader(stream)
+        case 'jsonl':
+            for lineNo, line in enumerate(stream, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {'error': f'第 {lineNo} 行不是有效的 JSON：{e.msg}'}
+                    continue
+                if not isinstance(row, dict):
+                    yield {'error': f'第 {lineNo} 行不是 JSON 对象'}
+                    continue
+                yield row
+        case _:
+            raise ValueError(f'不支持的输入格式：{inputFormat}')
+
+def _text(value) -> str:
+    return '' if value is None else str(value)
+
+def applyFitCode(row: dict) -> dict:
+    """
+    有公差带代号（fit 列）时，返回换成查得的零件特征、名义尺寸和上下偏差的新输入行，否则原样返回
+
+    Raises:
+        FitCodeError: 代号无效或查不到偏差
+    """
+    fitCode = _text(row.get('fit')).strip()
+    if not fitCode:
+        return row
+    from fits import FitData
+
+    fit = FitData().resolve(fitCode, _text(row.get('norminalSize')))
+    return row | {
+        'feature': fit.feature,
+        'norminalSize': fmt(fit.norminalSize),
+        'upperDeviation': fmt(fit.upperDeviation),
+        'lowerDeviation': fmt(fit.lowerDeviation)
+    }
+
+def designRow(engine: GaugeDesignEngine, row: dict) -> dict:
+    """
+    计算一行输入，出错时返回带 error 字段的记录
+
+    Args:
+        engine (GaugeDesignEngine): 计算引擎
+        row (dict): 输入行
+
+    Returns:
+        dict: 输出记录，不含 row 字段
+    """
+    record = {'id': _text(row.get('id'))}
+    # batch 输出文件作为输入时 error 列为空
+    if row.get('error'):
+        record['error'] = row['error']
+        return record
+
+    try:
+        row = applyFitCode(row)
+    except GaugeDesignError as e:
+        record.update(
+            feature=_text(row.get('feature')).strip(),
+            norminalSize=_text(row.get('norminalSize')),
+            error=str(e)
+        )
+        return record
+
+    feature = _text(row.get('feature')).strip()
+    try:
+        design = engine.designFromText(
+            feature,
+            _text(row.get('norminalSize')),
+            _text(row.get('upperDeviation')),
+            _text(row.get('lowerDeviation'))
+        )
+    except GaugeDesignError as e:
+        record.update(
+            feature=feature,
+            norminalSize=_text(row.get('norminalSize')),
+            upperDeviation=_text(row.get('upperDeviation')),
+            lowerDeviation=_text(row.get('lowerDeviation')),
+            error=str(e)
+        )
+        return record
+
+    record.update(design.asRecord())
+    return record
+
+def designRows(rows: Iterable[dict], engine: GaugeDesignEngine | None = None) -> Iterator[dict]:
+    """
+    逐行计算，输出顺序与输入一致
+
+    Args:
+        rows (Iterable[dict]): 输入行
+        engine (GaugeDesignEngine | None): 计算引擎，默认新建
+
+    Yields:
+        dict: 输出记录，row 为从 1 开始的输入序号
+    """
+    if engine is None:
+        engine = GaugeDesignEngine()
+    for rowNo, row in enumerate(rows, 1):
+        record = designRow(engine, row)
+        record['row'] = rowNo
+        yield record
+
+def createEngine(engineName: Literal['fixed', 'decimal', 'numpy'] = 'fixed', resultCachePath: str | None = None):
+    """
+    按计算方式创建引擎，numpy 方式逐行回退时使用整数引擎
+
+    Args:
+        engineName (str): ENGINES 之一
+        resultCachePath (str | None): 磁盘结果缓存文件，None 表示不使用
+
+    Returns:
+        GaugeDesignEngine | FixedPointGaugeDesignEngine | CachedDesignEngine: 计算引擎
+    """
+    match engineName:
+        case 'fixed' | 'numpy':
+            from fixedpoint import FixedPointGaugeDesignEngine
+            engine = FixedPointGaugeDesignEngine()
+        case 'decimal':
+            engine = GaugeDesignEngine()
+        case _:
+            raise ValueError(f'不支持的计算方式：{engineName}')
+    return withResultCache(engine, resultCachePath)
+
+def withResultCache(engine, resultCachePath: str | None):
+    """
+    resultCachePath 不为 None 时给引擎加上磁盘结果缓存
+    """
+    if resultCachePath is None:
+        return engine
+    from resultcache import CachedDesignEngine, ResultCache
+    return CachedDesignEngine(engine, ResultCache(resultCachePath))
+
+# 工作进程中的 (计算方式, 引擎)，由 _initWorker 在进程启动时创建一次
+_worker = None
+
+def _initWorker(engineName: str, resultCachePath: str | None):
+    global _worker
+    _worker = (engineName, createEngine(engineName, resultCachePath))
+
+def _designChunkWith(engineName: str, engine, chunk: list[dict]) -> list[dict]:
+    """
+    计算一块输入，返回不含 row 字段的输出记录
+    """
+    if engineName == 'numpy':
+        from vectorized import designRowsVectorized
+        records = list(designRowsVectorized(chunk, engine, len(chunk)))
+    else:
+        records = [designRow(engine, row) for row in chunk]
+    # 磁盘结果缓存每块提交一次，工作进程退出时不会丢失
+    flush = getattr(engine, 'flush', None)
+    if flush is not None:
+        flush()
+    return records
+
+def _designChunk(chunk: list[dict]) -> list[dict]:
+    """
+    在工作进程中计算一块输入
+    """
+    return _designChunkWith(*_worker, chunk)
+
+def _designChunksInOrder(executor: Executor, designChunk, rows: Iterable[dict], chunkSize: int, maxInFlight: int) -> Iterator[dict]:
+    """
+    把输入分块提交给 executor，按输入顺序取回结果；同时提交的块数不超过 maxInFlight
+    """
+    rows = iter(rows)
+    rowNo = 0
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < maxInFlight and (chunk := list(islice(rows, chunkSize))):
+                pending.append(executor.submit(designChunk, chunk))
+            if not pending:
+                break
+            for record in pending.popleft().result():
+                rowNo += 1
+                record['row'] = rowNo
+                yield record
+    finally:
+        # 中途停止读取输出时不再计算尚未开始的块
+        for future in pending:
+            future.cancel()
+
+def designRowsParallel(rows: Iterable[dict], jobs: int | None = None, engineName: Literal['fixed', 'decimal', 'numpy'] = 'fixed', chunkSize: int = PARALLEL_CHUNK_SIZE, maxInFlight: int | None = None, resultCachePath: str | None = None) -> Iterator[dict]:
+    """
+    把输入分块交给多个进程计算，输出与 designRows() 相同且顺序与输入一致。
+    每个工作进程只建立一次查询表和引擎；同时提交的块数有上限，内存占用与输入总行数无关
+
+    Args:
+        rows (Iterable[dict]): 输入行
+        jobs (int | None): 进程数，默认为 CPU 核数
+        engineName (str): 计算方式，ENGINES 之一
+        chunkSize (int): 每块行数
+        maxInFlight (int | None): 最多同时提交的块数，默认为进程数的 2 倍
+        resultCachePath (str | None): 磁盘结果缓存文件，各进程分别打开，None 表示不使用
+
+    Yields:
+        dict: 输出记录，row 为从 1 开始的输入序号
+    """
+    if engineName not in ENGINES:
+        raise ValueError(f'不支持的计算方式：{engineName}')
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if maxInFlight is None:
+        maxInFlight = jobs * 2
+
+    with ProcessPoolExecutor(jobs, initializer=_initWorker, initargs=(engineName, resultCachePath)) as executor:
+        yield from _designChunksInOrder(executor, _designChunk, rows, chunkSize, maxInFlight)
+
+def designRowsThreaded(rows: Iterable[dict], jobs: int | None = None, engineName: Literal['fixed', 'decimal', 'numpy'] = 'fixed', engine=None, chunkSize: int = PARALLEL_CHUNK_SIZE, maxInFlight: int | None = None) -> Iterator[dict]:
+    """
+    同 designRowsParallel()，但使用线程池，所有线程共用一个引擎（及其缓存和查询表）。
+    在自由线程（free-threaded）CPython 上可利用多核，普通 CPython 上受 GIL 限制
+
+    Args:
+        rows (Iterable[dict]): 输入行
+        jobs (int | None): 线程数，默认为 CPU 核数
+        engineName (str): 计算方式，ENGINES 之一
+        engine (GaugeDesignEngine | FixedPointGaugeDesignEngine | None): 共用的引擎，默认按 engineName 新建
+        chunkSize (int): 每块行数
+        maxInFlight (int | None): 最多同时提交的块数，默认为线程数的 2 倍
+
+    Yields:
+        dict: 输出记录，row 为从 1 开始的输入序号
+    """
+    if engineName not in ENGINES:
+        raise ValueError(f'不支持的计算方式：{engineName}')
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if maxInFlight is None:
+        maxInFlight = jobs * 2
+    if engine is None:
+        engine = createEngine(engineName)
+
+    with ThreadPoolExecutor(jobs) as executor:
+        yield from _designChunksInOrder(executor, partial(_designChunkWith, engineName, engine), rows, chunkSize, maxInFlight)
+
+class RecordWriter:
+    """
+    逐条写出记录
+    """
+    def __init__(self, stream: TextIO, outputFormat: Literal['csv', 'jsonl'], fields=OUTPUT_FIELDS):
+        self.stream = stream
+        self.outputFormat = outputFormat
+        self.fields = fields
+        match outputFormat:
+            case 'csv':
+                self._csvWriter = csv.DictWriter(stream, fieldnames=fields, restval='', extrasaction='ignore', lineterminator='\n')
+                self._csvWriter.writeheader()
+            case 'jsonl':
+                self._csvWriter = None
+            case _:
+                raise ValueError(f'不支持的输出格式：{outputFormat}')
+
+    def write(self, record: dict):
+        if self._csvWriter is not None:
+            self._csvWriter.writerow(record)
+        else:
+            self.stream.write(json.dumps({k: record[k] for k in self.fields if record.get(k, '') != ''}, ensure_ascii=False))
+            self.stream.write('\n')
+
+def runBatch(records: Iterable[dict], writer: RecordWriter) -> tuple[int, int]:
+    """
+    写出 designRows() 等生成的全部记录
+
+    Returns:
+        tuple: (总行数, 出错行数)
+    """
+    total = failed = 0
+    for record in records:
+        writer.write(record)
+        total += 1
+        if 'error' in record:
+            failed += 1
+    return total, failed
@@ -0,0 +1,462 @@
+"""
+性能基准测试，结果以 JSON 输出，便于在版本之间比较
+
+    python benchmark.py                 # 全部测试，输出到标准输出
+    python benchmark.py -o bench.json   # 写入文件
+    python benchmark.py -k query -k design.fixed
+    DISPLAY=:99 python benchmark.py -k gui   # 在 Xvfb 下测试界面响应
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from decimal import Decimal
+
+# 输出格式版本，字段变化时递增
+SCHEMA_VERSION = 1
+
+# ISO 3 R20 优先数（1-10），乘以 10 的整数次幂得到 1-500 mm 的常用名义尺寸
+R20 = ('1', '1.12', '1.25', '1.4', '1.6', '1.8', '2', '2.24', '2.5', '2.8', '3.15', '3.55', '4', '4.5', '5', '5.6', '6.3', '7.1', '8', '9')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Skip(Exception):
+    """
+    当前环境无法运行的测试
+    """
+
+def summarize(samples: list[float], calls: int = 1) -> dict:
+    """
+    把若干次计时（秒）换算为单次调用的统计值（μs）
+
+    Args:
+        samples (list[float]): 每轮用时
+        calls (int): 每轮调用次数
+
+    Returns:
+        dict: {'calls', 'rounds', 'minMicroseconds', 'medianMicroseconds', 'maxMicroseconds'}
+    """
+    perCall = [sample / calls * 1e6 for sample in samples]
+    return {
+        'calls': calls,
+        'rounds': len(perCall),
+        'minMicroseconds': min(perCall),
+        'medianMicroseconds': statistics.median(perCall),
+        'maxMicroseconds': max(perCall)
+    }
+
+def measure(func, repeat: int) -> dict:
+    """
+    先用 timeit 自动确定每轮调用次数（每轮至少 0.2 秒），再计时 repeat 轮
+    """
+    timer = timeit.Timer(func)
+    calls, _ = timer.autorange()
+    return summarize(timer.repeat(repeat, calls), calls)
+
+def designGrid() -> list[tuple[str, str, str, str]]:
+    """
+    常用尺寸和公差组成的输入网格：R20 优先数尺寸（1-500 mm）× IT6-IT16 标准公差，
+    轴按 h、孔按 H 以及对称偏差（js/JS）各一组
+
+    Returns:
+        list[tuple]: (零件特征, 名义尺寸, 上偏差, 下偏差)，均为文本
+    """
+    from querydata import QueryData
+
+    queryData = QueryData()
+    grid = []
+    for exponent in range(3):
+        for text in R20:
+            size = Decimal(text).scaleb(exponent)
+            if size > 500:
+                continue
+            band = queryData.queryBand(size)
+            for tolerance, _, _, _ in queryData.norminalTolT1Z1Data[band][1]:
+                tolerance = tolerance / 1000
+                half = tolerance / 2
+                grid.append(('shaft', f'{size:f}', '0', f'{-tolerance:f}'))
+                grid.append(('hole', f'{size:f}', f'{tolerance:f}', '0'))
+                grid.append(('shaft', f'{size:f}', f'{half:f}', f'{-half:f}'))
+                grid.append(('hole', f'{size:f}', f'{half:f}', f'{-half:f}'))
+    return grid
+
+def queryArgs() -> list[tuple]:
+    """
+    查表测试的参数：网格中每个轴 h 的 (名义尺寸, 公差, IT)
+    """
+    from querydata import QueryData
+
+    queryData = QueryData()
+    args = []
+    for feature, size, upper, lower in designGrid():
+        if feature == 'shaft' and upper == '0':
+            size, tolerance = Decimal(size), Decimal(upper) - Decimal(lower)
+            args.append((size, tolerance, queryData.queryItT1Z1(size, tolerance)[0]))
+    return args
+
+def benchQueryDataInit(repeat: int) -> dict:
+    from querydata import QueryData
+
+    QueryData()
+    return measure(QueryData, repeat)
+
+def benchQueryDataCompile(repeat: int) -> dict:
+    """
+    进程内第一次创建 QueryData 时的读表和建立索引
+    """
+    from querydata import QueryData
+
+    return measure(lambda: QueryData._compileTables(*QueryData.loadTables()), repeat)
+
+def benchQueryItT1Z1(repeat: int) -> dict:
+    from querydata import QueryData
+
+    queryData = QueryData()
+    args = queryArgs()
+
+    def run():
+        for size, tolerance, _ in args:
+            queryData.queryItT1Z1(size, tolerance)
+
+    return perItem(measure(run, repeat), len(args))
+
+def benchQueryRa(repeat: int) -> dict:
+    from querydata import QueryData
+
+    queryData = QueryData()
+    args = queryArgs()
+
+    def run():
+        for size, _, it in args:
+            queryData.queryRa('shaft', size, it)
+            queryData.queryRa('hole', size, it)
+
+    return perItem(measure(run, repeat), len(args) * 2)
+
+def benchQuerySettingPlugGaugeRa(repeat: int) -> dict:
+    from querydata import QueryData
+
+    queryData = QueryData()
+    args = queryArgs()
+
+    def run():
+        for size, _, it in args:
+            queryData.querySettingPlugGaugeRa(size, it)
+
+    return perItem(measure(run, repeat), len(args))
+
+def perItem(result: dict, items: int) -> dict:
+    """
+    把每次处理 items 个输入的测试结果换算为单个输入的用时
+    """
+    return result | {
+        'items': items,
+        'minMicroseconds': result['minMicroseconds'] / items,
+        'medianMicroseconds': result['medianMicroseconds'] / items,
+        'maxMicroseconds': result['maxMicroseconds'] / items
+    }
+
+def designAll(engine, grid):
+    from gaugedesign import GaugeDesignError
+
+    for args in grid:
+        try:
+            engine.designFromText(*args)
+        except GaugeDesignError:
+            pass
+
+def benchDesignDecimal(repeat: int) -> dict:
+    """
+    界面使用的 Decimal 计算，不使用缓存
+    """
+    from gaugedesign import GaugeDesignEngine
+
+    engine = GaugeDesignEngine(cacheSize=0, itT1Z1CacheSize=0)
+    grid = designGrid()
+    return perItem(measure(lambda: designAll(engine, grid), repeat), len(grid))
+
+def benchDesignDecimalCached(repeat: int) -> dict:
+    """
+    Decimal 计算，全部命中缓存
+    """
+    from gaugedesign import GaugeDesignEngine
+
+    grid = designGrid()
+    engine = GaugeDesignEngine(cacheSize=len(grid))
+    designAll(engine, grid)
+    return perItem(measure(lambda: designAll(engine, grid), repeat), len(grid))
+
+def benchDesignFixed(repeat: int) -> dict:
+    """
+    批量计算默认的整数（nm）计算，不使用缓存
+    """
+    from fixedpoint import FixedPointGaugeDesignEngine
+
+    engine = FixedPointGaugeDesignEngine(cacheSize=0, itT1Z1CacheSize=0)
+    grid = designGrid()
+    return perItem(measure(lambda: designAll(engine, grid), repeat), len(grid))
+
+def benchDesignNumpy(repeat: int) -> dict:
+    """
+    NumPy 向量化计算，输入已转换为数组
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise Skip('未安装 NumPy')
+    from fixedpoint import parseNm
+    from vectorized import designArrays
+
+    grid = designGrid()
+    feature = np.array([row[0] for row in grid])
+    n, u, l = (np.array([parseNm(row[i]) for row in grid], dtype=np.int64) for i in (1, 2, 3))
+    return perItem(measure(lambda: designArrays(feature, n, u, l), repeat), len(grid))
+
+# 内存测试的结果条数
+MEMORY_ITEMS = 100_000
+
+def measureMemory(build) -> dict:
+    """
+    用 tracemalloc 统计 build() 返回的对象在保留期间占用的内存
+
+    Returns:
+        dict: {'bytes', 'peakBytes'}
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return {'bytes': current - before, 'peakBytes': peak - before}
+
+def memoryPerItem(result: dict, items: int) -> dict:
+    """
+    换算为每条的字节数，以及一百万条约需的 MB
+    """
+    return result | {
+        'items': items,
+        'bytesPerItem': result['bytes'] / items,
+        'megabytesPerMillion': result['bytes'] / items * 1e6 / 2 ** 20
+    }
+
+def memoryInputs() -> list[tuple[str, int, int, int]]:
+    """
+    内存测试的输入：常用网格中能计算的行（单位 nm）重复到 MEMORY_ITEMS 条。
+    各项测试都不使用计算缓存，每条结果都是独立对象
+    """
+    from fixedpoint import FixedPointGaugeDesignEngine, parseNm
+    from gaugedesign import GaugeDesignError
+
+    engine = FixedPointGaugeDesignEngine()
+    grid = []
+    for feature, size, upper, lower in designGrid():
+        args = (feature, parseNm(size), parseNm(upper), parseNm(lower))
+        try:
+            engine.design(*args)
+        except GaugeDesignError:
+            continue
+        grid.append(args)
+    return [grid[i % len(grid)] for i in range(MEMORY_ITEMS)]
+
+def benchMemoryTablesDecimal(repeat: int) -> dict:
+    """
+    QueryData：解析出的表 3、表 4、表 A.1（Decimal 元组）和查表索引
+    """
+    from querydata import QueryData
+
+    def build():
+        tables = QueryData.parseTables()
+        return tables, QueryData._compileTables(*tables)
+
+    return measureMemory(build)
+
+def benchMemoryTablesFixed(repeat: int) -> dict:
+    """
+    FixedPointTables：换算为 nm 的 array('q') 断点数组（粗糙度仍引用 QueryData 中的 Decimal）
+    """
+    from querydata import QueryData
+    from fixedpoint import FixedPointTables
+
+    queryData = QueryData()
+    return measureMemory(lambda: FixedPointTables(queryData))
+
+def benchMemoryDesignDecimal(repeat: int) -> dict:
+    """
+    MEMORY_ITEMS 个 GaugeDesign（Decimal）对象
+    """
+    from decimal import Decimal
+    from fixedpoint import fmtNm
+    from gaugedesign import GaugeDesignEngine
+
+    engine = GaugeDesignEngine(cacheSize=0)
+    inputs = [(feature, Decimal(fmtNm(size)), Decimal(fmtNm(upper)), Decimal(fmtNm(lower))) for feature, size, upper, lower in memoryInputs()]
+    return memoryPerItem(measureMemory(lambda: [engine.design(*args) for args in inputs]), len(inputs))
+
+def benchMemoryDesignFixed(repeat: int) -> dict:
+    """
+    MEMORY_ITEMS 个 FixedGaugeDesign（nm 整数）对象
+    """
+    from fixedpoint import FixedPointGaugeDesignEngine
+
+    engine = FixedPointGaugeDesignEngine(cacheSize=0)
+    inputs = memoryInputs()
+    return memoryPerItem(measureMemory(lambda: [engine.design(*args) for args in inputs]), len(inputs))
+
+def benchMemoryDesignColumns(repeat: int) -> dict:
+    """
+    同样的结果按列保存在 FixedDesignColumns 中
+    """
+    from fixedpoint import FixedPointGaugeDesignEngine
+
+    engine = FixedPointGaugeDesignEngine(cacheSize=0)
+    inputs = memoryInputs()
+    return memoryPerItem(measureMemory(lambda: engine.designColumns(*zip(*inputs))), len(inputs))
+
+def runPython(args: list[str]) -> float:
+    """
+    在新的解释器进程中运行，返回用时（秒）；去掉 DISPLAY，保证不会连接图形界面
+    """
+    env = {k: v for k, v in os.environ.items() if k not in ('DISPLAY', 'WAYLAND_DISPLAY')}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=SCRIPT_DIR, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def benchStartupInterpreter(repeat: int) -> dict:
+    """
+    空解释器启动，作为下面几项的基线
+    """
+    return summarize([runPython(['-c', 'pass']) for _ in range(repeat)])
+
+def benchStartupCli(repeat: int) -> dict:
+    """
+    plain-limit-gauge-designer.py --help：启动并加载命令行
+    """
+    return summarize([runPython(['plain-limit-gauge-designer.py', '--help']) for _ in range(repeat)])
+
+def benchStartupApplication(repeat: int) -> dict:
+    """
+    导入界面模块（含 tkinter）并建立查询表，即打开窗口前的全部工作
+    """
+    return summarize([runPython(['-c', 'import application, querydata; querydata.QueryData()']) for _ in range(repeat)])
+
+def benchGuiLatency(repeat: int) -> dict:
+    """
+    界面从输入变化到重新绘制完成的用时，需要显示器（可用 Xvfb）。
+    逐字键入若干尺寸和偏差，每次写入输入框变量后处理完全部待处理事件为止
+    """
+    if not os.environ.get('DISPLAY'):
+        raise Skip('未设置 DISPLAY')
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise Skip(f'无法打开显示器：{e}')
+
+    from application import Application
+
+    try:
+        app = Application(master=root)
+        root.update()
+        strokes = []
+        for _, size, upper, lower in designGrid()[::37]:
+            for var, text in ((app.norminalSizeVar, size), (app.upperDeviationVar, upper), (app.lowerDeviationVar, lower)):
+                strokes.extend((var, text[:i]) for i in range(1, len(text) + 1))
+
+        samples = []
+        for _ in range(repeat):
+            for var, text in strokes:
+                start = time.perf_counter()
+                var.set(text)
+                root.update()
+                samples.append(time.perf_counter() - start)
+        result = summarize(samples)
+        result['p95Microseconds'] = statistics.quantiles(samples, n=20)[-1] * 1e6
+        return result
+    finally:
+        root.destroy()
+
+BENCHMARKS = (
+    ('query.QueryData.__init__', benchQueryDataInit),
+    ('query.QueryData.compileTables', benchQueryDataCompile),
+    ('query.queryItT1Z1', benchQueryItT1Z1),
+    ('query.queryRa', benchQueryRa),
+    ('query.querySettingPlugGaugeRa', benchQuerySettingPlugGaugeRa),
+    ('design.decimal', benchDesignDecimal),
+    ('design.decimal.cached', benchDesignDecimalCached),
+    ('design.fixed', benchDesignFixed),
+    ('design.numpy', benchDesignNumpy),
+    ('memory.tables.decimal', benchMemoryTablesDecimal),
+    ('memory.tables.fixed', benchMemoryTablesFixed),
+    ('memory.design.decimal', benchMemoryDesignDecimal),
+    ('memory.design.fixed', benchMemoryDesignFixed),
+    ('memory.design.columns', benchMemoryDesignColumns),
+    ('startup.interpreter', benchStartupInterpreter),
+    ('startup.cli', benchStartupCli),
+    ('startup.application', benchStartupApplication),
+    ('gui.keystrokeLatency', benchGuiLatency),
+)
+
+def environment() -> dict:
+    from buildtime import buildTime
+    from querydata import TABLES_VERSION
+
+    try:
+        import numpy
+        numpyVersion = numpy.__version__
+    except ImportError:
+        numpyVersion = None
+    return {
+        'schema': SCHEMA_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'buildTime': buildTime,
+        'tablesVersion': TABLES_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': numpyVersion
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='性能基准测试，结果以 JSON 输出')
+    parser.add_argument('-o', '--output', default='-', help='输出文件，默认标准输出')
+    parser.add_argument('-k', '--select', action='append', default=[], help='只运行名称包含该文本的测试，可重复')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='每项测试的轮数，默认 5')
+    parser.add_argument('--list', action='store_true', help='列出全部测试名称')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return 0
+
+    report = environment() | {'repeat': args.repeat, 'results': {}, 'skipped': {}}
+    for name, bench in BENCHMARKS:
+        if args.select and not any(text in name for text in args.select):
+            continue
+        print(name, file=sys.stderr)
+        try:
+            report['results'][name] = bench(args.repeat)
+        except Skip as e:
+            report['skipped'][name] = str(e)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,8 +6,12 @@ python.exe -m pip install --upgrade pip
 pip install nuitka==2.7.12
 
 python .\savebuildtime.py
+python .\savequerytables.py
+python .\saveatlas.py .\dist\atlas.bin
+python .\verify.py
+if ($LASTEXITCODE -ne 0) { exit $LASTEXITCODE }
 
-nuitka --standalone --onefile --remove-output --windows-console-mode=disable `
+nuitka --standalone --onefile --remove-output --windows-console-mode=attach `
 --enable-plugin=tk-inter `
 --windows-icon-from-ico=.\icon.ico --include-data-file=.\icon.ico=.\ `
 --output-dir=dist --output-filename=plain-limit-gauge-designer_win_amd64 `
@@ -0,0 +1,226 @@
+"""
+量规校准验收：把三坐标测量机（CMM）导出的测量文件与计算出的量规尺寸逐行对应，按块用 NumPy 判定每只量规：
+    inTolerance      在制造公差带内
+    inWearAllowance  通规已磨损，超出制造公差带但未超过磨损极限，仍可使用
+    wornOut          通规超过磨损极限，应报废
+    outOfTolerance   向非磨损方向超出制造公差带，或止规、校对塞规超出制造公差带
+    unmatched        测量行对应不到零件或量规（编号不在目录中、量规种类或尺寸无效、零件本身计算出错等）
+塞规（孔）磨损后变小，卡规、环规（轴）磨损后变大；只有通规有磨损极限。
+
+测量文件每行一只量规，默认列为 gauge（量规编号，可选）、id（零件编号，与目录的 id 列对应）、kind（量规种类）、size（实测尺寸，mm），
+列名可在 calibrateRows() 中另行指定。测量文件逐块读取、逐行输出，内存占用只与目录大小有关。
+
+NumPy 为可选依赖，只有校准时才会导入本模块。
+"""
+from fixedpoint import fmtNm, mmToNm, parseMeasuredNm, parseNm
+from gaugedesign import GAUGE_FIELDS, KIND_ALIASES
+
+import numpy as np
+from collections import Counter
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable, Iterator
+
+STATUSES = ('inTolerance', 'inWearAllowance', 'wornOut', 'outOfTolerance', 'unmatched')
+STATUS_TITLES = {
+    'inTolerance': '合格',
+    'inWearAllowance': '磨损，未超过磨损极限',
+    'wornOut': '超过磨损极限',
+    'outOfTolerance': '超差',
+    'unmatched': '无法对应',
+}
+IN_TOLERANCE, IN_WEAR_ALLOWANCE, WORN_OUT, OUT_OF_TOLERANCE, UNMATCHED = range(len(STATUSES))
+
+# 测量文件中各项的默认列名
+DEFAULT_COLUMNS = {'gauge': 'gauge', 'id': 'id', 'kind': 'kind', 'size': 'size'}
+
+# 校准结果的列；excess 为超出制造公差带的量（mm），在公差带内为 0
+RESULT_FIELDS = ('row', 'gauge', 'id', 'kind', 'size', 'lowerLimit', 'upperLimit', 'wearLimit', 'excess', 'status', 'error')
+
+# 每块的行数
+CHUNK_SIZE = 4096
+
+# 零件没有的量规（孔的校对塞规）、没有的磨损极限
+NONE = -(2 ** 63)
+
+class GaugeSpecs:
+    """
+    目录中各零件各量规的制造公差带和通规磨损极限，单位 nm，按 (零件序号, 量规种类序号) 存放在 NumPy 数组中
+    """
+    def __init__(self, records: Iterable[dict]):
+        """
+        Args:
+            records (Iterable[dict]): batch.designRows() 等输出的记录，零件以 id 列区分，为空时为 '#行号'
+        """
+        self.parts = {}
+        # 计算出错的零件及原因
+        self.errors = {}
+        lowers, uppers, wearLimits, directions = [], [], [], []
+        for position, record in enumerate(records, 1):
+            part = str(record.get('id') or '').strip() or f'#{record.get("row") or position}'
+            if record.get('error') or not record.get('goGaugeNorminalSize'):
+                self.errors[part] = record.get('error') or '没有量规尺寸'
+                continue
+            self.parts[part] = len(directions)
+            for name in GAUGE_FIELDS:
+                if not record.get(f'{name}NorminalSize'):
+                    lowers.append(NONE)
+                    uppers.append(NONE)
+                    continue
+                norminalSize = _nm(record[f'{name}NorminalSize'])
+                lowers.append(norminalSize + _nm(record[f'{name}LowerDeviation']))
+                uppers.append(norminalSize + _nm(record[f'{name}UpperDeviation']))
+            wearLimits.append(_nm(record['goGaugeWearLimit']))
+            directions.append(1 if record['feature'] == 'shaft' else -1)
+        self.lower = np.array(lowers, dtype=np.int64).reshape(-1, len(GAUGE_FIELDS))
+        self.upper = np.array(uppers, dtype=np.int64).reshape(-1, len(GAUGE_FIELDS))
+        self.wearLimit = np.array(wearLimits, dtype=np.int64)
+        # 通规的磨损方向：轴用 +1（变大），孔用 -1（变小）
+        self.direction = np.array(directions, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+def _nm(text: str) -> int:
+    value = parseNm(text)
+    return mmToNm(Decimal(text)) if value is None else value
+
+def classifyArrays(size: np.ndarray, lower: np.ndarray, upper: np.ndarray, wearLimit: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    """
+    按块判定
+
+    Args:
+        size, lower, upper (np.ndarray): 实测尺寸、制造公差带下极限、上极限，单位 nm
+        wearLimit (np.ndarray): 磨损极限，单位 nm，只对 direction 不为 0 的行有意义
+        direction (np.ndarray): 磨损方向，通规轴用 +1、孔用 -1，其他量规为 0
+
+    Returns:
+        np.ndarray: STATUSES 的序号（int8）
+    """
+    inZone = (size >= lower) & (size <= upper)
+    # 向磨损方向超出制造公差带
+    wearSide = ((direction > 0) & (size > upper)) | ((direction < 0) & (size < lower))
+    withinWear = np.where(direction > 0, size <= wearLimit, size >= wearLimit)
+    return np.select(
+        [inZone, wearSide & withinWear, wearSide],
+        [IN_TOLERANCE, IN_WEAR_ALLOWANCE, WORN_OUT],
+        OUT_OF_TOLERANCE
+    ).astype(np.int8)
+
+class CalibrationSummary:
+    """
+    按量规种类统计各判定结果的只数
+    """
+    def __init__(self):
+        self.counts = {name: Counter() for name in (*GAUGE_FIELDS, '')}
+
+    def add(self, kind: str, status: str):
+        self.counts[kind if kind in self.counts else ''][status] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(sum(counter.values()) for counter in self.counts.values())
+
+    def records(self) -> Iterator[dict]:
+        """
+        Yields:
+            dict: 每种量规一行（无法识别种类的为 kind 为空的一行），最后为合计，列见 SUMMARY_FIELDS
+        """
+        total = Counter()
+        for kind, counter in self.counts.items():
+            if not counter:
+                continue
+            total.update(counter)
+            yield {'kind': kind, 'total': sum(counter.values()), **{status: counter[status] for status in STATUSES}}
+        yield {'kind': 'total', 'total': sum(total.values()), **{status: total[status] for status in STATUSES}}
+
+SUMMARY_FIELDS = ('kind', 'total', *STATUSES)
+
+def calibrateRows(rows: Iterable[dict], specs: GaugeSpecs, columns: dict[str, str] | None = None, defaultKind: str | None = None, summary: CalibrationSummary | None = None, chunkSize: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    逐块对应、判定测量行，输出顺序与输入一致
+
+    Args:
+        rows (Iterable[dict]): 测量行，如 batch.readRows() 读出的 CMM 导出文件
+        specs (GaugeSpecs): 目录的量规尺寸
+        columns (dict | None): 各项的列名，默认 DEFAULT_COLUMNS
+        defaultKind (str | None): 没有量规种类列或为空时使用的种类，如测量文件只有通规时
+        summary (CalibrationSummary | None): 累计统计结果
+        chunkSize (int): 每块的行数
+
+    Yields:
+        dict: 结果记录，列见 RESULT_FIELDS
+    """
+    columns = DEFAULT_COLUMNS | (columns or {})
+    rows = iter(rows)
+    rowNo = 0
+    while chunk := list(islice(rows, chunkSize)):
+        records = []
+        # 能对应上的行：在 records 中的位置、零件序号、量规种类序号、实测尺寸
+        matched, partIndexes, kindIndexes, sizes = [], [], [], []
+        for row in chunk:
+            rowNo += 1
+            part = '' if row.get(columns['id']) is None else str(row[columns['id']]).strip()
+            kindText = '' if row.get(columns['kind']) is None else str(row[columns['kind']]).strip()
+            kind = KIND_ALIASES.get((kindText or defaultKind or '').lower())
+            sizeText = '' if row.get(columns['size']) is None else str(row[columns['size']]).strip()
+            record = {
+                'row': rowNo,
+                'gauge': '' if row.get(columns['gauge']) is None else str(row[columns['gauge']]).strip(),
+                'id': part,
+                'kind': kind or kindText,
+                'size': sizeText,
+            }
+            records.append(record)
+            size = sizeError = error = None
+            try:
+                size = parseMeasuredNm(sizeText)
+            except ValueError as e:
+                sizeError = str(e)
+            if kind is None:
+                error = f'量规种类不正确：{kindText}' if kindText else '缺少量规种类'
+            elif sizeError is not None:
+                error = sizeError
+            elif size is None:
+                error = f'实测尺寸不是数字：{sizeText}' if sizeText else '缺少实测尺寸'
+            elif part in specs.errors:
+                error = f'零件计算出错：{specs.errors[part]}'
+            elif part not in specs.parts:
+                error = f'目录中没有零件：{part}'
+            else:
+                kindIndex = GAUGE_FIELDS.index(kind)
+                partIndex = specs.parts[part]
+                if specs.lower[partIndex, kindIndex] == NONE:
+                    error = '孔用量规没有校对塞规'
+            if error is not None:
+                record.update(status=STATUSES[UNMATCHED], error=error)
+                continue
+            matched.append(len(records) - 1)
+            partIndexes.append(partIndex)
+            kindIndexes.append(kindIndex)
+            sizes.append(size)
+
+        if matched:
+            partIndex = np.array(partIndexes, dtype=np.intp)
+            kindIndex = np.array(kindIndexes, dtype=np.intp)
+            size = np.array(sizes, dtype=np.int64)
+            lower = specs.lower[partIndex, kindIndex]
+            upper = specs.upper[partIndex, kindIndex]
+            isGo = kindIndex == GAUGE_FIELDS.index('goGauge')
+            wearLimit = specs.wearLimit[partIndex]
+            direction = np.where(isGo, specs.direction[partIndex], 0)
+            status = classifyArrays(size, lower, upper, wearLimit, direction)
+            excess = np.maximum(np.maximum(lower - size, size - upper), 0)
+            for position, values in zip(matched, zip(lower.tolist(), upper.tolist(), wearLimit.tolist(), excess.tolist(), status.tolist(), isGo.tolist())):
+                lowerValue, upperValue, wearValue, excessValue, statusValue, go = values
+                records[position].update(
+                    lowerLimit=fmtNm(lowerValue),
+                    upperLimit=fmtNm(upperValue),
+                    wearLimit=fmtNm(wearValue) if go else '',
+                    excess=fmtNm(excessValue),
+                    status=STATUSES[statusValue]
+                )
+        for record in records:
+            if summary is not None:
+                summary.add(record['kind'], record['status'])
+            yield record
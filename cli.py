@@ -0,0 +1,623 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from contextlib import ExitStack
+
+def openText(stack: ExitStack, path: str, mode: str):
+    """
+    打开文本文件，'-' 表示标准输入/输出
+    """
+    if path == '-':
+        return sys.stdin if 'r' in mode else sys.stdout
+    return stack.enter_context(open(path, mode, encoding='utf-8-sig' if 'r' in mode else 'utf-8', newline=''))
+
+def createEngine(args):
+    """
+    按 --engine / --profile / --trace 选项创建计算引擎，未指定统计时不带任何统计开销；
+    统计的是 QueryData 的查表，因此 --profile / --trace 总是使用 Decimal 计算，
+    并关闭引擎的计算结果缓存、IT/T1/Z1 缓存和磁盘结果缓存，否则命中缓存的零件不查表，统计的只是未命中的部分。
+    --jobs 大于 1 且未指定 --threads 时引擎在各子进程中创建，主进程不用，返回 None（不打开磁盘结果缓存）
+    """
+    from gaugedesign import GaugeDesignEngine
+    from batch import createEngine as createBatchEngine
+
+    if getattr(args, 'jobs', 1) != 1 and not getattr(args, 'threads', False):
+        return None
+    if not (getattr(args, 'profile', False) or getattr(args, 'trace', False)):
+        return createBatchEngine(getattr(args, 'engine', 'decimal'), resultCachePath(args))
+
+    from querystats import InstrumentedQueryData, loggingCallback
+    callback = None
+    if args.trace:
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG, format='%(message)s')
+        callback = loggingCallback()
+    return GaugeDesignEngine(InstrumentedQueryData(callback=callback), cacheSize=0, itT1Z1CacheSize=0)
+
+def resultCachePath(args) -> str | None:
+    """
+    --result-cache 指定的磁盘缓存文件（不带路径时为默认位置），未指定时使用环境变量
+    """
+    from resultcache import cachePathFromEnv, defaultCachePath
+
+    path = getattr(args, 'result_cache', None)
+    if path is None:
+        return cachePathFromEnv()
+    return path or defaultCachePath()
+
+def printQueryStats(engine):
+    stats = getattr(getattr(engine, 'queryData', None), 'stats', None)
+    if stats is not None:
+        print(json.dumps(stats.asDict(), ensure_ascii=False, indent=2), file=sys.stderr)
+
+def printCacheStats(engine):
+    cacheInfo = getattr(engine, 'cacheInfo', None)
+    if cacheInfo is not None:
+        print(json.dumps(cacheInfo(), ensure_ascii=False, indent=2), file=sys.stderr)
+
+def designRecords(args, rows, engine):
+    """
+    按 --engine 选项逐行或按块批量计算，--jobs 大于 1 时分块交给多个进程（--threads 时为多个线程，共用 engine；多进程时 engine 为 None）
+    """
+    from batch import designRows, designRowsParallel, designRowsThreaded
+
+    if args.jobs != 1:
+        if args.threads:
+            return designRowsThreaded(rows, args.jobs or None, args.engine, engine, args.chunk_size)
+        return designRowsParallel(rows, args.jobs or None, args.engine, args.chunk_size, resultCachePath=resultCachePath(args))
+    if getattr(args, 'engine', None) == 'numpy' and not (args.profile or args.trace):
+        from vectorized import designRowsVectorized
+        return designRowsVectorized(rows, engine)
+    return designRows(rows, engine)
+
+def cmdBatch(args) -> int:
+    from batch import RecordWriter, detectFormat, readRows, runBatch
+
+    if args.jobs != 1 and (args.profile or args.trace or (args.cache_stats and not args.threads)):
+        print('--profile、--trace 只能在 --jobs 1 下使用，--cache-stats 只能在 --jobs 1 或 --threads 下使用', file=sys.stderr)
+        return 2
+    inputFormat = args.input_format or detectFormat(args.input)
+    outputFormat = args.output_format or detectFormat(args.output, inputFormat)
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        source = openText(stack, args.input, 'r')
+        target = openText(stack, args.output, 'w')
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        total, failed = runBatch(designRecords(args, readRows(source, inputFormat), engine), RecordWriter(target, outputFormat))
+        print(f'共 {total} 行，{failed} 行出错', file=sys.stderr)
+        printQueryStats(engine)
+        if args.cache_stats:
+            printCacheStats(engine)
+    return 0
+
+def cmdSweep(args) -> int:
+    from batch import RecordWriter, detectFormat, runBatch
+    from sweep import expandFitCodes, preferredSizes, sweepRows
+    from itertools import chain
+
+    deviationOptions = (args.feature, args.upper, args.lower)
+    if not args.fit and None in deviationOptions:
+        print('请指定 --fit，或同时指定 --feature、--upper、--lower', file=sys.stderr)
+        return 2
+    try:
+        fitCodes = expandFitCodes(args.fit, args.grades)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.size:
+        sizes = chain.from_iterable(args.size)
+    else:
+        sizes = preferredSizes(args.series, args.size_from, args.size_to)
+    rows = sweepRows(
+        sizes, fitCodes,
+        args.feature, *((args.upper, args.lower) if None not in deviationOptions else ((), ()))
+    )
+
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        target = openText(stack, args.output, 'w')
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        total, failed = runBatch(designRecords(args, rows, engine), RecordWriter(target, args.output_format or detectFormat(args.output)))
+        print(f'共 {total} 行，{failed} 行出错', file=sys.stderr)
+    return 0
+
+def cmdReport(args) -> int:
+    from batch import detectFormat, readRows, runBatch
+    from report import ReportWriter, detectReportFormat, openReportStream
+
+    inputFormat = args.input_format or detectFormat(args.input)
+    reportFormat = args.format or detectReportFormat(args.output)
+    compress = args.gzip or args.output.lower().endswith('.gz')
+    if reportFormat == 'xlsx' and compress:
+        print('XLSX 本身已是压缩格式，不能再 gzip 压缩', file=sys.stderr)
+        return 2
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        source = openText(stack, args.input, 'r')
+        target = openReportStream(stack, args.output, reportFormat, compress)
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        with ReportWriter(target, reportFormat, args.layout, args.title) as writer:
+            total, failed = runBatch(designRecords(args, readRows(source, inputFormat), engine), writer)
+        print(f'共 {total} 个零件，{failed} 个出错', file=sys.stderr)
+    return 0
+
+def cmdUpdate(args) -> int:
+    from batch import OUTPUT_FIELDS, RecordWriter, detectFormat, readRows, runBatch
+    from incremental import DIFF_FIELDS, CatalogState, watchFile
+
+    if args.input == '-' and (args.state is None or args.watch):
+        print('从标准输入读取时须指定 --state，且不能使用 --watch', file=sys.stderr)
+        return 2
+    statePath = args.state or f'{args.input}.state.sqlite3'
+    inputFormat = args.input_format or detectFormat(args.input)
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        state = stack.enter_context(CatalogState(statePath))
+        diffTarget = openText(stack, args.diff, 'w')
+        diffWriter = RecordWriter(diffTarget, args.diff_format or detectFormat(args.diff), DIFF_FIELDS)
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        try:
+            for _ in (watchFile(args.input, args.interval) if args.watch else [None]):
+                with ExitStack() as runStack:
+                    source = openText(runStack, args.input, 'r')
+                    summary = state.update(readRows(source, inputFormat), engine)
+                for entry in summary.diff:
+                    diffWriter.write(entry)
+                diffTarget.flush()
+                print(
+                    f'共 {summary.total} 行：新增 {summary.added}，修改 {summary.modified}（量规尺寸变化 {summary.changed}），'
+                    f'删除 {summary.removed}，未变 {summary.unchanged}，出错 {summary.failed}'
+                    + ('；查询表已更新，已全部重新计算' if summary.tablesChanged else ''),
+                    file=sys.stderr
+                )
+                if args.output is not None:
+                    # 每次都完整重写，内容来自状态文件，未变的行不重新计算
+                    with ExitStack() as outputStack:
+                        target = openText(outputStack, args.output, 'w')
+                        runBatch(state.records(), RecordWriter(target, args.output_format or detectFormat(args.output, inputFormat), OUTPUT_FIELDS))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+def cmdShare(args) -> int:
+    from batch import RecordWriter, detectFormat, readRows
+    from fixedpoint import mmToNm
+    from sharing import BILL_FIELDS, gaugeZones, shareGauges
+
+    inputFormat = args.input_format or detectFormat(args.input)
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        source = openText(stack, args.input, 'r')
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        zones = gaugeZones(designRecords(args, readRows(source, inputFormat), engine))
+        bill = shareGauges(zones, args.mode, mmToNm(args.min_tolerance))
+        target = openText(stack, args.output, 'w')
+        writer = RecordWriter(target, args.output_format or detectFormat(args.output, inputFormat), BILL_FIELDS)
+        for number, gauge in enumerate(bill, 1):
+            writer.write(gauge.asRecord(number))
+    print(f'共 {len(zones) // 2} 个零件，{len(zones)} 只工作量规合并为 {len(bill)} 只', file=sys.stderr)
+    return 0
+
+def cmdIndex(args) -> int:
+    from batch import detectFormat, readRows
+    from gaugeindex import buildGaugeIndex
+    from sharing import gaugeZones
+
+    inputFormat = args.input_format or detectFormat(args.input)
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        source = openText(stack, args.input, 'r')
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        zones = gaugeZones(designRecords(args, readRows(source, inputFormat), engine))
+    header = buildGaugeIndex(zones, args.output)
+    print(f'共 {header["nParts"]} 个零件，{header["nZones"]} 只工作量规：{args.output}', file=sys.stderr)
+    return 0
+
+def cmdLookup(args) -> int:
+    from batch import RecordWriter, detectFormat
+    from fixedpoint import parseNm
+    from gaugeindex import MATCH_FIELDS, GaugeIndex, GaugeIndexError
+    from incremental import stateVersion
+
+    sizes = [parseNm(text) for text in args.size]
+    if None in sizes:
+        print(f'量规尺寸应为 mm 为单位、最多 6 位小数的数值：{args.size[sizes.index(None)]}', file=sys.stderr)
+        return 2
+    with ExitStack() as stack:
+        try:
+            index = stack.enter_context(GaugeIndex(args.index))
+        except GaugeIndexError as e:
+            print(e, file=sys.stderr)
+            return 2
+        if index.tablesVersion != stateVersion():
+            print('索引建立后查询表已更新，结果可能已过时，请重新运行 index', file=sys.stderr)
+        target = openText(stack, args.output, 'w')
+        writer = RecordWriter(target, args.output_format or detectFormat(args.output), ('size', *MATCH_FIELDS))
+        total = 0
+        for text, size in zip(args.size, sizes):
+            for match in index.query(args.feature, args.kind, size, args.worn):
+                writer.write({'size': text.strip(), **match.asRecord()})
+                total += 1
+    print(f'共 {total} 个零件', file=sys.stderr)
+    return 0
+
+def cmdCalibrate(args) -> int:
+    from batch import RecordWriter, detectFormat, readRows
+    try:
+        from calibration import RESULT_FIELDS, STATUS_TITLES, STATUSES, SUMMARY_FIELDS, CalibrationSummary, GaugeSpecs, calibrateRows
+    except ImportError:
+        print('校准验收需要 NumPy：pip install numpy', file=sys.stderr)
+        return 2
+
+    columns = {'gauge': args.gauge_column, 'id': args.id_column, 'kind': args.kind_column, 'size': args.size_column}
+    inputFormat = args.input_format or detectFormat(args.catalog)
+    engine = createEngine(args)
+    summary = CalibrationSummary()
+    with ExitStack() as stack:
+        source = openText(stack, args.catalog, 'r')
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        specs = GaugeSpecs(designRecords(args, readRows(source, inputFormat), engine))
+        target = openText(stack, args.output, 'w')
+        measurementFormat = args.measurement_format or detectFormat(args.measurements[0])
+        writer = RecordWriter(target, args.output_format or detectFormat(args.output, measurementFormat), RESULT_FIELDS)
+        for path in args.measurements:
+            with ExitStack() as fileStack:
+                rows = readRows(openText(fileStack, path, 'r'), args.measurement_format or detectFormat(path))
+                for record in calibrateRows(rows, specs, columns, args.kind, summary):
+                    if args.failed_only and record['status'] == 'inTolerance':
+                        continue
+                    writer.write(record)
+        if args.summary:
+            summaryTarget = openText(stack, args.summary, 'w')
+            summaryWriter = RecordWriter(summaryTarget, detectFormat(args.summary), SUMMARY_FIELDS)
+            for record in summary.records():
+                summaryWriter.write(record)
+    totals = list(summary.records())[-1]
+    print(
+        f'共 {totals["total"]} 只量规（目录中 {len(specs)} 个零件）：'
+        + '，'.join(f'{STATUS_TITLES[status]} {totals[status]}' for status in STATUSES),
+        file=sys.stderr
+    )
+    return 0
+
+def cmdWear(args) -> int:
+    from batch import RecordWriter, detectFormat, readRows
+    from sharing import gaugeZones
+    from weartrend import SCHEDULE_FIELDS, WearState
+
+    if args.catalog == '-' and args.state is None:
+        print('从标准输入读取目录时须指定 --state', file=sys.stderr)
+        return 2
+    columns = {'gauge': args.gauge_column, 'id': args.id_column, 'kind': args.kind_column, 'size': args.size_column, 'date': args.date_column}
+    inputFormat = args.input_format or detectFormat(args.catalog)
+    engine = createEngine(args)
+    with ExitStack() as stack:
+        state = stack.enter_context(WearState(args.state or f'{args.catalog}.wear.sqlite3'))
+        source = openText(stack, args.catalog, 'r')
+        close = getattr(engine, 'close', None)
+        if close is not None:
+            stack.callback(close)
+        zones = gaugeZones(designRecords(args, readRows(source, inputFormat), engine))
+        for path in args.measurements or [None]:
+            with ExitStack() as fileStack:
+                rows = [] if path is None else readRows(openText(fileStack, path, 'r'), args.measurement_format or detectFormat(path))
+                # 没有测量文件时也更新一次，使目录改动后的磨损极限生效
+                summary = state.update(rows, zones, columns)
+            if path is not None:
+                print(
+                    f'{path}：共 {summary.total} 行，新读数 {summary.added}（新登记量规 {summary.newGauges}），'
+                    f'重复 {summary.duplicate}，非通规 {summary.skipped}，无法使用 {len(summary.errors)}',
+                    file=sys.stderr
+                )
+            for rowNo, error in summary.errors[:10]:
+                print(f'  第 {rowNo} 行：{error}', file=sys.stderr)
+        target = openText(stack, args.output, 'w')
+        writer = RecordWriter(target, args.output_format or detectFormat(args.output), SCHEDULE_FIELDS)
+        counts = dict.fromkeys(('wornOut', 'due', 'scheduled'), 0)
+        for record in state.schedule(args.as_of, args.max_interval, args.lead):
+            counts[record['status']] += 1
+            if args.due_only and record['status'] == 'scheduled':
+                continue
+            writer.write(record)
+    print(f'共 {sum(counts.values())} 只通规：超过磨损极限 {counts["wornOut"]}，到期 {counts["due"]}，未到期 {counts["scheduled"]}', file=sys.stderr)
+    return 0
+
+def cmdCache(args) -> int:
+    from resultcache import ResultCache
+
+    with ResultCache(args.path or resultCachePath(args), args.max_entries) as cache:
+        if args.action == 'vacuum':
+            print(json.dumps(cache.vacuum(), ensure_ascii=False, indent=2))
+        print(json.dumps(cache.stats(), ensure_ascii=False, indent=2))
+    return 0
+
+def cmdServe(args) -> int:
+    import asyncio
+    from server import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.engine, args.max_batch_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def nonNegativeInt(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f'不能小于 0：{text}')
+    return value
+
+def positiveInt(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'必须大于 0：{text}')
+    return value
+
+def rangeArg(text: str):
+    from sweep import parseRange
+
+    try:
+        return parseRange(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def gradesArg(text: str) -> list[int]:
+    from sweep import parseGrades
+
+    try:
+        grades = parseGrades(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'应为 6-16、7 或 6,7,8 形式的公差等级：{text}')
+    if not grades or not all(1 <= it <= 18 for it in grades):
+        raise argparse.ArgumentTypeError(f'公差等级只能为 1-18：{text}')
+    return grades
+
+def dateArg(text: str):
+    from datetime import date
+
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'应为 YYYY-MM-DD 形式的日期：{text}')
+
+def buildParser() -> argparse.ArgumentParser:
+    from batch import ENGINES, PARALLEL_CHUNK_SIZE
+    from resultcache import CACHE_ENV, DEFAULT_MAX_ENTRIES
+    from report import LAYOUTS, REPORT_FORMATS
+    from sharing import MODES as SHARE_MODES
+    from sweep import SERIES
+    from weartrend import DEFAULT_LEAD_DAYS, DEFAULT_MAX_INTERVAL_DAYS
+    from decimal import Decimal
+
+    parser = argparse.ArgumentParser(
+        prog='plain-limit-gauge-designer',
+        description='光滑极限量规辅助设计工具，不带参数运行时打开图形界面'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='命令')
+
+    batch = subparsers.add_parser(
+        'batch', help='批量计算零件目录',
+        description='逐行读取 CSV/JSONL（列：id, feature, norminalSize, upperDeviation, lowerDeviation），逐行输出量规尺寸'
+    )
+    batch.add_argument('input', nargs='?', default='-', help='输入文件，默认标准输入')
+    batch.add_argument('-o', '--output', default='-', help='输出文件，默认标准输出')
+    batch.add_argument('--input-format', choices=('csv', 'jsonl'), help='输入格式，默认按扩展名判断，否则为 csv')
+    batch.add_argument('--output-format', choices=('csv', 'jsonl'), help='输出格式，默认按扩展名判断，否则与输入相同')
+    batch.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式：fixed 为整数（nm）计算，decimal 与界面相同，numpy 按块向量化计算（需安装 NumPy），结果均一致；默认 fixed')
+    batch.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，0 表示 CPU 核数；大于 1 时分块并行计算，输出顺序不变；默认 1')
+    batch.add_argument('--threads', action='store_true', help='--jobs 大于 1 时用线程代替进程，共用一个引擎；适合自由线程（free-threaded）Python')
+    batch.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    batch.add_argument('--result-cache', nargs='?', const='', metavar='PATH', help=f'使用磁盘结果缓存（SQLite），不带路径时为默认位置；未指定时由环境变量 {CACHE_ENV} 决定')
+    batch.add_argument('--profile', action='store_true', help='结束后在标准错误输出各查表方法的调用次数和用时；统计时不使用任何缓存，每个零件都实际查表')
+    batch.add_argument('--trace', action='store_true', help='在标准错误输出每次查表的参数和结果；同 --profile，不使用缓存')
+    batch.add_argument('--cache-stats', action='store_true', help='结束后在标准错误输出计算结果缓存和 IT/T1/Z1 查表缓存的命中统计')
+    batch.set_defaults(func=cmdBatch)
+
+    sweep = subparsers.add_parser(
+        'sweep', help='按尺寸、公差带或偏差扫描，输出完整量规表',
+        description='例如 --fit h7（默认 R20 优先尺寸 1-500 mm）、--size 20 --fit h --grades 6-16、'
+                    '--size 10:50:5 --feature shaft --upper 0 --lower=-0.01:-0.05:-0.01；输出列与 batch 相同'
+    )
+    sweep.add_argument('--fit', action='append', default=[], metavar='CODE', help='公差带代号（不含尺寸），如 h7、H8；只写 h、H 时按 --grades 展开；可重复')
+    sweep.add_argument('--grades', type=gradesArg, help='与只有基本偏差代号的 --fit 一起使用的公差等级，如 6-16')
+    sweep.add_argument('--feature', choices=('shaft', 'hole'), help='按偏差扫描时的零件特征')
+    sweep.add_argument('--upper', type=rangeArg, metavar='VALUE|FROM:TO:STEP', help='按偏差扫描时的上偏差，单位 mm；以负号开头时写作 --upper=-0.01')
+    sweep.add_argument('--lower', type=rangeArg, metavar='VALUE|FROM:TO:STEP', help='按偏差扫描时的下偏差，单位 mm；以负号开头时写作 --lower=-0.01')
+    sweep.add_argument('--size', type=rangeArg, action='append', metavar='VALUE|FROM:TO:STEP', help='名义尺寸，单位 mm，可重复；未指定时使用 --series')
+    sweep.add_argument('--series', choices=SERIES, default='R20', help='未指定 --size 时使用的优先数系，默认 R20')
+    sweep.add_argument('--from', dest='size_from', type=Decimal, default=Decimal(1), help='优先数尺寸下限，默认 1 mm')
+    sweep.add_argument('--to', dest='size_to', type=Decimal, default=Decimal(500), help='优先数尺寸上限，默认 500 mm')
+    sweep.add_argument('-o', '--output', default='-', help='输出文件，默认标准输出')
+    sweep.add_argument('--output-format', choices=('csv', 'jsonl'), help='输出格式，默认按扩展名判断，否则为 csv')
+    sweep.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    sweep.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，同 batch；默认 1')
+    sweep.add_argument('--threads', action='store_true', help='同 batch')
+    sweep.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    sweep.set_defaults(func=cmdSweep, profile=False, trace=False)
+
+    report = subparsers.add_parser(
+        'report', help='批量计算并输出交给量规车间的数据表（HTML/CSV/XLSX）',
+        description='输入与 batch 相同；--layout summary 为一个零件一行的汇总表，sheets 为每个零件一张数据表（HTML 打印时每张一页）'
+    )
+    report.add_argument('input', nargs='?', default='-', help='输入文件，默认标准输入')
+    report.add_argument('-o', '--output', default='-', help='输出文件，默认标准输出；以 .gz 结尾时 gzip 压缩')
+    report.add_argument('--input-format', choices=('csv', 'jsonl'), help='输入格式，默认按扩展名判断，否则为 csv')
+    report.add_argument('--format', choices=REPORT_FORMATS, help='报表格式，默认按扩展名判断，否则为 html')
+    report.add_argument('--layout', choices=LAYOUTS, default='summary', help='版式，默认 summary')
+    report.add_argument('--title', default='量规数据表', help='报表标题，默认“量规数据表”')
+    report.add_argument('--gzip', action='store_true', help='gzip 压缩 HTML/CSV 输出')
+    report.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    report.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，同 batch；默认 1')
+    report.add_argument('--threads', action='store_true', help='同 batch')
+    report.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    report.add_argument('--result-cache', nargs='?', const='', metavar='PATH', help='同 batch')
+    report.set_defaults(func=cmdReport, profile=False, trace=False)
+
+    update = subparsers.add_parser(
+        'update', help='增量计算零件目录，只重新计算改动的行并输出量规尺寸的差异',
+        description='输入与 batch 相同，行以 id 列区分；状态（每行的摘要和结果）保存在 --state 指定的 SQLite 文件中。'
+                    '差异每行一条：change 为 added、modified（每个变化的字段一条，含 old、new）或 removed'
+    )
+    update.add_argument('input', help='零件目录文件')
+    update.add_argument('--state', help='状态文件，默认为目录文件名加 .state.sqlite3')
+    update.add_argument('--diff', default='-', help='差异输出文件，默认标准输出')
+    update.add_argument('--diff-format', choices=('csv', 'jsonl'), help='差异格式，默认按扩展名判断，否则为 csv')
+    update.add_argument('-o', '--output', help='同时写出完整的计算结果（与 batch 的输出相同）')
+    update.add_argument('--output-format', choices=('csv', 'jsonl'), help='完整结果的格式，默认按扩展名判断，否则与输入相同')
+    update.add_argument('--input-format', choices=('csv', 'jsonl'), help='输入格式，默认按扩展名判断，否则为 csv')
+    update.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    update.add_argument('--watch', action='store_true', help='持续监视目录文件，每次改动后增量计算，Ctrl+C 退出')
+    update.add_argument('--interval', type=float, default=2.0, help='--watch 的轮询间隔，单位秒，默认 2')
+    update.set_defaults(func=cmdUpdate, profile=False, trace=False)
+
+    share = subparsers.add_parser(
+        'share', help='找出零件目录中可以共用的工作量规，输出合并后的量规清单',
+        description='输入与 batch 相同；同一零件特征、同一种量规（通规/止规）的公差带有共同部分时合并为一只，'
+                    '清单中的上下极限为共同部分，通规的磨损极限取最严的一个，parts 列出共用的零件'
+    )
+    share.add_argument('input', nargs='?', default='-', help='输入文件，默认标准输入')
+    share.add_argument('-o', '--output', default='-', help='量规清单输出文件，默认标准输出')
+    share.add_argument('--input-format', choices=('csv', 'jsonl'), help='输入格式，默认按扩展名判断，否则为 csv')
+    share.add_argument('--output-format', choices=('csv', 'jsonl'), help='输出格式，默认按扩展名判断，否则与输入相同')
+    share.add_argument('--mode', choices=SHARE_MODES, default='overlap', help='exact 只合并完全相同的量规，overlap 按公差带的交集合并；默认 overlap')
+    share.add_argument('--min-tolerance', type=Decimal, default=Decimal('0.001'), metavar='MM', help='overlap 时共用公差带的最小宽度，单位 mm，默认 0.001')
+    share.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    share.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，同 batch；默认 1')
+    share.add_argument('--threads', action='store_true', help='同 batch')
+    share.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    share.set_defaults(func=cmdShare, profile=False, trace=False)
+
+    index = subparsers.add_parser(
+        'index', help='由零件目录建立量规反查索引',
+        description='输入与 batch 相同；索引保存各零件通规、止规的公差带，供 lookup 查询'
+    )
+    index.add_argument('input', nargs='?', default='-', help='输入文件，默认标准输入')
+    index.add_argument('-o', '--output', required=True, help='索引文件')
+    index.add_argument('--input-format', choices=('csv', 'jsonl'), help='输入格式，默认按扩展名判断，否则为 csv')
+    index.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    index.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，同 batch；默认 1')
+    index.add_argument('--threads', action='store_true', help='同 batch')
+    index.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    index.set_defaults(func=cmdIndex, profile=False, trace=False)
+
+    lookup = subparsers.add_parser(
+        'lookup', help='查已有量规可以检验目录中的哪些零件',
+        description='例如 lookup parts.gidx --feature shaft --kind goGauge --size 19.9962；输出公差带包含实测尺寸的零件'
+    )
+    lookup.add_argument('index', help='index 建立的索引文件')
+    lookup.add_argument('--feature', choices=('shaft', 'hole'), required=True, help='被检零件特征：shaft 为卡规、环规，hole 为塞规')
+    lookup.add_argument('--kind', choices=('goGauge', 'noGoGauge'), required=True, help='量规种类：goGauge 为通规，noGoGauge 为止规')
+    lookup.add_argument('--size', action='append', required=True, metavar='MM', help='量规实测尺寸，单位 mm，可重复')
+    lookup.add_argument('--worn', action='store_true', help='通规包含已磨损但未超过磨损极限的情况（worn 列为 yes）')
+    lookup.add_argument('-o', '--output', default='-', help='输出文件，默认标准输出')
+    lookup.add_argument('--output-format', choices=('csv', 'jsonl'), help='输出格式，默认按扩展名判断，否则为 csv')
+    lookup.set_defaults(func=cmdLookup)
+
+    calibrate = subparsers.add_parser(
+        'calibrate', help='按三坐标测量结果验收量规',
+        description='目录输入与 batch 相同；测量文件每行一只量规，列为 gauge（量规编号，可选）、id（零件编号）、kind（量规种类）、size（实测尺寸，mm），'
+                    '输出每只量规的公差带和判定结果'
+    )
+    calibrate.add_argument('catalog', help='零件目录文件')
+    calibrate.add_argument('measurements', nargs='+', help='测量文件，可多个，- 表示标准输入')
+    calibrate.add_argument('-o', '--output', default='-', help='判定结果输出文件，默认标准输出')
+    calibrate.add_argument('--summary', metavar='PATH', help='按量规种类统计的汇总表输出文件（csv 或 jsonl）')
+    calibrate.add_argument('--failed-only', action='store_true', help='只输出不合格（含无法对应）的量规')
+    calibrate.add_argument('--input-format', choices=('csv', 'jsonl'), help='目录格式，默认按扩展名判断，否则为 csv')
+    calibrate.add_argument('--measurement-format', choices=('csv', 'jsonl'), help='测量文件格式，默认按扩展名判断，否则为 csv')
+    calibrate.add_argument('--output-format', choices=('csv', 'jsonl'), help='输出格式，默认按扩展名判断，否则与测量文件相同')
+    calibrate.add_argument('--gauge-column', default='gauge', help='测量文件中量规编号的列名，默认 gauge')
+    calibrate.add_argument('--id-column', default='id', help='测量文件中零件编号的列名，默认 id')
+    calibrate.add_argument('--kind-column', default='kind', help='测量文件中量规种类的列名，默认 kind')
+    calibrate.add_argument('--size-column', default='size', help='测量文件中实测尺寸的列名，默认 size')
+    calibrate.add_argument('--kind', help='量规种类列为空或没有该列时使用的种类，如 goGauge、T、通规')
+    calibrate.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    calibrate.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，同 batch；默认 1')
+    calibrate.add_argument('--threads', action='store_true', help='同 batch')
+    calibrate.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    calibrate.set_defaults(func=cmdCalibrate, profile=False, trace=False)
+
+    wear = subparsers.add_parser(
+        'wear', help='记录通规的历次实测尺寸，按磨损趋势给出重新校准计划',
+        description='目录输入与 batch 相同；测量文件与 calibrate 相同，另有 date 列（测量日期），非通规的行忽略。'
+                    '读数累计保存在状态文件中，每次只需导入新的测量文件；不给测量文件时只输出计划'
+    )
+    wear.add_argument('catalog', help='零件目录文件，提供各通规的磨损极限')
+    wear.add_argument('measurements', nargs='*', help='新的测量文件，可多个，- 表示标准输入')
+    wear.add_argument('--state', help='状态文件，默认为目录文件名加 .wear.sqlite3')
+    wear.add_argument('-o', '--output', default='-', help='校准计划输出文件，默认标准输出')
+    wear.add_argument('--as-of', type=dateArg, metavar='DATE', help='计划日期，校准日期不晚于它的为到期（due），默认今天')
+    wear.add_argument('--max-interval', type=positiveInt, default=DEFAULT_MAX_INTERVAL_DAYS, metavar='DAYS', help=f'最长校准间隔，单位天，默认 {DEFAULT_MAX_INTERVAL_DAYS}')
+    wear.add_argument('--lead', type=nonNegativeInt, default=DEFAULT_LEAD_DAYS, metavar='DAYS', help=f'在预计到达磨损极限前多少天校准，默认 {DEFAULT_LEAD_DAYS}')
+    wear.add_argument('--due-only', action='store_true', help='只输出到期和超过磨损极限的通规')
+    wear.add_argument('--input-format', choices=('csv', 'jsonl'), help='目录格式，默认按扩展名判断，否则为 csv')
+    wear.add_argument('--measurement-format', choices=('csv', 'jsonl'), help='测量文件格式，默认按扩展名判断，否则为 csv')
+    wear.add_argument('--output-format', choices=('csv', 'jsonl'), help='输出格式，默认按扩展名判断，否则为 csv')
+    wear.add_argument('--gauge-column', default='gauge', help='量规编号的列名，默认 gauge；为空时以零件编号作为量规编号')
+    wear.add_argument('--id-column', default='id', help='零件编号的列名，默认 id')
+    wear.add_argument('--kind-column', default='kind', help='量规种类的列名，默认 kind；没有该列时全部视为通规')
+    wear.add_argument('--size-column', default='size', help='实测尺寸的列名，默认 size')
+    wear.add_argument('--date-column', default='date', help='测量日期（ISO 8601 日期或日期时间）的列名，默认 date')
+    wear.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    wear.add_argument('-j', '--jobs', type=nonNegativeInt, default=1, help='计算进程数，同 batch；默认 1')
+    wear.add_argument('--threads', action='store_true', help='同 batch')
+    wear.add_argument('--chunk-size', type=positiveInt, default=PARALLEL_CHUNK_SIZE, help=f'并行计算时每块的行数，默认 {PARALLEL_CHUNK_SIZE}')
+    wear.set_defaults(func=cmdWear, profile=False, trace=False)
+
+    cache = subparsers.add_parser(
+        'cache', help='查看或整理磁盘结果缓存',
+        description='stats：输出条目数、文件大小等；vacuum：删除旧查询表版本的条目，淘汰到 --max-entries 以内并整理文件'
+    )
+    cache.add_argument('action', choices=('stats', 'vacuum'), help='操作')
+    cache.add_argument('--path', help=f'缓存文件，默认由环境变量 {CACHE_ENV} 决定，未设置时为默认位置')
+    cache.add_argument('--max-entries', type=positiveInt, default=DEFAULT_MAX_ENTRIES, help=f'最多保留的条目数，默认 {DEFAULT_MAX_ENTRIES}')
+    cache.set_defaults(func=cmdCache)
+
+    serve = subparsers.add_parser(
+        'serve', help='启动本机 HTTP/JSON 计算服务',
+        description='提供 GET/POST /design（单个零件）、POST /batch（JSON 数组）、GET /stats（请求数和用时百分位数）'
+    )
+    serve.add_argument('--host', default='127.0.0.1', help='监听地址，默认 127.0.0.1（仅本机）')
+    serve.add_argument('--port', type=nonNegativeInt, default=8765, help='监听端口，0 表示自动选择，默认 8765')
+    serve.add_argument('--engine', choices=ENGINES, default='fixed', help='计算方式，同 batch；默认 fixed')
+    serve.add_argument('--max-batch-size', type=positiveInt, default=256, help='同时到达的 /design 请求最多合并多少个一起计算，默认 256')
+    serve.set_defaults(func=cmdServe)
+
+    return parser
+
+def runCli(argv: list[str]) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv (list[str]): 命令行参数，不含程序名
+
+    Returns:
+        int: 退出码
+    """
+    for name in ('stdout', 'stderr'):
+        if getattr(sys, name) is None:
+            # 打包的程序不在控制台中运行时（如从快捷方式带参数启动）没有标准输出，print 会出错；
+            # 此时丢弃提示信息，输出应写到 -o 指定的文件
+            setattr(sys, name, open(os.devnull, 'w', encoding='utf-8'))
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.func(args)
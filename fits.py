@@ -0,0 +1,418 @@
+"""
+ISO 286-1/-2（GB/T 1800.1/.2）公差带代号，例如 Ø20h7、50H8，查得上下偏差后交给量规计算。
+
+支持 0-500 mm、IT1-IT18，轴 a-u（含 cd、ef、fg、js、j、k），孔 A-U（含 CD、EF、FG、JS、J、K）。
+孔的基本偏差按 ISO 286-1 的通用规则和特殊规则（Δ = ITn - IT(n-1)）由轴的基本偏差换算，J 单独查表。
+"""
+from querydata import DECIMAL_CONTEXT
+from gaugedesign import GaugeDesignError, parseNumber
+
+import hashlib
+import json
+import re
+import threading
+from bisect import bisect_left
+from decimal import Decimal, localcontext
+from types import MappingProxyType
+from typing import Literal, NamedTuple
+
+class FitCodeError(GaugeDesignError):
+    """
+    公差带代号无效或 ISO 286 中没有对应的偏差
+    """
+
+class FitTolerance(NamedTuple):
+    """
+    由公差带代号查得的零件尺寸，单位：mm
+    """
+    feature: Literal['hole', 'shaft']
+    norminalSize: Decimal
+    code: str
+    it: int
+    upperDeviation: Decimal
+    lowerDeviation: Decimal
+
+# 公差带代号：可选的直径符号和名义尺寸、基本偏差代号、公差等级，例如 Ø20h7、20 H8、js6
+_FIT_CODE = re.compile(r'\s*(?:[Øø⌀Φφ]\s*)?(\d+(?:\.\d*)?|\.\d+)?\s*([A-Za-z]{1,2})\s*(\d{1,2})\s*', re.ASCII)
+
+def parseFitCode(text: str) -> tuple[Decimal | None, str, int]:
+    """
+    解析公差带代号
+
+    Args:
+        text (str): 例如 'Ø20h7'、'50H8'、'h7'
+
+    Returns:
+        tuple: (名义尺寸（代号中没有时为 None）, 基本偏差代号, 公差等级)
+
+    Raises:
+        FitCodeError: 格式不正确
+    """
+    match = _FIT_CODE.fullmatch(text)
+    if match is None:
+        raise FitCodeError(f'公差带代号格式不正确：{text.strip()}，应为 h7、Ø20h7、50H8 等')
+    size, code, grade = match.groups()
+    return None if size is None else Decimal(size), code, int(grade)
+
+class FitData:
+    """
+    ISO 286 标准公差和基本偏差表，编译为按 (基本偏差代号, 公差等级) 索引、按尺寸段排列的上下偏差。
+
+    与 QueryData 相同，表在进程内只解析、编译一次，实例不可修改，可在多个线程间共享
+    """
+    # 标准公差数值，单位：μm，尺寸段为 (下限, 上限]，IT 为 IT1-IT18
+    itJson = '''
+    [
+        {"nominal": [0, 3], "IT": [0.8, 1.2, 2, 3, 4, 6, 10, 14, 25, 40, 60, 100, 140, 250, 400, 600, 1000, 1400]},
+        {"nominal": [3, 6], "IT": [1, 1.5, 2.5, 4, 5, 8, 12, 18, 30, 48, 75, 120, 180, 300, 480, 750, 1200, 1800]},
+        {"nominal": [6, 10], "IT": [1, 1.5, 2.5, 4, 6, 9, 15, 22, 36, 58, 90, 150, 220, 360, 580, 900, 1500, 2200]},
+        {"nominal": [10, 18], "IT": [1.2, 2, 3, 5, 8, 11, 18, 27, 43, 70, 110, 180, 270, 430, 700, 1100, 1800, 2700]},
+        {"nominal": [18, 30], "IT": [1.5, 2.5, 4, 6, 9, 13, 21, 33, 52, 84, 130, 210, 330, 520, 840, 1300, 2100, 3300]},
+        {"nominal": [30, 50], "IT": [1.5, 2.5, 4, 7, 11, 16, 25, 39, 62, 100, 160, 250, 390, 620, 1000, 1600, 2500, 3900]},
+        {"nominal": [50, 80], "IT": [2, 3, 5, 8, 13, 19, 30, 46, 74, 120, 190, 300, 460, 740, 1200, 1900, 3000, 4600]},
+        {"nominal": [80, 120], "IT": [2.5, 4, 6, 10, 15, 22, 35, 54, 87, 140, 220, 350, 540, 870, 1400, 2200, 3500, 5400]},
+        {"nominal": [120, 180], "IT": [3.5, 5, 8, 12, 18, 25, 40, 63, 100, 160, 250, 400, 630, 1000, 1600, 2500, 4000, 6300]},
+        {"nominal": [180, 250], "IT": [4.5, 7, 10, 14, 20, 29, 46, 72, 115, 185, 290, 460, 720, 1150, 1850, 2900, 4600, 7200]},
+        {"nominal": [250, 315], "IT": [6, 8, 12, 16, 23, 32, 52, 81, 130, 210, 320, 520, 810, 1300, 2100, 3200, 5200, 8100]},
+        {"nominal": [315, 400], "IT": [7, 9, 13, 18, 25, 36, 57, 89, 140, 230, 360, 570, 890, 1400, 2300, 3600, 5700, 8900]},
+        {"nominal": [400, 500], "IT": [8, 10, 15, 20, 27, 40, 63, 97, 155, 250, 400, 630, 970, 1550, 2500, 4000, 6300, 9700]}
+    ]
+    '''
+
+    # 轴的基本偏差，单位：μm。a-h 为上偏差 es，j-u 为下偏差 ei；
+    # nominal 为尺寸段断点，values 依次为各尺寸段 (nominal[i], nominal[i + 1]] 的数值，IT 为适用的公差等级范围
+    shaftDeviationJson = '''
+    [
+        {"code": "a", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 40, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [-270, -270, -280, -290, -300, -310, -320, -340, -360, -380, -410, -460, -520, -580, -660, -740, -820, -920, -1050, -1200, -1350, -1500, -1650]},
+        {"code": "b", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 40, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [-140, -140, -150, -150, -160, -170, -180, -190, -200, -220, -240, -260, -280, -310, -340, -380, -420, -480, -540, -600, -680, -760, -840]},
+        {"code": "c", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 40, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [-60, -70, -80, -95, -110, -120, -130, -140, -150, -170, -180, -200, -210, -230, -240, -260, -280, -300, -330, -360, -400, -440, -480]},
+        {"code": "cd", "deviation": "es", "IT": [1, 18], "nominal": [0, 3, 6, 10], "values": [-34, -46, -56]},
+        {"code": "d", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [-20, -30, -40, -50, -65, -80, -100, -120, -145, -170, -190, -210, -230]},
+        {"code": "e", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [-14, -20, -25, -32, -40, -50, -60, -72, -85, -100, -110, -125, -135]},
+        {"code": "ef", "deviation": "es", "IT": [1, 18], "nominal": [0, 3, 6, 10], "values": [-10, -14, -18]},
+        {"code": "f", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [-6, -10, -13, -16, -20, -25, -30, -36, -43, -50, -56, -62, -68]},
+        {"code": "fg", "deviation": "es", "IT": [1, 18], "nominal": [0, 3, 6, 10], "values": [-4, -6, -8]},
+        {"code": "g", "deviation": "es", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [-2, -4, -5, -6, -7, -9, -10, -12, -14, -15, -17, -18, -20]},
+        {"code": "h", "deviation": "es", "IT": [1, 18], "nominal": [0, 500], "values": [0]},
+        {"code": "j", "deviation": "ei", "IT": [5, 6],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [-2, -2, -2, -3, -4, -5, -7, -9, -11, -13, -16, -18, -20]},
+        {"code": "j", "deviation": "ei", "IT": [7, 7],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [-4, -4, -5, -6, -8, -10, -12, -15, -18, -21, -26, -28, -32]},
+        {"code": "j", "deviation": "ei", "IT": [8, 8], "nominal": [0, 3], "values": [-6]},
+        {"code": "k", "deviation": "ei", "IT": [1, 3], "nominal": [0, 500], "values": [0]},
+        {"code": "k", "deviation": "ei", "IT": [4, 7],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [0, 1, 1, 1, 2, 2, 2, 3, 3, 4, 4, 4, 5]},
+        {"code": "k", "deviation": "ei", "IT": [8, 18], "nominal": [0, 500], "values": [0]},
+        {"code": "m", "deviation": "ei", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [2, 4, 6, 7, 8, 9, 11, 13, 15, 17, 20, 21, 23]},
+        {"code": "n", "deviation": "ei", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [4, 8, 10, 12, 15, 17, 20, 23, 27, 31, 34, 37, 40]},
+        {"code": "p", "deviation": "ei", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [6, 12, 15, 18, 22, 26, 32, 37, 43, 50, 56, 62, 68]},
+        {"code": "r", "deviation": "ei", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [10, 15, 19, 23, 28, 34, 41, 43, 51, 54, 63, 65, 68, 77, 80, 84, 94, 98, 108, 114, 126, 132]},
+        {"code": "s", "deviation": "ei", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [14, 19, 23, 28, 35, 43, 53, 59, 71, 79, 92, 100, 108, 122, 130, 140, 158, 170, 190, 208, 232, 252]},
+        {"code": "t", "deviation": "ei", "IT": [1, 18],
+         "nominal": [24, 30, 40, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [41, 48, 54, 66, 75, 91, 104, 122, 134, 146, 166, 180, 196, 218, 240, 268, 294, 330, 360]},
+        {"code": "u", "deviation": "ei", "IT": [1, 18],
+         "nominal": [0, 3, 6, 10, 18, 24, 30, 40, 50, 65, 80, 100, 120, 140, 160, 180, 200, 225, 250, 280, 315, 355, 400, 450, 500],
+         "values": [18, 23, 28, 33, 41, 48, 60, 70, 87, 102, 124, 144, 170, 190, 210, 236, 258, 284, 315, 350, 390, 435, 490, 540]}
+    ]
+    '''
+
+    # 孔 J 的上偏差 ES，单位：μm，不能由轴的基本偏差换算
+    holeJJson = '''
+    [
+        {"code": "J", "deviation": "ES", "IT": [6, 6],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [2, 5, 5, 6, 8, 10, 13, 16, 18, 22, 25, 29, 33]},
+        {"code": "J", "deviation": "ES", "IT": [7, 7],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [4, 6, 8, 10, 12, 14, 18, 22, 26, 30, 36, 39, 43]},
+        {"code": "J", "deviation": "ES", "IT": [8, 8],
+         "nominal": [0, 3, 6, 10, 18, 30, 50, 80, 120, 180, 250, 315, 400, 500],
+         "values": [6, 10, 12, 15, 20, 24, 28, 34, 41, 47, 55, 60, 66]}
+    ]
+    '''
+
+    GRADES = tuple(range(1, 19))
+    SHAFT_CODES = ('a', 'b', 'c', 'cd', 'd', 'e', 'ef', 'f', 'fg', 'g', 'h', 'js', 'j', 'k', 'm', 'n', 'p', 'r', 's', 't', 'u')
+    HOLE_CODES = tuple(code.upper() for code in SHAFT_CODES)
+
+    _TABLE_NAMES = ('_rangeMaxs', '_rangeMins', '_its', '_deviations')
+    __slots__ = _TABLE_NAMES
+    _tables = None
+    _tablesLock = threading.Lock()
+
+    def __init__(self):
+        if FitData._tables is None:
+            with FitData._tablesLock:
+                if FitData._tables is None:
+                    FitData._tables = FitData._compileTables(*FitData.parseTables())
+        for name, table in zip(FitData._TABLE_NAMES, FitData._tables):
+            object.__setattr__(self, name, table)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'FitData 不可修改：{name}')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'FitData 不可修改：{name}')
+
+    @staticmethod
+    def parseTables() -> tuple:
+        """
+        解析类中内嵌的 JSON 表，数值转为 Decimal（μm）
+
+        Returns:
+            tuple: (itData, shaftDeviationData, holeJData)。
+                itData: (((尺寸下限, 尺寸上限), (IT1, ..., IT18)), ...)；
+                后两者: ((代号, 'es' / 'ei' / 'ES', (IT下限, IT上限), 尺寸段断点, 各尺寸段数值), ...)
+        """
+        itData = tuple(
+            (tuple(Decimal(str(x)) for x in item['nominal']), tuple(Decimal(str(x)) for x in item['IT']))
+            for item in json.loads(FitData.itJson)
+        )
+
+        def deviations(text):
+            return tuple(
+                (
+                    item['code'], item['deviation'], tuple(item['IT']),
+                    tuple(Decimal(str(x)) for x in item['nominal']),
+                    tuple(Decimal(str(x)) for x in item['values'])
+                )
+                for item in json.loads(text)
+            )
+
+        return itData, deviations(FitData.shaftDeviationJson), deviations(FitData.holeJJson)
+
+    @staticmethod
+    def _compileTables(itData, shaftDeviationData, holeJData) -> tuple:
+        """
+        按全部断点划分尺寸段，算出每个 (代号, 公差等级) 在各尺寸段的 (上偏差, 下偏差)，单位换算为 mm；
+        ISO 286 中没有的组合为 None。查询时只需二分查找尺寸段再按下标取值。
+
+        Returns:
+            tuple: 按 _TABLE_NAMES 顺序排列的各表
+        """
+        breakpoints = {x for (sizeMin, sizeMax), _ in itData for x in (sizeMin, sizeMax)}
+        for _, _, _, nominal, _ in shaftDeviationData + holeJData:
+            breakpoints.update(nominal)
+        breakpoints = sorted(breakpoints)
+        rangeMins, rangeMaxs = tuple(breakpoints[:-1]), tuple(breakpoints[1:])
+
+        def lookup(nominal, values, sizeMax):
+            i = bisect_left(nominal, sizeMax)
+            if 0 < i < len(nominal):
+                return values[i - 1]
+            return None
+
+        # 各尺寸段的 IT1-IT18（μm）
+        its = tuple(
+            next(grades for (sizeMin, sizeMax), grades in itData if sizeMin < rangeMax <= sizeMax)
+            for rangeMax in rangeMaxs
+        )
+
+        def tableDeviation(data, code, it, rangeMax):
+            for itemCode, _, (itMin, itMax), nominal, values in data:
+                if itemCode == code and itMin <= it <= itMax:
+                    return lookup(nominal, values, rangeMax)
+            return None
+
+        # 表中给出上偏差 es 的轴基本偏差代号，其余给出下偏差 ei
+        upperCodes = {code for code, deviation, _, _, _ in shaftDeviationData if deviation == 'es'}
+
+        def shaftLimits(code, it, r):
+            """
+            轴：a-h 由上偏差 es 得下偏差 es - IT，j-u 由下偏差 ei 得上偏差 ei + IT，js 对称
+            """
+            tolerance = its[r][it - 1]
+            if code == 'js':
+                return FitData._symmetric(tolerance, it)
+            value = tableDeviation(shaftDeviationData, code, it, rangeMaxs[r])
+            if value is None:
+                return None
+            if code in upperCodes:
+                return value, value - tolerance
+            return value + tolerance, value
+
+        def holeLimits(code, it, r):
+            """
+            孔：A-H 的下偏差 EI = -es；K、M、N（≤IT8）和 P-U（≤IT7）的上偏差 ES = -ei + Δ，
+            其余 K-U 的 ES = -ei，但 K、N 高于 IT8 时 ES = 0（3 mm 以下的 N 仍为 -4 μm）
+            """
+            tolerance = its[r][it - 1]
+            shaftCode = code.lower()
+            if code == 'JS':
+                return FitData._symmetric(tolerance, it)
+            if code == 'J':
+                upper = tableDeviation(holeJData, code, it, rangeMaxs[r])
+                return None if upper is None else (upper, upper - tolerance)
+            if shaftCode in upperCodes:
+                es = tableDeviation(shaftDeviationData, shaftCode, it, rangeMaxs[r])
+                return None if es is None else (-es + tolerance, -es)
+
+            # K、M、N 用轴 IT4-IT7 的 ei（m、n 与公差等级无关）
+            ei = tableDeviation(shaftDeviationData, shaftCode, 7, rangeMaxs[r])
+            if ei is None:
+                return None
+            deltaMaxIt = 8 if code in ('K', 'M', 'N') else 7
+            if it <= deltaMaxIt:
+                if rangeMaxs[r] <= 3:
+                    delta = 0
+                elif it >= 3:
+                    delta = its[r][it - 1] - its[r][it - 2]
+                else:
+                    # ISO 286 只给出 IT3-IT8 的 Δ
+                    return None
+                upper = -ei + delta
+                # 特殊情况：250-315 mm 的 M6 为 -9 μm
+                if code == 'M' and it == 6 and rangeMins[r] >= 250 and rangeMaxs[r] <= 315:
+                    upper = Decimal(-9)
+            elif code == 'K' or (code == 'N' and rangeMaxs[r] > 3):
+                upper = Decimal(0)
+            else:
+                upper = -ei
+            return upper, upper - tolerance
+
+        deviations = {}
+        with localcontext(DECIMAL_CONTEXT):
+            for codes, limits in ((FitData.SHAFT_CODES, shaftLimits), (FitData.HOLE_CODES, holeLimits)):
+                for code in codes:
+                    for it in FitData.GRADES:
+                        compiled = []
+                        for r in range(len(rangeMaxs)):
+                            result = limits(code, it, r)
+                            # 加 0 使 -0 成为 0，与手工输入的 0 显示相同
+                            compiled.append(None if result is None else tuple(x / 1000 + 0 for x in result))
+                        deviations[(code, it)] = tuple(compiled)
+
+        return rangeMaxs, rangeMins, its, MappingProxyType(deviations)
+
+    @staticmethod
+    def _symmetric(tolerance: Decimal, it: int) -> tuple[Decimal, Decimal]:
+        """
+        js、JS：±IT/2；IT7-IT11 的 IT 值为奇数 μm 时取 ±(IT-1)/2
+        """
+        if 7 <= it <= 11 and tolerance % 2 == 1:
+            tolerance -= 1
+        half = tolerance / 2
+        return half, -half
+
+    def queryRange(self, norminalSize: Decimal) -> int | None:
+        """
+        Returns:
+            int | None: 名义尺寸所属的尺寸段序号（sizeMin < norminalSize <= sizeMax），超出 0-500 mm 时为 None
+        """
+        r = bisect_left(self._rangeMaxs, norminalSize)
+        if r == len(self._rangeMaxs) or not self._rangeMins[r] < norminalSize:
+            return None
+        return r
+
+    def rangeBounds(self, r: int) -> tuple[Decimal, Decimal]:
+        """
+        Returns:
+            tuple: 尺寸段的 (sizeMin, sizeMax)，单位：mm
+        """
+        return self._rangeMins[r], self._rangeMaxs[r]
+
+    def queryIt(self, norminalSize: Decimal, it: int) -> Decimal | None:
+        """
+        Returns:
+            Decimal | None: 标准公差，单位：μm
+        """
+        r = self.queryRange(norminalSize)
+        if r is None or it not in FitData.GRADES:
+            return None
+        return self._its[r][it - 1]
+
+    @staticmethod
+    def _checkCode(code: str, it: int):
+        if code not in FitData.SHAFT_CODES and code not in FitData.HOLE_CODES:
+            raise FitCodeError(f'不支持的基本偏差代号：{code}，轴为 {"、".join(FitData.SHAFT_CODES)}，孔为对应的大写字母')
+        if it not in FitData.GRADES:
+            raise FitCodeError(f'公差等级只能为 IT1-IT18：IT{it}')
+
+    def queryDeviations(self, norminalSize: Decimal, code: str, it: int) -> tuple[Decimal, Decimal]:
+        """
+        查询公差带的上下偏差
+
+        Args:
+            norminalSize (Decimal): 名义尺寸，单位：mm，范围大于 0 至 500
+            code (str): 基本偏差代号，小写为轴、大写为孔
+            it (int): 公差等级 1-18
+
+        Returns:
+            tuple: (上偏差, 下偏差)，单位：mm
+
+        Raises:
+            FitCodeError: 代号、公差等级或尺寸超出范围，或 ISO 286 中没有该公差带
+        """
+        FitData._checkCode(code, it)
+        r = self.queryRange(norminalSize)
+        if r is None:
+            raise FitCodeError('公差带代号仅适用于名义尺寸大于 0 至 500 mm')
+        if norminalSize <= 1 and (it >= 14 or code in ('a', 'b', 'A', 'B')):
+            raise FitCodeError(f'ISO 286 规定名义尺寸不大于 1 mm 时不使用 {code}{it}')
+        deviations = self._deviations[(code, it)][r]
+        if deviations is None:
+            raise FitCodeError(f'ISO 286 中没有名义尺寸 {self._rangeMins[r]}-{self._rangeMaxs[r]} mm 的 {code}{it}')
+        return deviations
+
+    def resolve(self, fitCode: str, norminalSize: str = '') -> FitTolerance:
+        """
+        由公差带代号得到零件特征和上下偏差
+
+        Args:
+            fitCode (str): 公差带代号，例如 'Ø20h7'、'H8'
+            norminalSize (str): 代号中没有名义尺寸时使用的名义尺寸，单位：mm
+
+        Returns:
+            FitTolerance: 小写代号为轴（shaft），大写代号为孔（hole）
+
+        Raises:
+            FitCodeError: 代号格式不正确、与名义尺寸不一致或查不到偏差
+        """
+        size, code, it = parseFitCode(fitCode)
+        FitData._checkCode(code, it)
+        value = parseNumber(norminalSize)
+        if size is None:
+            if value is None:
+                raise FitCodeError('名义尺寸：未输完整')
+            if value is False:
+                raise FitCodeError('名义尺寸：只能输入数字')
+            size = value
+        elif value not in (None, False) and value != size:
+            raise FitCodeError(f'公差带代号中的名义尺寸 {size} 与输入的名义尺寸 {norminalSize.strip()} 不一致')
+
+        feature = 'shaft' if code in FitData.SHAFT_CODES else 'hole'
+        upperDeviation, lowerDeviation = self.queryDeviations(size, code, it)
+        return FitTolerance(feature, size, f'{code}{it}', it, upperDeviation, lowerDeviation)
+
+# 内嵌 JSON 表的摘要，表数据有任何修改都会变化，与 querydata.TABLES_VERSION 相同
+FIT_TABLES_VERSION = hashlib.sha256(
+    '\0'.join((FitData.itJson, FitData.shaftDeviationJson, FitData.holeJJson)).encode('utf-8')
+).hexdigest()
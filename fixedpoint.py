@@ -0,0 +1,454 @@
+from querydata import QueryData, TABLES_VERSION, DECIMAL_CONTEXT
+from gaugedesign import (
+    GaugeDesign, GaugeDesignEngine, GaugeDesignError, ToleranceGradeError,
+    GAUGE_FIELDS, GAUGE_DIMENSION_SUFFIXES, DESIGN_CACHE_SIZE, IT_T1_Z1_CACHE_SIZE, fmt
+)
+
+import re
+from array import array
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, InvalidOperation, localcontext
+from typing import Iterable, Iterator, Literal, NamedTuple
+
+# 整数计算单位：nm，1 mm = 1000000 nm，表 3、表 4、表 A.1 中的数值都是 nm 的整数倍
+NM_PER_MM = 1_000_000
+# 输入最多 6 位小数，且绝对值小于 2500 mm 时，所有中间结果都不超过 10 位有效数字，
+# 与 Decimal（精度 10 位）计算结果完全一致；超出范围的输入改用 Decimal 计算
+MAX_INPUT_NM = 2500 * NM_PER_MM
+
+_NUMBER = re.compile(r'([+-]?)(\d*)(?:\.(\d*))?', re.ASCII)
+
+def parseNm(text: str) -> int | None:
+    """
+    把 mm 为单位的十进制字符串精确转为 nm 整数
+
+    Args:
+        text (str): 输入字符串
+
+    Returns:
+        int | None: 无法精确表示（格式不是普通小数、小数超过 6 位、绝对值过大、负零）时返回 None
+    """
+    val = text.strip()
+    # 与 gaugedesign.parseNumber 一致，视为未输完整
+    if val in ('', '.', '-', '-.', '0.', '-0.'):
+        return None
+    match = _NUMBER.fullmatch(val)
+    if match is None:
+        return None
+    sign, integer, fraction = match.groups()
+    fraction = fraction or ''
+    if not (integer or fraction) or len(fraction) > 6:
+        return None
+    value = int(integer or '0') * NM_PER_MM + int(fraction.ljust(6, '0'))
+    if value >= MAX_INPUT_NM or (value == 0 and sign == '-'):
+        return None
+    return -value if sign == '-' else value
+
+@lru_cache(maxsize=65536)
+def fmtNm(value: int) -> str:
+    """
+    格式化 nm 整数为 mm 字符串，与 gaugedesign.fmt 对同一数值的输出相同。
+    量规尺寸中偏差、T1 等数值大量重复，结果做了缓存
+    """
+    if value % NM_PER_MM == 0:
+        return str(value // NM_PER_MM)
+    s = f'{abs(value):07d}'
+    s = f'{s[:-6]}.{s[-6:]}'.rstrip('0')
+    return f'-{s}' if value < 0 else s
+
+def mmToNm(value: Decimal) -> int:
+    """
+    把表中以 mm 为单位的 Decimal 转为 nm 整数
+    """
+    with localcontext(DECIMAL_CONTEXT):
+        return int(value * NM_PER_MM)
+
+def parseMeasuredNm(text) -> int | None:
+    """
+    把实测尺寸（mm，测量文件中的字符串）转为 nm 整数，小数超过 6 位时同 mmToNm 舍去
+
+    Returns:
+        int | None: 空或不是数字时为 None
+
+    Raises:
+        ValueError: 绝对值不小于 MAX_INPUT_NM，不可能是 500 mm 以内零件的量规（也保证结果在 int64 范围内）
+    """
+    text = '' if text is None else str(text).strip()
+    value = parseNm(text)
+    if value is not None or not text:
+        return value
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return None
+    if not number.is_finite():
+        return None
+    # 直接与 mm 比较，超大指数也不会溢出
+    if number.copy_abs() >= MAX_INPUT_NM // NM_PER_MM:
+        raise ValueError(f'实测尺寸超出范围：{text}')
+    return mmToNm(number)
+
+# 各量规在 asRecord() 中的字段名：(名义尺寸, 上偏差, 下偏差, 粗糙度)
+_GAUGE_KEYS = tuple(tuple(f'{name}{suffix}' for suffix in GAUGE_DIMENSION_SUFFIXES) for name in GAUGE_FIELDS)
+
+class FixedGaugeDimension(NamedTuple):
+    """
+    单个量规的尺寸，单位：nm
+    """
+    norminalSize: int
+    upperDeviation: int
+    lowerDeviation: int
+    ra: Decimal | None
+
+class FixedGaugeDesign(NamedTuple):
+    """
+    整数（nm）计算的量规设计结果，字段与 GaugeDesign 一一对应。
+    用 NamedTuple 而不是 frozen dataclass：同样不可变、无实例字典，但构造快得多
+    """
+    feature: Literal['hole', 'shaft']
+    norminalSize: int
+    upperDeviation: int
+    lowerDeviation: int
+    it: int
+    t1: int
+    z1: int
+    goGauge: FixedGaugeDimension
+    goGaugeWearLimit: int
+    noGoGauge: FixedGaugeDimension
+    goGoSettingPlugGauge: FixedGaugeDimension | None = None
+    goWearSettingPlugGauge: FixedGaugeDimension | None = None
+    noGoGoSettingPlugGauge: FixedGaugeDimension | None = None
+
+    def asRecord(self) -> dict[str, str]:
+        """
+        转为格式化后的字段字典，与 GaugeDesign.asRecord() 相同
+        """
+        record = {
+            'feature': self.feature,
+            'norminalSize': fmtNm(self.norminalSize),
+            'upperDeviation': fmtNm(self.upperDeviation),
+            'lowerDeviation': fmtNm(self.lowerDeviation),
+            'it': f'IT{self.it}',
+            't1': fmtNm(self.t1),
+            'z1': fmtNm(self.z1),
+        }
+        for keys, dimension in zip(_GAUGE_KEYS, (self.goGauge, self.noGoGauge, self.goGoSettingPlugGauge, self.goWearSettingPlugGauge, self.noGoGoSettingPlugGauge)):
+            norminalSizeKey, upperDeviationKey, lowerDeviationKey, raKey = keys
+            if dimension is None:
+                record[norminalSizeKey] = record[upperDeviationKey] = record[lowerDeviationKey] = record[raKey] = ''
+                continue
+            norminalSize, upperDeviation, lowerDeviation, ra = dimension
+            record[norminalSizeKey] = fmtNm(norminalSize)
+            record[upperDeviationKey] = fmtNm(upperDeviation)
+            record[lowerDeviationKey] = fmtNm(lowerDeviation)
+            if dimension is self.goGauge:
+                record['goGaugeWearLimit'] = fmtNm(self.goGaugeWearLimit)
+            record[raKey] = fmt(ra)
+        return record
+
+class FixedPointTables:
+    """
+    QueryData 各表换算为 nm 整数后的有序断点数组（array('q')，每项 8 字节，不是独立的 Decimal 对象），进程内只生成一次
+    """
+    _instance = None
+
+    def __init__(self, queryData: QueryData):
+        self.bandMaxs = array('q', (mmToNm(sizeMax) for sizeMax in queryData._bandMaxs))
+        self.bandMins = array('q', (mmToNm(sizeMin) for sizeMin in queryData._bandMins))
+        # 表 3 中公差值单位为 μm
+        with localcontext(DECIMAL_CONTEXT):
+            self.bandTols = tuple(array('q', (int(tol * 1000) for tol in tols)) for tols in queryData._bandTols)
+        self.bandItT1Z1s = tuple(
+            tuple((it, mmToNm(t1), mmToNm(z1)) for it, t1, z1 in itT1Z1s)
+            for itT1Z1s in queryData._bandItT1Z1s
+        )
+        self.gaugeRaIndex = {
+            feature: FixedPointTables._compileRaIndex(index)
+            for feature, index in queryData._gaugeRaIndex.items()
+        }
+        self.settingPlugGaugeRaIndex = FixedPointTables._compileRaIndex(queryData._settingPlugGaugeRaIndex)
+
+    @staticmethod
+    def _compileRaIndex(index) -> dict:
+        return {
+            it: (array('q', (mmToNm(x) for x in norminalMins)), array('q', (mmToNm(x) for x in norminalMaxs)), ras)
+            for it, (norminalMins, norminalMaxs, ras) in index.items()
+        }
+
+    @classmethod
+    def shared(cls) -> 'FixedPointTables':
+        if cls._instance is None:
+            cls._instance = cls(QueryData())
+        return cls._instance
+
+    def queryBand(self, norminalSize: int) -> int | None:
+        """
+        同 QueryData.queryBand，参数单位为 nm
+        """
+        band = bisect_left(self.bandMaxs, norminalSize)
+        if band == len(self.bandMaxs) or not self.bandMins[band] < norminalSize:
+            return None
+        return band
+
+    def queryBandItT1Z1(self, band: int, tolerance: int) -> tuple[int, int, int] | None:
+        """
+        查询尺寸段内不超过零件公差的 (IT, T1, Z1)，单位为 nm
+        """
+        i = bisect_right(self.bandTols[band], tolerance) - 1
+        if i < 0:
+            return None
+        return self.bandItT1Z1s[band][i]
+
+    def queryItT1Z1(self, norminalSize: int, tolerance: int) -> tuple[int, int, int] | None:
+        """
+        同 QueryData.queryItT1Z1，参数和结果单位为 nm
+        """
+        band = self.queryBand(norminalSize)
+        if band is None:
+            return None
+        i = bisect_right(self.bandTols[band], tolerance) - 1
+        if i < 0:
+            return None
+        return self.bandItT1Z1s[band][i]
+
+    @staticmethod
+    def _lookupRa(compiled, gaugeNorminal: int) -> Decimal | None:
+        if compiled is None:
+            return None
+        norminalMins, norminalMaxs, ras = compiled
+        i = bisect_right(norminalMins, gaugeNorminal) - 1
+        if i >= 0 and gaugeNorminal < norminalMaxs[i]:
+            return ras[i]
+        return None
+
+    def queryRa(self, feature: Literal['hole', 'shaft'], gaugeNorminal: int, it: int) -> Decimal | None:
+        """
+        同 QueryData.queryRa，量规公称尺寸单位为 nm
+        """
+        return FixedPointTables._lookupRa(self.gaugeRaIndex[feature].get(it), gaugeNorminal)
+
+    def querySettingPlugGaugeRa(self, gaugeNorminal: int, it: int) -> Decimal | None:
+        """
+        同 QueryData.querySettingPlugGaugeRa，量规公称尺寸单位为 nm
+        """
+        return FixedPointTables._lookupRa(self.settingPlugGaugeRaIndex.get(it), gaugeNorminal)
+
+class FixedPointGaugeDesignEngine:
+    """
+    以 nm 整数计算的量规设计，结果与 GaugeDesignEngine 完全一致，只在输出时格式化为 mm 字符串。
+    不能用整数精确表示的输入交由 GaugeDesignEngine 计算。缓存方式与 GaugeDesignEngine 相同。
+    """
+    def __init__(self, queryData: QueryData | None = None, cacheSize: int | None = DESIGN_CACHE_SIZE, itT1Z1CacheSize: int | None = IT_T1_Z1_CACHE_SIZE):
+        self.decimalEngine = GaugeDesignEngine(queryData, cacheSize, itT1Z1CacheSize)
+        self.queryData = self.decimalEngine.queryData
+        self.tables = FixedPointTables.shared() if queryData is None else FixedPointTables(queryData)
+        self._cachedDesign = lru_cache(maxsize=cacheSize)(self._design)
+        self._cachedBandItT1Z1 = lru_cache(maxsize=itT1Z1CacheSize)(self.tables.queryBandItT1Z1)
+
+    def cacheInfo(self) -> dict:
+        """
+        Returns:
+            dict: 同 GaugeDesignEngine.cacheInfo()，另含回退到 Decimal 计算的 'decimal'
+        """
+        return {
+            'design': self._cachedDesign.cache_info()._asdict(),
+            'itT1Z1': self._cachedBandItT1Z1.cache_info()._asdict(),
+            'decimal': self.decimalEngine.cacheInfo()
+        }
+
+    def cacheClear(self):
+        self._cachedDesign.cache_clear()
+        self._cachedBandItT1Z1.cache_clear()
+        self.decimalEngine.cacheClear()
+
+    def designFromText(self, feature: Literal['hole', 'shaft'], norminalSize: str, upperDeviation: str, lowerDeviation: str) -> FixedGaugeDesign | GaugeDesign:
+        """
+        同 GaugeDesignEngine.designFromText
+
+        Returns:
+            FixedGaugeDesign | GaugeDesign: 输入不能精确表示为 nm 整数时返回 GaugeDesign
+        """
+        if feature in ('hole', 'shaft'):
+            norminalNm = parseNm(norminalSize)
+            upperNm = parseNm(upperDeviation)
+            lowerNm = parseNm(lowerDeviation)
+            if norminalNm is not None and upperNm is not None and lowerNm is not None:
+                return self.design(feature, norminalNm, upperNm, lowerNm)
+        return self.decimalEngine.designFromText(feature, norminalSize, upperDeviation, lowerDeviation)
+
+    def design(self, feature: Literal['hole', 'shaft'], norminalSize: int, upperDeviation: int, lowerDeviation: int) -> FixedGaugeDesign:
+        """
+        计算量规尺寸，参数单位为 nm，其余同 GaugeDesignEngine.design
+
+        Raises:
+            GaugeDesignError: 零件特征不是 'hole' 或 'shaft'
+            ToleranceGradeError: 公差等级超出 IT6-IT16
+        """
+        return self._cachedDesign(feature, norminalSize, upperDeviation, lowerDeviation, TABLES_VERSION)
+
+    def _design(self, feature, norminalSize, upperDeviation, lowerDeviation, *cacheKey) -> FixedGaugeDesign:
+        if feature not in ('hole', 'shaft'):
+            raise GaugeDesignError(f'零件特征只能为 hole 或 shaft：{feature}')
+
+        tables = self.tables
+        upperLimit = norminalSize + upperDeviation
+        lowerLimit = norminalSize + lowerDeviation
+
+        band = tables.queryBand(norminalSize)
+        itT1Z1 = None if band is None else self._cachedBandItT1Z1(band, upperDeviation - lowerDeviation)
+        if itT1Z1 is None:
+            raise ToleranceGradeError('轴孔公差等级过低或过高，仅适用于IT6-IT16公差等级尺寸')
+
+        it, t1, z1 = itT1Z1
+        return FixedGaugeDesign(feature, norminalSize, upperDeviation, lowerDeviation, it, t1, z1, *_gaugeDimensions(
+            feature, upperLimit, lowerLimit, it, t1, z1, tables.queryRa, tables.querySettingPlugGaugeRa
+        ))
+
+    def designColumns(self, features: Iterable[str], norminalSizes: Iterable[int], upperDeviations: Iterable[int], lowerDeviations: Iterable[int]) -> 'FixedDesignColumns':
+        """
+        计算一批输入（单位 nm），结果按列保存在 FixedDesignColumns 中，不为每行生成对象
+
+        Raises:
+            GaugeDesignError: 零件特征不是 'hole' 或 'shaft'（公差等级超出范围的行记为错误，不抛出）
+        """
+        columns = FixedDesignColumns(self.tables)
+        for args in zip(features, norminalSizes, upperDeviations, lowerDeviations):
+            try:
+                columns.append(self.design(*args))
+            except ToleranceGradeError as e:
+                columns.appendError(*args, str(e))
+        return columns
+
+def _gaugeDimensions(feature, upperLimit, lowerLimit, it, t1, z1, queryRa, querySettingPlugGaugeRa) -> tuple:
+    """
+    由 IT、T1、Z1 算出各量规尺寸，返回 FixedGaugeDesign 中 goGauge 及之后的字段
+
+    Args:
+        queryRa: (零件特征, 量规尺寸, IT) -> 粗糙度
+        querySettingPlugGaugeRa: (量规尺寸, IT) -> 粗糙度；FixedDesignColumns 用保存的粗糙度代替这两个查表
+    """
+    halfT1 = t1 // 2
+
+    if feature == 'shaft':
+        goNorminalSize = upperLimit - z1 - halfT1
+        goGoNorminalSize = upperLimit - z1
+        noGoGoNorminalSize = lowerLimit + halfT1
+        return (
+            FixedGaugeDimension(goNorminalSize, t1, 0, queryRa(feature, goNorminalSize, it)),
+            upperLimit,
+            FixedGaugeDimension(lowerLimit, t1, 0, queryRa(feature, lowerLimit, it)),
+            FixedGaugeDimension(goGoNorminalSize, 0, -halfT1, querySettingPlugGaugeRa(goGoNorminalSize, it)),
+            FixedGaugeDimension(upperLimit, 0, -halfT1, querySettingPlugGaugeRa(upperLimit, it)),
+            FixedGaugeDimension(noGoGoNorminalSize, 0, -halfT1, querySettingPlugGaugeRa(noGoGoNorminalSize, it))
+        )
+
+    goNorminalSize = lowerLimit + z1 + halfT1
+    return (
+        FixedGaugeDimension(goNorminalSize, 0, -t1, queryRa(feature, goNorminalSize, it)),
+        lowerLimit,
+        FixedGaugeDimension(upperLimit, 0, -t1, queryRa(feature, upperLimit, it))
+    )
+
+class FixedDesignColumns:
+    """
+    按列保存的一批整数计算结果：每行只保存输入（3 个 int64）、零件特征、尺寸段、IT 和 5 个粗糙度编号，
+    约 32 字节；量规尺寸在读取时由 IT/T1/Z1 重新算出，与 FixedPointGaugeDesignEngine 的结果相同。
+    一百万行约 32 MB，而 FixedGaugeDesign 对象约需数百 MB
+    """
+    __slots__ = ('tables', 'features', 'norminalSizes', 'upperDeviations', 'lowerDeviations', 'bands', 'its', 'raCodes', 'errors', '_ras', '_raCodeOf')
+
+    # 零件特征编号
+    FEATURES = ('hole', 'shaft')
+    # 每行的粗糙度个数（GAUGE_FIELDS 中的量规数），孔用量规只用前 2 个
+    RA_COUNT = len(GAUGE_FIELDS)
+
+    def __init__(self, tables: FixedPointTables | None = None):
+        self.tables = FixedPointTables.shared() if tables is None else tables
+        self.features = array('b')
+        self.norminalSizes = array('q')
+        self.upperDeviations = array('q')
+        self.lowerDeviations = array('q')
+        self.bands = array('b')
+        # IT 为 0 表示该行计算出错，错误信息在 errors 中
+        self.its = array('b')
+        self.raCodes = array('b')
+        self.errors = {}
+        # 粗糙度只有十几种取值，保存编号，-1 表示 None
+        self._ras = []
+        self._raCodeOf = {}
+
+    def __len__(self) -> int:
+        return len(self.its)
+
+    def _raCode(self, ra: Decimal | None) -> int:
+        if ra is None:
+            return -1
+        code = self._raCodeOf.get(ra)
+        if code is None:
+            code = self._raCodeOf[ra] = len(self._ras)
+            self._ras.append(ra)
+        return code
+
+    def _appendInput(self, feature: str, norminalSize: int, upperDeviation: int, lowerDeviation: int):
+        self.features.append(FixedDesignColumns.FEATURES.index(feature))
+        self.norminalSizes.append(norminalSize)
+        self.upperDeviations.append(upperDeviation)
+        self.lowerDeviations.append(lowerDeviation)
+
+    def append(self, design: FixedGaugeDesign):
+        self._appendInput(design.feature, design.norminalSize, design.upperDeviation, design.lowerDeviation)
+        self.bands.append(self.tables.queryBand(design.norminalSize))
+        self.its.append(design.it)
+        gauges = (design.goGauge, design.noGoGauge, design.goGoSettingPlugGauge, design.goWearSettingPlugGauge, design.noGoGoSettingPlugGauge)
+        self.raCodes.extend(-1 if gauge is None else self._raCode(gauge.ra) for gauge in gauges)
+
+    def appendError(self, feature: str, norminalSize: int, upperDeviation: int, lowerDeviation: int, error: str):
+        """
+        记录计算出错（公差等级超出范围）的一行
+        """
+        self.errors[len(self)] = error
+        self._appendInput(feature, norminalSize, upperDeviation, lowerDeviation)
+        self.bands.append(-1)
+        self.its.append(0)
+        self.raCodes.extend((-1,) * FixedDesignColumns.RA_COUNT)
+
+    def __getitem__(self, i: int) -> FixedGaugeDesign:
+        """
+        Raises:
+            ToleranceGradeError: 该行计算出错
+        """
+        it = self.its[i]
+        if not it:
+            raise ToleranceGradeError(self.errors[i % len(self)])
+        feature = FixedDesignColumns.FEATURES[self.features[i]]
+        norminalSize, upperDeviation, lowerDeviation = self.norminalSizes[i], self.upperDeviations[i], self.lowerDeviations[i]
+        itT1Z1s = self.tables.bandItT1Z1s[self.bands[i]]
+        _, t1, z1 = itT1Z1s[it - itT1Z1s[0][0]]
+
+        start = (i % len(self)) * FixedDesignColumns.RA_COUNT
+        ras = iter([None if code < 0 else self._ras[code] for code in self.raCodes[start:start + FixedDesignColumns.RA_COUNT]])
+
+        def nextRa(*args):
+            return next(ras)
+
+        return FixedGaugeDesign(feature, norminalSize, upperDeviation, lowerDeviation, it, t1, z1, *_gaugeDimensions(
+            feature, norminalSize + upperDeviation, norminalSize + lowerDeviation, it, t1, z1, nextRa, nextRa
+        ))
+
+    def __iter__(self) -> Iterator[FixedGaugeDesign | None]:
+        """
+        Yields:
+            FixedGaugeDesign | None: 出错的行为 None
+        """
+        for i in range(len(self)):
+            yield self[i] if self.its[i] else None
+
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: 各列数组占用的字节数
+        """
+        return sum(column.itemsize * len(column) for column in (
+            self.features, self.norminalSizes, self.upperDeviations, self.lowerDeviations, self.bands, self.its, self.raCodes
+        ))
@@ -0,0 +1,316 @@
+from querydata import QueryData, TABLES_VERSION, DECIMAL_CONTEXT
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+from decimal import Decimal, DecimalException, InvalidOperation, localcontext
+
+# 缓存的完整设计结果数和 (尺寸段, 公差) -> (IT, T1, Z1) 结果数
+DESIGN_CACHE_SIZE = 4096
+IT_T1_Z1_CACHE_SIZE = 1024
+
+class GaugeDesignError(ValueError):
+    """
+    设计参数无效，异常信息即界面“信息”栏显示的内容
+    """
+
+class ToleranceGradeError(GaugeDesignError):
+    """
+    零件公差等级超出 IT6-IT16 或尺寸超出 500 mm
+    """
+
+@dataclass(frozen=True, slots=True)
+class GaugeDimension:
+    """
+    单个量规（工作量规或校对塞规）的尺寸
+    """
+    norminalSize: Decimal
+    upperDeviation: Decimal
+    lowerDeviation: Decimal
+    ra: Decimal | None
+
+@dataclass(frozen=True, slots=True)
+class GaugeDesign:
+    """
+    一个零件尺寸的光滑极限量规设计结果
+    """
+    feature: Literal['hole', 'shaft']
+    norminalSize: Decimal
+    upperDeviation: Decimal
+    lowerDeviation: Decimal
+    it: int
+    t1: Decimal
+    z1: Decimal
+    goGauge: GaugeDimension
+    goGaugeWearLimit: Decimal
+    noGoGauge: GaugeDimension
+    # 校对塞规仅用于轴用量规（环规、卡规），孔用量规为 None
+    goGoSettingPlugGauge: GaugeDimension | None = None
+    goWearSettingPlugGauge: GaugeDimension | None = None
+    noGoGoSettingPlugGauge: GaugeDimension | None = None
+
+    def asRecord(self) -> dict[str, str]:
+        """
+        转为格式化后的字段字典，字段顺序见 RECORD_FIELDS，数值格式与界面一致
+
+        Returns:
+            dict: 字段名 -> 显示字符串
+        """
+        record = {
+            'feature': self.feature,
+            'norminalSize': fmt(self.norminalSize),
+            'upperDeviation': fmt(self.upperDeviation),
+            'lowerDeviation': fmt(self.lowerDeviation),
+            'it': f'IT{self.it}',
+            't1': fmt(self.t1),
+            'z1': fmt(self.z1),
+        }
+        for name in GAUGE_FIELDS:
+            dimension = getattr(self, name)
+            if dimension is None:
+                record.update((f'{name}{suffix}', '') for suffix in GAUGE_DIMENSION_SUFFIXES)
+                continue
+            record[f'{name}NorminalSize'] = fmt(dimension.norminalSize)
+            record[f'{name}UpperDeviation'] = fmt(dimension.upperDeviation)
+            record[f'{name}LowerDeviation'] = fmt(dimension.lowerDeviation)
+            if name == 'goGauge':
+                record['goGaugeWearLimit'] = fmt(self.goGaugeWearLimit)
+            record[f'{name}Ra'] = fmt(dimension.ra)
+        return record
+
+    @property
+    def upperLimit(self) -> Decimal:
+        with localcontext(DECIMAL_CONTEXT):
+            return self.norminalSize + self.upperDeviation
+
+    @property
+    def lowerLimit(self) -> Decimal:
+        with localcontext(DECIMAL_CONTEXT):
+            return self.norminalSize + self.lowerDeviation
+
+# GaugeDesign 中各量规字段，与界面中 StringVar 的前缀一致
+GAUGE_FIELDS = ('goGauge', 'noGoGauge', 'goGoSettingPlugGauge', 'goWearSettingPlugGauge', 'noGoGoSettingPlugGauge')
+GAUGE_DIMENSION_SUFFIXES = ('NorminalSize', 'UpperDeviation', 'LowerDeviation', 'Ra')
+
+# 量规种类的写法：字段名、界面中的代号和名称，不区分大小写（用于测量文件等外部输入）
+KIND_ALIASES = {
+    **{name.lower(): name for name in GAUGE_FIELDS},
+    't': 'goGauge', 'go': 'goGauge', '通规': 'goGauge',
+    'z': 'noGoGauge', 'nogo': 'noGoGauge', 'no-go': 'noGoGauge', '止规': 'noGoGauge',
+    'tt': 'goGoSettingPlugGauge', '校通-通': 'goGoSettingPlugGauge',
+    'ts': 'goWearSettingPlugGauge', '校通-损': 'goWearSettingPlugGauge',
+    'zt': 'noGoGoSettingPlugGauge', '校止-通': 'noGoGoSettingPlugGauge',
+}
+
+# GaugeDesign.asRecord() 输出的字段
+RECORD_FIELDS = (
+    'feature', 'norminalSize', 'upperDeviation', 'lowerDeviation', 'it', 't1', 'z1',
+    'goGaugeNorminalSize', 'goGaugeUpperDeviation', 'goGaugeLowerDeviation', 'goGaugeWearLimit', 'goGaugeRa',
+    *(f'{name}{suffix}' for name in GAUGE_FIELDS[1:] for suffix in GAUGE_DIMENSION_SUFFIXES)
+)
+
+def fmt(x) -> str:
+    """
+    格式化显示数值，去掉小数末尾的 0
+
+    Args:
+        x (Decimal | None): 数值
+
+    Returns:
+        str: None 显示为 “—”
+    """
+    if isinstance(x, Decimal):
+        s = format(x, 'f')
+        if '.' in s:
+            s = s.rstrip('0').rstrip('.')
+        return s
+    elif x is None:
+        return '—'
+    return str(x)
+
+def parseNumber(text: str) -> Decimal | None | Literal[False]:
+    """
+    验证输入的字符串是否为数字
+
+    Args:
+        text (str): 输入字符串
+
+    Returns:
+        Decimal | None | False: None 则带表输入空，可不作处理； False 则表示输入值不是数字； Decimal 则转为浮点数的结果
+    """
+    val = text.strip()
+    if val in ('', '.', '-', '-.', '0.', '-0.'):
+        return None
+    try:
+        number = Decimal(val)
+    except InvalidOperation:
+        return False
+    # NaN、Infinity 不能参与比较和计算（sNaN 也不能作为缓存键）
+    return number if number.is_finite() else False
+
+class GaugeDesignEngine:
+    """
+    光滑极限量规设计计算，不依赖界面。
+
+    计算在 DECIMAL_CONTEXT 的局部副本中进行，不受调用方 Decimal 上下文的影响；
+    QueryData 只读、缓存线程安全，同一个引擎可在多个线程中同时使用。
+
+    设计结果按 (特征, 名义尺寸, 上偏差, 下偏差, 表版本) 做 LRU 缓存，数值相等的输入共用一条；
+    另按 (尺寸段, 公差) 缓存公差等级查询，不同零件落在同一尺寸段、同一公差时只查一次。
+    """
+    def __init__(self, queryData: QueryData | None = None, cacheSize: int | None = DESIGN_CACHE_SIZE, itT1Z1CacheSize: int | None = IT_T1_Z1_CACHE_SIZE):
+        self.queryData = queryData if queryData is not None else QueryData()
+        self._cachedDesign = lru_cache(maxsize=cacheSize)(self._design)
+        self._cachedBandItT1Z1 = lru_cache(maxsize=itT1Z1CacheSize)(self._bandItT1Z1)
+
+    def cacheInfo(self) -> dict:
+        """
+        Returns:
+            dict: {'design': {...}, 'itT1Z1': {...}}，各含 hits、misses、maxsize、currsize
+        """
+        return {
+            'design': self._cachedDesign.cache_info()._asdict(),
+            'itT1Z1': self._cachedBandItT1Z1.cache_info()._asdict()
+        }
+
+    def cacheClear(self):
+        self._cachedDesign.cache_clear()
+        self._cachedBandItT1Z1.cache_clear()
+
+    def _bandItT1Z1(self, band: int, tolerance: Decimal):
+        # 用尺寸段上限代表整个尺寸段
+        return self.queryData.queryItT1Z1(self.queryData.bandRange(band)[1], tolerance)
+
+    def queryItT1Z1(self, norminalSize: Decimal, tolerance: Decimal):
+        """
+        同 QueryData.queryItT1Z1，按 (尺寸段, 公差) 缓存
+        """
+        band = self.queryData.queryBand(norminalSize)
+        if band is None:
+            return None
+        return self._cachedBandItT1Z1(band, tolerance)
+
+    def designFromText(self, feature: Literal['hole', 'shaft'], norminalSize: str, upperDeviation: str, lowerDeviation: str) -> GaugeDesign:
+        """
+        根据输入字符串计算量规尺寸，输入检查与界面一致。
+
+        Args:
+            feature (str): 零件特征，取值：'hole' 或 'shaft'
+            norminalSize (str): 零件名义尺寸，单位：mm
+            upperDeviation (str): 零件上偏差，单位：mm
+            lowerDeviation (str): 零件下偏差，单位：mm
+
+        Returns:
+            GaugeDesign: 设计结果
+
+        Raises:
+            GaugeDesignError: 输入不完整或不是数字
+            ToleranceGradeError: 公差等级超出 IT6-IT16
+        """
+        errors = []
+        values = []
+        for name, text in (('名义尺寸', norminalSize), ('上偏差', upperDeviation), ('下偏差', lowerDeviation)):
+            value = parseNumber(text)
+            if value is None:
+                errors.append(f'{name}：未输完整')
+            elif value is False:
+                errors.append(f'{name}：只能输入数字')
+            values.append(value)
+
+        if errors:
+            raise GaugeDesignError('；'.join(errors))
+
+        return self.design(feature, *values)
+
+    def design(self, feature: Literal['hole', 'shaft'], norminalSize: Decimal, upperDeviation: Decimal, lowerDeviation: Decimal) -> GaugeDesign:
+        """
+        计算量规尺寸。
+
+        Args:
+            feature (str): 零件特征，取值：'hole' 或 'shaft'
+            norminalSize (Decimal): 零件名义尺寸，单位：mm，大于 0 至 500
+            upperDeviation (Decimal): 零件上偏差，单位：mm
+            lowerDeviation (Decimal): 零件下偏差，单位：mm
+
+        Returns:
+            GaugeDesign: 设计结果
+
+        Raises:
+            GaugeDesignError: 零件特征不是 'hole' 或 'shaft'，或数值超出计算范围
+            ToleranceGradeError: 公差等级超出 IT6-IT16
+        """
+        # 负零与零数值相等，但显示不同，符号也作为缓存键的一部分
+        return self._cachedDesign(
+            feature, norminalSize, upperDeviation, lowerDeviation,
+            norminalSize.is_signed(), upperDeviation.is_signed(), lowerDeviation.is_signed(), TABLES_VERSION
+        )
+
+    def _design(self, feature, norminalSize, upperDeviation, lowerDeviation, *cacheKey) -> GaugeDesign:
+        with localcontext(DECIMAL_CONTEXT):
+            try:
+                return self._calculate(feature, norminalSize, upperDeviation, lowerDeviation)
+            except DecimalException:
+                # 指数超出 DECIMAL_CONTEXT 范围的输入在加减时溢出
+                raise GaugeDesignError('名义尺寸或偏差：数值超出计算范围') from None
+
+    def _calculate(self, feature, norminalSize, upperDeviation, lowerDeviation) -> GaugeDesign:
+        if feature not in ('hole', 'shaft'):
+            raise GaugeDesignError(f'零件特征只能为 hole 或 shaft：{feature}')
+
+        # 计算上下限和公差
+        upperLimit = norminalSize + upperDeviation
+        lowerLimit = norminalSize + lowerDeviation
+        tolerance = upperDeviation - lowerDeviation
+
+        itT1Z1 = self.queryItT1Z1(norminalSize, tolerance)
+        if itT1Z1 is None:
+            raise ToleranceGradeError('轴孔公差等级过低或过高，仅适用于IT6-IT16公差等级尺寸')
+
+        it, t1, z1 = itT1Z1
+        queryRa = self.queryData.queryRa
+        querySettingPlugGaugeRa = self.queryData.querySettingPlugGaugeRa
+
+        match feature:
+            case 'shaft':
+                goNorminalSize = upperLimit - z1 - t1 / 2
+                goGauge = GaugeDimension(goNorminalSize, t1, Decimal('0'), queryRa(feature, goNorminalSize, it))
+
+                noGoNorminalSize = lowerLimit
+                noGoGauge = GaugeDimension(noGoNorminalSize, t1, Decimal('0'), queryRa(feature, noGoNorminalSize, it))
+
+                goWearNorminalSize = upperLimit
+                goWearSettingPlugGauge = GaugeDimension(
+                    goWearNorminalSize, Decimal('0'), -t1 / 2,
+                    querySettingPlugGaugeRa(goWearNorminalSize, it)
+                )
+
+                goGoNorminalSize = upperLimit - z1
+                goGoSettingPlugGauge = GaugeDimension(
+                    goGoNorminalSize, Decimal('0'), -t1 / 2,
+                    querySettingPlugGaugeRa(goGoNorminalSize, it)
+                )
+
+                noGoGoLowerDeviation = -t1 / 2
+                noGoGoNorminalSize = lowerLimit - noGoGoLowerDeviation
+                noGoGoSettingPlugGauge = GaugeDimension(
+                    noGoGoNorminalSize, Decimal('0'), noGoGoLowerDeviation,
+                    querySettingPlugGaugeRa(noGoGoNorminalSize, it)
+                )
+
+                return GaugeDesign(
+                    feature, norminalSize, upperDeviation, lowerDeviation, it, t1, z1,
+                    goGauge, upperLimit, noGoGauge,
+                    goGoSettingPlugGauge, goWearSettingPlugGauge, noGoGoSettingPlugGauge
+                )
+
+            case 'hole':
+                goNorminalSize = lowerLimit + z1 + t1 / 2
+                goGauge = GaugeDimension(goNorminalSize, Decimal('0'), -t1, queryRa(feature, goNorminalSize, it))
+
+                noGoNorminalSize = upperLimit
+                noGoGauge = GaugeDimension(noGoNorminalSize, Decimal('0'), -t1, queryRa(feature, noGoNorminalSize, it))
+
+                return GaugeDesign(
+                    feature, norminalSize, upperDeviation, lowerDeviation, it, t1, z1,
+                    goGauge, lowerLimit, noGoGauge
+                )
@@ -0,0 +1,252 @@
+"""
+量规反查索引：已有一只量规（实测尺寸），查目录中哪些零件可以用它检验。
+
+由零件目录的计算结果（sharing.gaugeZones()）建立，按零件特征和量规种类分为 4 组，每组一棵区间树，
+保存为定长 int64 数组的二进制文件，读取端与设计图集（atlas.py）一样只用 mmap 映射、不解析。
+
+区间树为按可用区间下极限排序的数组上的隐式平衡二叉树：区间 [lo, hi) 的根为中间一项，
+每个结点另存子树中可用区间上极限的最大值，查询时跳过最大值小于实测尺寸、或下极限已大于实测尺寸的子树，
+耗时为 O(log n) 加上与结果数成正比的部分。
+
+通规的可用区间包含磨损量：塞规（孔）从磨损极限到制造公差带上极限，卡规、环规（轴）从制造公差带下极限到磨损极限；
+止规的可用区间即制造公差带。默认只返回制造公差带包含实测尺寸的零件，worn=True 时包含已磨损但未超过磨损极限的情况。
+
+文件格式（小端序）：
+    文件头 128 字节：魔数 8 字节、计算所用查询表的摘要（incremental.stateVersion()）32 字节、HEADER_FIELDS 共 11 个 int64
+    之后依次为：
+        分组目录     len(GROUPS) × (起始项, 项数)
+        区间         ZONE_FIELDS 各一个 nZones 的 int64 数组，每组内按 usableLower 排序
+        零件编号     nParts + 1 个 int64 偏移量，之后为 partBytes 字节的 UTF-8 文本
+"""
+from fixedpoint import fmtNm
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Literal, NamedTuple
+
+MAGIC = b'PLGDIDX\x01'
+FORMAT_VERSION = 1
+HEADER_SIZE = 128
+HEADER_FIELDS = ('formatVersion', 'nZones', 'nParts', 'partBytes', 'reserved1', 'reserved2', 'reserved3', 'reserved4', 'reserved5', 'reserved6', 'reserved7')
+
+# 分组：(零件特征, 量规种类)
+GROUPS = (('hole', 'goGauge'), ('hole', 'noGoGauge'), ('shaft', 'goGauge'), ('shaft', 'noGoGauge'))
+
+# 每个区间的字段，单位 nm；maxUsableUpper 为区间树子树中 usableUpper 的最大值，part 为零件编号的序号
+ZONE_FIELDS = ('usableLower', 'usableUpper', 'maxUsableUpper', 'lowerLimit', 'upperLimit', 'wearLimit', 'part')
+
+# 止规没有磨损极限
+NONE = -(2 ** 63)
+
+# 查询结果的列
+MATCH_FIELDS = ('id', 'feature', 'kind', 'lowerLimit', 'upperLimit', 'wearLimit', 'worn')
+
+class GaugeIndexError(ValueError):
+    """
+    索引文件无效或格式版本不支持
+    """
+
+class GaugeMatch(NamedTuple):
+    """
+    可以用实测量规检验的一个零件，尺寸单位：nm
+    """
+    part: str
+    feature: Literal['hole', 'shaft']
+    kind: Literal['goGauge', 'noGoGauge']
+    lowerLimit: int
+    upperLimit: int
+    wearLimit: int | None
+    # 实测尺寸已超出制造公差带、但未超过磨损极限
+    worn: bool
+
+    def asRecord(self) -> dict:
+        return {
+            'id': self.part,
+            'feature': self.feature,
+            'kind': self.kind,
+            'lowerLimit': fmtNm(self.lowerLimit),
+            'upperLimit': fmtNm(self.upperLimit),
+            'wearLimit': '' if self.wearLimit is None else fmtNm(self.wearLimit),
+            'worn': 'yes' if self.worn else '',
+        }
+
+def _usableZone(zone) -> tuple[int, int]:
+    if zone.wearLimit is None:
+        return zone.lowerLimit, zone.upperLimit
+    if zone.feature == 'hole':
+        return min(zone.wearLimit, zone.lowerLimit), zone.upperLimit
+    return zone.lowerLimit, max(zone.wearLimit, zone.upperLimit)
+
+def _buildMaxUpper(uppers: list[int], lo: int, hi: int, out: list[int]) -> int:
+    """
+    按隐式树（根为 (lo + hi) // 2）自底向上填写子树上极限的最大值
+    """
+    if lo >= hi:
+        return NONE
+    mid = (lo + hi) // 2
+    value = max(uppers[mid], _buildMaxUpper(uppers, lo, mid, out), _buildMaxUpper(uppers, mid + 1, hi, out))
+    out[mid] = value
+    return value
+
+def buildGaugeIndex(zones: Iterable, path: str) -> dict:
+    """
+    由目录的工作量规公差带生成索引文件（先写临时文件再替换，读取端不会看到写了一半的文件）
+
+    Args:
+        zones (Iterable[sharing.GaugeZone]): sharing.gaugeZones() 的结果
+        path (str): 输出文件
+
+    Returns:
+        dict: 文件头各字段
+    """
+    from incremental import stateVersion
+
+    groups = {group: [] for group in GROUPS}
+    for zone in zones:
+        groups[(zone.feature, zone.kind)].append((*_usableZone(zone), zone))
+
+    columns = {name: array('q') for name in ZONE_FIELDS}
+    directory = array('q')
+    parts = {}
+    for group in GROUPS:
+        entries = sorted(groups[group], key=lambda entry: (entry[0], entry[1]))
+        directory.extend((len(columns['part']), len(entries)))
+        uppers = [entry[1] for entry in entries]
+        maxUppers = [NONE] * len(entries)
+        _buildMaxUpper(uppers, 0, len(entries), maxUppers)
+        for (usableLower, usableUpper, zone), maxUpper in zip(entries, maxUppers):
+            columns['usableLower'].append(usableLower)
+            columns['usableUpper'].append(usableUpper)
+            columns['maxUsableUpper'].append(maxUpper)
+            columns['lowerLimit'].append(zone.lowerLimit)
+            columns['upperLimit'].append(zone.upperLimit)
+            columns['wearLimit'].append(NONE if zone.wearLimit is None else zone.wearLimit)
+            columns['part'].append(parts.setdefault(zone.part, len(parts)))
+
+    partOffsets = array('q', [0])
+    partData = bytearray()
+    for part in parts:
+        partData += part.encode('utf-8')
+        partOffsets.append(len(partData))
+
+    header = dict(
+        formatVersion=FORMAT_VERSION, nZones=len(columns['part']), nParts=len(parts), partBytes=len(partData),
+        reserved1=0, reserved2=0, reserved3=0, reserved4=0, reserved5=0, reserved6=0, reserved7=0
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC + bytes.fromhex(stateVersion()) + struct.pack(f'<{len(HEADER_FIELDS)}q', *(header[name] for name in HEADER_FIELDS)))
+        for values in (directory, *columns.values(), partOffsets):
+            if sys.byteorder != 'little':
+                values.byteswap()
+            f.write(values.tobytes())
+        f.write(partData)
+    os.replace(temporary, path)
+    return header
+
+class GaugeIndex:
+    """
+    只读映射索引文件并查询，可在多个线程中共用
+    """
+    def __init__(self, path: str):
+        if sys.byteorder != 'little':
+            raise GaugeIndexError('索引文件为小端序，不支持当前平台')
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < HEADER_SIZE or self._mmap[:len(MAGIC)] != MAGIC:
+                raise GaugeIndexError(f'不是量规反查索引文件：{path}')
+            header = dict(zip(HEADER_FIELDS, struct.unpack_from(f'<{len(HEADER_FIELDS)}q', self._mmap, len(MAGIC) + 32)))
+            if header['formatVersion'] != FORMAT_VERSION:
+                raise GaugeIndexError(f'不支持的索引格式版本：{header["formatVersion"]}')
+            nZones, nParts = header['nZones'], header['nParts']
+            nValues = len(GROUPS) * 2 + len(ZONE_FIELDS) * nZones + nParts + 1
+            if len(self._mmap) < HEADER_SIZE + nValues * 8 + header['partBytes']:
+                raise GaugeIndexError(f'索引文件不完整：{path}')
+            self.tablesVersion = self._mmap[len(MAGIC):len(MAGIC) + 32].hex()
+            self.header = header
+            self._values = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + nValues * 8].cast('q')
+        except BaseException:
+            self._mmap.close()
+            raise
+
+        self._directory = {group: (self._values[2 * i], self._values[2 * i + 1]) for i, group in enumerate(GROUPS)}
+        offset = len(GROUPS) * 2
+        self._columns = {}
+        for name in ZONE_FIELDS:
+            self._columns[name] = self._values[offset:offset + nZones]
+            offset += nZones
+        self._partOffsets = self._values[offset:offset + nParts + 1]
+        self._partDataOffset = HEADER_SIZE + nValues * 8
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for column in (*self._columns.values(), self._partOffsets, self._values):
+            column.release()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self.header['nZones']
+
+    def _part(self, i: int) -> str:
+        start = self._partDataOffset + self._partOffsets[i]
+        return self._mmap[start:self._partDataOffset + self._partOffsets[i + 1]].decode('utf-8')
+
+    def query(self, feature: Literal['hole', 'shaft'], kind: Literal['goGauge', 'noGoGauge'], size: int, worn: bool = False) -> list[GaugeMatch]:
+        """
+        查可以用实测尺寸为 size 的量规检验的零件
+
+        Args:
+            feature (str): 被检零件特征，'hole'（塞规）或 'shaft'（卡规、环规）
+            kind (str): 'goGauge' 或 'noGoGauge'
+            size (int): 量规实测尺寸，单位 nm
+            worn (bool): 通规是否包含已磨损但未超过磨损极限的情况
+
+        Returns:
+            list[GaugeMatch]: 按可用区间下极限排序
+
+        Raises:
+            ValueError: 零件特征或量规种类不正确
+        """
+        if (feature, kind) not in self._directory:
+            raise ValueError(f'零件特征或量规种类不正确：{feature}、{kind}')
+        start, count = self._directory[(feature, kind)]
+        usableLower, usableUpper, maxUpper = (self._columns[name] for name in ('usableLower', 'usableUpper', 'maxUsableUpper'))
+        lowerLimit, upperLimit, wearLimit, part = (self._columns[name] for name in ('lowerLimit', 'upperLimit', 'wearLimit', 'part'))
+        # 下极限大于 size 的区间都不可能包含 size，先用二分缩小到 [start, end)
+        end = bisect_right(usableLower, size, start, start + count)
+        found = []
+        stack = [(start, start + count)]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi or lo >= end:
+                continue
+            mid = (lo + hi) // 2
+            if maxUpper[mid] < size:
+                continue
+            stack.append((lo, mid))
+            if mid < end:
+                stack.append((mid + 1, hi))
+                if usableUpper[mid] >= size:
+                    found.append(mid)
+        matches = []
+        for i in sorted(found):
+            inZone = lowerLimit[i] <= size <= upperLimit[i]
+            if not (inZone or worn):
+                continue
+            matches.append(GaugeMatch(
+                self._part(part[i]), feature, kind, lowerLimit[i], upperLimit[i],
+                None if wearLimit[i] == NONE else wearLimit[i], not inZone
+            ))
+        return matches
@@ -0,0 +1,229 @@
+"""
+零件目录的增量计算。
+
+状态文件（SQLite）保存目录中每一行输入的摘要和计算结果，以及查询表的版本；再次运行时只重新计算
+新增和修改的行，并给出量规尺寸真正变化的差异，即需要重新制作的量规。状态在每次运行结束时一次提交，
+中途退出不会留下不一致的状态，重新启动只需读一遍目录、比较摘要。
+
+行以 id 列区分（id 为空时以行号区分，重复的 id 依次加 #2、#3 ……），移动行的位置不算修改。
+查询表（querydata.TABLES_VERSION、fits.FIT_TABLES_VERSION）改动后全部重新计算，差异中仍只列出变化的尺寸。
+"""
+from batch import INPUT_FIELDS, designRow
+from gaugedesign import GaugeDesignEngine, RECORD_FIELDS
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rows (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL, -- 在目录中的行号，从 1 开始
+    hash BLOB NOT NULL, -- 输入行的摘要，见 rowHash()
+    record TEXT NOT NULL -- 输出记录（不含 row）的 JSON
+) WITHOUT ROWID;
+'''
+
+# 差异记录的列：change 为 added、modified、removed；modified 每个变化的字段一条
+DIFF_FIELDS = ('change', 'id', 'field', 'old', 'new')
+
+# 比较的字段：公差等级、T1、Z1、各量规尺寸和出错信息；零件的输入本身不算
+COMPARED_FIELDS = (*RECORD_FIELDS[RECORD_FIELDS.index('it'):], 'error')
+
+def stateVersion() -> str:
+    """
+    Returns:
+        str: 量规查询表和 ISO 286 公差表的合并摘要，任何一个表有改动都会变化
+    """
+    from querydata import TABLES_VERSION
+    from fits import FIT_TABLES_VERSION
+
+    return hashlib.sha256(f'{TABLES_VERSION}\0{FIT_TABLES_VERSION}'.encode('ascii')).hexdigest()
+
+def rowHash(row: dict) -> bytes:
+    """
+    输入行的摘要，只包含 INPUT_FIELDS 中的列；其他列（如备注）改动不会引起重新计算
+    """
+    text = '\x1f'.join('' if row.get(name) is None else str(row[name]) for name in INPUT_FIELDS)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def rowKey(row: dict, position: int, counts: dict[str, int]) -> str:
+    """
+    行的编号：id 列，为空时为 '#行号'，重复的 id 依次加 #2、#3 ……
+
+    Args:
+        counts (dict): 本次运行中各 id 已出现的次数，由调用者在整个目录范围内共用
+    """
+    rowId = '' if row.get('id') is None else str(row['id']).strip()
+    if not rowId:
+        return f'#{position}'
+    count = counts.get(rowId, 0) + 1
+    counts[rowId] = count
+    return rowId if count == 1 else f'{rowId}#{count}'
+
+def compareRecords(old: dict, new: dict) -> Iterator[tuple[str, str, str]]:
+    """
+    Yields:
+        tuple: 变化的 (字段, 旧值, 新值)
+    """
+    for name in COMPARED_FIELDS:
+        before, after = old.get(name, ''), new.get(name, '')
+        if before != after:
+            yield name, before, after
+
+@dataclass
+class UpdateSummary:
+    total: int = 0
+    added: int = 0
+    # 重新计算的修改行数，其中 changed 行的量规尺寸有变化
+    modified: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    # 查询表版本变化，全部重新计算
+    tablesChanged: bool = False
+    diff: list[dict] = field(default_factory=list)
+
+class CatalogState:
+    """
+    一个目录的增量计算状态。同一时间只应有一个进程更新同一状态文件
+    """
+    def __init__(self, path: str, timeout: float = 5.0):
+        """
+        Args:
+            path (str): 状态文件路径，不存在时新建；':memory:' 表示不保存
+        """
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def update(self, rows: Iterable[dict], engine: GaugeDesignEngine | None = None) -> UpdateSummary:
+        """
+        读入目录的全部行，重新计算新增和修改的行，删除目录中已没有的行，一次提交
+
+        Args:
+            rows (Iterable[dict]): batch.readRows() 读出的输入行
+            engine (GaugeDesignEngine | None): 计算引擎，默认新建
+
+        Returns:
+            UpdateSummary: 各类行数和量规尺寸的差异（按目录顺序，删除的行在最后）
+        """
+        if engine is None:
+            engine = GaugeDesignEngine()
+        version = stateVersion()
+        summary = UpdateSummary()
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            stored = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            summary.tablesChanged = stored is not None and stored[0] != version
+            seen = set()
+            counts = {}
+            for position, row in enumerate(rows, 1):
+                summary.total += 1
+                key = rowKey(row, position, counts)
+                seen.add(key)
+                digest = rowHash(row)
+                previous = connection.execute('SELECT position, hash, record FROM rows WHERE key = ?', (key,)).fetchone()
+                if previous is not None and previous[1] == digest and not summary.tablesChanged:
+                    summary.unchanged += 1
+                    if previous[0] != position:
+                        connection.execute('UPDATE rows SET position = ? WHERE key = ?', (position, key))
+                    if 'error' in json.loads(previous[2]):
+                        summary.failed += 1
+                    continue
+
+                record = designRow(engine, row)
+                if 'error' in record:
+                    summary.failed += 1
+                connection.execute(
+                    'INSERT OR REPLACE INTO rows (key, position, hash, record) VALUES (?, ?, ?, ?)',
+                    (key, position, digest, json.dumps(record, ensure_ascii=False))
+                )
+                if previous is None:
+                    summary.added += 1
+                    summary.diff.append({'change': 'added', 'id': key})
+                    continue
+                summary.modified += 1
+                changes = [
+                    {'change': 'modified', 'id': key, 'field': name, 'old': before, 'new': after}
+                    for name, before, after in compareRecords(json.loads(previous[2]), record)
+                ]
+                if changes:
+                    summary.changed += 1
+                    summary.diff.extend(changes)
+
+            removed = [
+                key for key, in connection.execute('SELECT key FROM rows ORDER BY position')
+                if key not in seen
+            ]
+            for key in removed:
+                connection.execute('DELETE FROM rows WHERE key = ?', (key,))
+                summary.diff.append({'change': 'removed', 'id': key})
+            summary.removed = len(removed)
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (version,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return summary
+
+    def records(self) -> Iterator[dict]:
+        """
+        按目录顺序输出全部行的计算结果（含未重新计算的行），格式与 batch.designRows() 相同
+        """
+        for position, text in self._connection.execute('SELECT position, record FROM rows ORDER BY position'):
+            record = json.loads(text)
+            record['row'] = position
+            yield record
+
+def watchFile(path: str, interval: float = 2.0) -> Iterator[None]:
+    """
+    先产生一次，之后每当文件的修改时间或大小变化且保持 interval 秒不变时再产生一次；
+    文件被编辑器替换或暂时不存在时等待其重新出现
+
+    Args:
+        path (str): 监视的文件
+        interval (float): 轮询间隔，单位：s
+    """
+    def signature():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    last = signature()
+    yield
+    while True:
+        time.sleep(interval)
+        current = signature()
+        if current is None or current == last:
+            continue
+        # 等写入完成：连续两次轮询相同才算改完
+        time.sleep(interval)
+        if signature() != current:
+            continue
+        last = current
+        yield
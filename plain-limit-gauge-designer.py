@@ -1,17 +1,12 @@
-from application import Application
-
-import tkinter as tk
 import os
+import sys
 
 def main():
+    from application import Application
+    import tkinter as tk
+
     root = tk.Tk()
     root.title("光滑极限量规辅助设计工具")
-    width = 741
-    height = 424
-    x = (root.winfo_screenwidth() - width) // 2
-    y = (root.winfo_screenheight() - height) // 2
-    root.geometry(f'{width}x{height}+{x}+{y}')
-    root.resizable(False, False)
     root.iconbitmap(
         os.path.join(
             os.path.dirname(__file__),
@@ -19,7 +14,21 @@ def main():
         )
     )
     Application(master=root)
+    # 窗口大小取界面实际需要的大小（原为 741x424），输入框增加行（如公差带代号）或字体不同时不会截掉下方的信息栏
+    root.update_idletasks()
+    width = max(741, root.winfo_reqwidth())
+    height = max(424, root.winfo_reqheight())
+    x = (root.winfo_screenwidth() - width) // 2
+    y = (root.winfo_screenheight() - height) // 2
+    root.geometry(f'{width}x{height}+{x}+{y}')
+    root.resizable(False, False)
     root.mainloop()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 打包后的程序以 batch --jobs 启动工作进程时需要
+        from multiprocessing import freeze_support
+        freeze_support()
+        from cli import runCli
+        sys.exit(runCli(sys.argv[1:]))
     main()
\ No newline at end of file
@@ -1,19 +1,65 @@
+import hashlib
 import json
+import threading
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
 from typing import Literal
-from decimal import Decimal, getcontext
+from decimal import Context, Decimal, localcontext
 
-getcontext().prec = 10
+try:
+    import querytables
+except ImportError:
+    querytables = None
+
+# 全部 Decimal 计算使用的上下文：10 位有效数字。
+# 只通过 localcontext(DECIMAL_CONTEXT) 复制后使用，不修改也不依赖线程的当前上下文
+DECIMAL_CONTEXT = Context(prec=10)
 
 class QueryData:
+    """
+    查询 GB/T 1957 表 3、表 4、表 A.1。
+
+    实例创建后不可修改，表本身也是只读的 tuple / MappingProxyType，可在多个线程间共享
+    """
+    # 查询所需的全部表，进程内只解析、编译一次，所有 QueryData 实例共享（只读）
+    _TABLE_NAMES = (
+        'norminalTolT1Z1Data', 'gaugeNorminalItRaData', 'settingPlugGaugeNorminalItRaData',
+        '_bandMaxs', '_bandMins', '_bandTols', '_bandItT1Z1s', '_gaugeRaIndex', '_settingPlugGaugeRaIndex'
+    )
+    __slots__ = _TABLE_NAMES
+    _tables = None
+    _tablesLock = threading.Lock()
+
     def __init__(self):
+        if QueryData._tables is None:
+            with QueryData._tablesLock:
+                if QueryData._tables is None:
+                    QueryData._tables = QueryData._compileTables(*QueryData.loadTables())
+        for name, table in zip(QueryData._TABLE_NAMES, QueryData._tables):
+            object.__setattr__(self, name, table)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'QueryData 不可修改：{name}')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'QueryData 不可修改：{name}')
+
+    @staticmethod
+    def parseTables() -> tuple:
+        """
+        解析类中内嵌的 JSON 表。
+
+        Returns:
+            tuple: (norminalTolT1Z1Data, gaugeNorminalItRaData, settingPlugGaugeNorminalItRaData)
+        """
         # 零件公称尺寸和量规T1、Z1参数
         # 数据整理为下面格式：
-        # [
-        #     ((公称尺寸范围下限, 公称尺寸范围上限): ((公差值, T1, Z1), (公差值, T1, Z1), ...)),
-        #     ((公称尺寸范围下限, 公称尺寸范围上限): ((公差值, T1, Z1), (公差值, T1, Z1), ...)}，
+        # (
+        #     ((公称尺寸范围下限, 公称尺寸范围上限), ((公差值, IT, T1, Z1), (公差值, IT, T1, Z1), ...)),
+        #     ((公称尺寸范围下限, 公称尺寸范围上限), ((公差值, IT, T1, Z1), (公差值, IT, T1, Z1), ...)),
         #     ...
-        # ]
-        self.norminalTolT1Z1Data = [
+        # )
+        norminalTolT1Z1Data = tuple(
             (
                 tuple(Decimal(str(x)) for x in norminalData['norminalRange']),
                 tuple(
@@ -27,7 +73,7 @@ class QueryData:
                 )
             )
             for norminalData in json.loads(QueryData.norminalTolT1Z1Json)
-        ]
+        )
 
         # 量规公称尺寸、零件公差等级和量规粗糙度
         # 数据整理为下面格式：
@@ -40,16 +86,16 @@ class QueryData:
         #           ...
         #       }
         # }
-        self.gaugeNorminalItRaData = {
-            feature: {
+        gaugeNorminalItRaData = MappingProxyType({
+            feature: MappingProxyType({
                 tuple(item['IT']): tuple(
                     (tuple(Decimal(str(x)) for x in nr['nominal']), Decimal(str(nr['Ra'])))
                     for nr in item['nominalRa']
                 )
                 for item in norminalRa
-            }
+            })
             for feature, norminalRa in json.loads(QueryData.gaugeNorminalItRaJson).items()
-        }
+        })
 
         # 校规公称尺寸、零件公差等级和量规粗糙度
         # 数据整理为下面格式：
@@ -57,13 +103,89 @@ class QueryData:
         #       (零件公差等级范围下限, 零件公差等级范围上限): (((量规公称尺寸范围下限，量规公称尺寸范围上限), 粗糙度), ...),
         #       ...
         # }
-        self.settingPlugGaugeNorminalItRaData = {
+        settingPlugGaugeNorminalItRaData = MappingProxyType({
             tuple(item['IT']): tuple(
                 (tuple(Decimal(str(x)) for x in nr['nominal']), Decimal(str(nr['Ra'])))
                 for nr in item['nominalRa']
             )
             for item in json.loads(QueryData.settingPlugGaugeNorminalItRaJson)
-        }
+        })
+
+        return norminalTolT1Z1Data, gaugeNorminalItRaData, settingPlugGaugeNorminalItRaData
+
+    @staticmethod
+    def loadTables() -> tuple:
+        """
+        读取表数据：优先使用构建时由 savequerytables.py 生成的 querytables.py，
+        其源表摘要与当前内嵌 JSON 不一致（或不存在）时改为解析 JSON。
+
+        Returns:
+            tuple: 同 parseTables()
+        """
+        if querytables is not None and querytables.sourceHash == TABLES_VERSION:
+            return (
+                querytables.norminalTolT1Z1Data,
+                MappingProxyType({feature: MappingProxyType(data) for feature, data in querytables.gaugeNorminalItRaData.items()}),
+                MappingProxyType(querytables.settingPlugGaugeNorminalItRaData)
+            )
+        return QueryData.parseTables()
+
+    @staticmethod
+    def _compileTables(norminalTolT1Z1Data, gaugeNorminalItRaData, settingPlugGaugeNorminalItRaData) -> tuple:
+        """
+        生成查询用的有序断点数组，每次查询只做二分查找。
+
+        Returns:
+            tuple: 按 _TABLE_NAMES 顺序排列的各表
+        """
+        # 表 3：尺寸段上限（升序）、尺寸段下限，每个尺寸段的公差值（升序）及对应的 (IT, T1, Z1)，T1、Z1 已换算为 mm
+        bandMaxs = tuple(sizeMax for (_, sizeMax), _ in norminalTolT1Z1Data)
+        bandMins = tuple(sizeMin for (sizeMin, _), _ in norminalTolT1Z1Data)
+        bandTols = tuple(tuple(tol for tol, _, _, _ in tolT1Z1List) for _, tolT1Z1List in norminalTolT1Z1Data)
+        with localcontext(DECIMAL_CONTEXT):
+            bandItT1Z1s = tuple(
+                tuple((it, t1 / Decimal('1000'), z1 / Decimal('1000')) for _, it, t1, z1 in tolT1Z1List)
+                for _, tolT1Z1List in norminalTolT1Z1Data
+            )
+        # 表 4、表 A.1：公差等级 -> (尺寸段下限（升序）, 尺寸段上限, 粗糙度)
+        gaugeRaIndex = MappingProxyType({
+            feature: QueryData._compileRaIndex(itRaData)
+            for feature, itRaData in gaugeNorminalItRaData.items()
+        })
+        settingPlugGaugeRaIndex = QueryData._compileRaIndex(settingPlugGaugeNorminalItRaData)
+
+        return (
+            norminalTolT1Z1Data, gaugeNorminalItRaData, settingPlugGaugeNorminalItRaData,
+            bandMaxs, bandMins, bandTols, bandItT1Z1s, gaugeRaIndex, settingPlugGaugeRaIndex
+        )
+
+    @staticmethod
+    def _compileRaIndex(itRaData: dict) -> dict:
+        """
+        把 {(IT下限, IT上限): (((尺寸下限, 尺寸上限), 粗糙度), ...)} 展开为按公差等级索引的有序断点数组，
+        公差等级范围重叠时与逐项查找一致，取先出现的范围
+        """
+        index = {}
+        for (itMin, itMax), norminalRaList in itRaData.items():
+            ordered = sorted(norminalRaList, key=lambda item: item[0][0])
+            compiled = (
+                tuple(norminalMin for (norminalMin, _), _ in ordered),
+                tuple(norminalMax for (_, norminalMax), _ in ordered),
+                tuple(ra for _, ra in ordered)
+            )
+            for it in range(itMin, itMax + 1):
+                index.setdefault(it, compiled)
+        return MappingProxyType(index)
+
+    @staticmethod
+    def _lookupRa(compiled: tuple | None, gaugeNorminal: Decimal) -> Decimal | None:
+        if compiled is None:
+            return None
+        norminalMins, norminalMaxs, ras = compiled
+        i = bisect_right(norminalMins, gaugeNorminal) - 1
+        if i >= 0 and gaugeNorminal < norminalMaxs[i]:
+            return ras[i]
+        return None
 
     def queryRa(self, feature: Literal['hole', 'shaft'], gaugeNorminal: Decimal, it: Literal[6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]) -> Decimal | None:
         """
@@ -77,12 +199,7 @@ class QueryData:
         Returns:
             Decimal: 粗糙度，单位：μm
         """
-        for itRange, norminalRaList in self.gaugeNorminalItRaData[feature].items():
-            if itRange[0] <= it <= itRange[1]:
-                for (norminalMin, norminalMax), ra in norminalRaList:
-                    if norminalMin <= gaugeNorminal < norminalMax:
-                        return ra
-        return None
+        return QueryData._lookupRa(self._gaugeRaIndex[feature].get(it), gaugeNorminal)
     
     def querySettingPlugGaugeRa(self, gaugeNorminal: Decimal, it: Literal[6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]) -> Decimal | None:
         """
@@ -95,12 +212,29 @@ class QueryData:
         Returns:
             Decimal: 粗糙度，单位：μm
         """
-        for itRange, norminalList in self.settingPlugGaugeNorminalItRaData.items():
-            if itRange[0] <= it <= itRange[1]:
-                for (norminalMin, norminalMax), ra in norminalList:
-                    if norminalMin <= gaugeNorminal < norminalMax:
-                        return ra
-        return None
+        return QueryData._lookupRa(self._settingPlugGaugeRaIndex.get(it), gaugeNorminal)
+
+    def queryBand(self, norminalSize: Decimal) -> int | None:
+        """
+        查询零件尺寸在表 3 中所属的尺寸段（sizeMin < norminalSize <= sizeMax）。
+
+        Args:
+            norminalSize (Decimal): 零件尺寸，单位：mm
+
+        Returns:
+            int | None: 尺寸段序号，超出 0-500 mm 时为 None
+        """
+        band = bisect_left(self._bandMaxs, norminalSize)
+        if band == len(self._bandMaxs) or not self._bandMins[band] < norminalSize:
+            return None
+        return band
+
+    def bandRange(self, band: int) -> tuple[Decimal, Decimal]:
+        """
+        Returns:
+            tuple: 尺寸段的 (sizeMin, sizeMax)，单位：mm
+        """
+        return self._bandMins[band], self._bandMaxs[band]
 
     def queryItT1Z1(self, norminalSize: Decimal, tolerance: Decimal):
         """
@@ -116,19 +250,19 @@ class QueryData:
                    T1：工作量规尺寸公差；
                    Z1：通端工作量规尺寸公差带的中心线至工作最大实体尺寸之间的距离。
         """
-        tolerance_um = tolerance * Decimal('1000')
-        print(f'【公差等级查询调试】名义尺寸：{norminalSize}, 公差：{tolerance_um}')
-        for (sizeMin, sizeMax), tolT1Z1List in self.norminalTolT1Z1Data:
-            if sizeMin < norminalSize <= sizeMax:
-                candidates = [(tol, it, t1, z1) for tol, it, t1, z1 in tolT1Z1List if tol <= tolerance_um]
-                if not candidates:
-                    return None
-                best = max(candidates, key=lambda x: x[0])
-                return best[1], best[2] / Decimal('1000'), best[3] / Decimal('1000')
-        return None
+        with localcontext(DECIMAL_CONTEXT):
+            tolerance_um = tolerance * Decimal('1000')
+        band = self.queryBand(norminalSize)
+        if band is None:
+            return None
+        # 不超过零件公差的最大公差值
+        i = bisect_right(self._bandTols[band], tolerance_um) - 1
+        if i < 0:
+            return None
+        return self._bandItT1Z1s[band][i]
 
     # 公差等级 IT6-IT16
-    ItLevels = [i for i in range(6, 17)]
+    ItLevels = tuple(range(6, 17))
 
     # 《GB/T 1957-2006》 表 A.1
     # 校规公称尺寸、零件公差等级和量规粗糙度表
@@ -442,3 +576,12 @@ class QueryData:
             }
         ]
     '''
+
+# 内嵌 JSON 表的摘要，表数据有任何修改都会变化
+TABLES_VERSION = hashlib.sha256(
+    '\0'.join((
+        QueryData.norminalTolT1Z1Json,
+        QueryData.gaugeNorminalItRaJson,
+        QueryData.settingPlugGaugeNorminalItRaJson
+    )).encode('utf-8')
+).hexdigest()
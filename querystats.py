@@ -0,0 +1,92 @@
+from querydata import QueryData
+
+import logging
+import time
+from typing import Callable
+
+# 统计的查询方法
+QUERY_NAMES = ('queryItT1Z1', 'queryRa', 'querySettingPlugGaugeRa')
+
+# 回调参数：(查询方法名, 参数元组, 查询结果, 用时（秒）)
+QueryCallback = Callable[[str, tuple, object, float], None]
+
+class QueryStats:
+    """
+    各查询方法的调用次数和累计用时
+    """
+    __slots__ = ('counts', 'totals')
+
+    def __init__(self):
+        self.counts = dict.fromkeys(QUERY_NAMES, 0)
+        self.totals = dict.fromkeys(QUERY_NAMES, 0.0)
+
+    def reset(self):
+        for name in QUERY_NAMES:
+            self.counts[name] = 0
+            self.totals[name] = 0.0
+
+    def asDict(self) -> dict:
+        """
+        Returns:
+            dict: {查询方法名: {'count': 调用次数, 'totalSeconds': 累计用时, 'meanMicroseconds': 平均用时}}
+        """
+        return {
+            name: {
+                'count': self.counts[name],
+                'totalSeconds': self.totals[name],
+                'meanMicroseconds': self.totals[name] / self.counts[name] * 1e6 if self.counts[name] else 0.0
+            }
+            for name in QUERY_NAMES
+        }
+
+class InstrumentedQueryData:
+    """
+    带计数、计时和回调的 QueryData 包装，可直接传给 GaugeDesignEngine。
+    不需要统计时直接使用 QueryData，查询路径上没有任何额外开销。
+    """
+    def __init__(self, queryData: QueryData | None = None, callback: QueryCallback | None = None, clock: Callable[[], float] = time.perf_counter):
+        self.queryData = queryData if queryData is not None else QueryData()
+        self.callback = callback
+        self.clock = clock
+        self.stats = QueryStats()
+
+    def __getattr__(self, name):
+        return getattr(self.queryData, name)
+
+    def _record(self, name: str, args: tuple, start: float):
+        result = getattr(self.queryData, name)(*args)
+        elapsed = self.clock() - start
+        self.stats.counts[name] += 1
+        self.stats.totals[name] += elapsed
+        if self.callback is not None:
+            self.callback(name, args, result, elapsed)
+        return result
+
+    def queryItT1Z1(self, norminalSize, tolerance):
+        return self._record('queryItT1Z1', (norminalSize, tolerance), self.clock())
+
+    def queryRa(self, feature, gaugeNorminal, it):
+        return self._record('queryRa', (feature, gaugeNorminal, it), self.clock())
+
+    def querySettingPlugGaugeRa(self, gaugeNorminal, it):
+        return self._record('querySettingPlugGaugeRa', (gaugeNorminal, it), self.clock())
+
+def loggingCallback(logger: logging.Logger | None = None, level: int = logging.DEBUG) -> QueryCallback:
+    """
+    生成把每次查询写入日志的回调
+
+    Args:
+        logger (logging.Logger | None): 日志记录器，默认为本模块的记录器
+        level (int): 日志级别
+
+    Returns:
+        QueryCallback: 回调
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    def callback(name, args, result, elapsed):
+        if logger.isEnabledFor(level):
+            logger.log(level, '%s%r -> %r (%.1f μs)', name, args, result, elapsed * 1e6)
+
+    return callback
@@ -0,0 +1,193 @@
+# 由 savequerytables.py 根据 querydata.py 中内嵌的 JSON 表生成，请勿手工修改
+from decimal import Decimal
+
+sourceHash = '2eb39ee44ea1aa946803c360470c23745fca0acef493c3b6499f6471df35b67f'
+
+norminalTolT1Z1Data = (((Decimal('0'), Decimal('3')),
+  ((Decimal('6'), 6, Decimal('1'), Decimal('1')),
+   (Decimal('10'), 7, Decimal('1.2'), Decimal('1.6')),
+   (Decimal('14'), 8, Decimal('1.6'), Decimal('2')),
+   (Decimal('25'), 9, Decimal('2'), Decimal('3')),
+   (Decimal('40'), 10, Decimal('2.4'), Decimal('4')),
+   (Decimal('60'), 11, Decimal('3'), Decimal('6')),
+   (Decimal('100'), 12, Decimal('4'), Decimal('9')),
+   (Decimal('140'), 13, Decimal('6'), Decimal('14')),
+   (Decimal('250'), 14, Decimal('9'), Decimal('20')),
+   (Decimal('400'), 15, Decimal('14'), Decimal('30')),
+   (Decimal('600'), 16, Decimal('20'), Decimal('40')))),
+ ((Decimal('3'), Decimal('6')),
+  ((Decimal('8'), 6, Decimal('1.2'), Decimal('1.4')),
+   (Decimal('12'), 7, Decimal('1.4'), Decimal('2')),
+   (Decimal('18'), 8, Decimal('2'), Decimal('2.6')),
+   (Decimal('30'), 9, Decimal('2.4'), Decimal('4')),
+   (Decimal('48'), 10, Decimal('3'), Decimal('5')),
+   (Decimal('75'), 11, Decimal('4'), Decimal('8')),
+   (Decimal('120'), 12, Decimal('5'), Decimal('11')),
+   (Decimal('180'), 13, Decimal('7'), Decimal('16')),
+   (Decimal('300'), 14, Decimal('11'), Decimal('25')),
+   (Decimal('480'), 15, Decimal('16'), Decimal('35')),
+   (Decimal('750'), 16, Decimal('25'), Decimal('50')))),
+ ((Decimal('6'), Decimal('10')),
+  ((Decimal('9'), 6, Decimal('1.4'), Decimal('1.6')),
+   (Decimal('15'), 7, Decimal('1.8'), Decimal('2.4')),
+   (Decimal('22'), 8, Decimal('2.4'), Decimal('3.2')),
+   (Decimal('36'), 9, Decimal('2.8'), Decimal('5')),
+   (Decimal('58'), 10, Decimal('3.6'), Decimal('6')),
+   (Decimal('90'), 11, Decimal('5'), Decimal('9')),
+   (Decimal('150'), 12, Decimal('6'), Decimal('13')),
+   (Decimal('220'), 13, Decimal('8'), Decimal('20')),
+   (Decimal('360'), 14, Decimal('13'), Decimal('30')),
+   (Decimal('580'), 15, Decimal('20'), Decimal('40')),
+   (Decimal('900'), 16, Decimal('30'), Decimal('60')))),
+ ((Decimal('10'), Decimal('18')),
+  ((Decimal('11'), 6, Decimal('1.6'), Decimal('2')),
+   (Decimal('18'), 7, Decimal('2'), Decimal('2.8')),
+   (Decimal('27'), 8, Decimal('2.8'), Decimal('4')),
+   (Decimal('43'), 9, Decimal('3.4'), Decimal('6')),
+   (Decimal('70'), 10, Decimal('4'), Decimal('8')),
+   (Decimal('110'), 11, Decimal('6'), Decimal('11')),
+   (Decimal('180'), 12, Decimal('7'), Decimal('15')),
+   (Decimal('270'), 13, Decimal('10'), Decimal('24')),
+   (Decimal('430'), 14, Decimal('15'), Decimal('35')),
+   (Decimal('700'), 15, Decimal('24'), Decimal('50')),
+   (Decimal('1100'), 16, Decimal('35'), Decimal('75')))),
+ ((Decimal('18'), Decimal('30')),
+  ((Decimal('13'), 6, Decimal('2'), Decimal('2.4')),
+   (Decimal('21'), 7, Decimal('2.4'), Decimal('3.4')),
+   (Decimal('33'), 8, Decimal('3.4'), Decimal('5')),
+   (Decimal('52'), 9, Decimal('4'), Decimal('7')),
+   (Decimal('84'), 10, Decimal('5'), Decimal('9')),
+   (Decimal('130'), 11, Decimal('7'), Decimal('13')),
+   (Decimal('210'), 12, Decimal('8'), Decimal('18')),
+   (Decimal('330'), 13, Decimal('12'), Decimal('28')),
+   (Decimal('520'), 14, Decimal('18'), Decimal('40')),
+   (Decimal('840'), 15, Decimal('28'), Decimal('60')),
+   (Decimal('1300'), 16, Decimal('40'), Decimal('90')))),
+ ((Decimal('30'), Decimal('50')),
+  ((Decimal('16'), 6, Decimal('2.4'), Decimal('2.8')),
+   (Decimal('25'), 7, Decimal('3'), Decimal('4')),
+   (Decimal('39'), 8, Decimal('4'), Decimal('6')),
+   (Decimal('62'), 9, Decimal('5'), Decimal('8')),
+   (Decimal('100'), 10, Decimal('6'), Decimal('11')),
+   (Decimal('160'), 11, Decimal('8'), Decimal('16')),
+   (Decimal('250'), 12, Decimal('10'), Decimal('22')),
+   (Decimal('390'), 13, Decimal('14'), Decimal('34')),
+   (Decimal('620'), 14, Decimal('22'), Decimal('50')),
+   (Decimal('840'), 15, Decimal('28'), Decimal('60')),
+   (Decimal('1300'), 16, Decimal('40'), Decimal('90')))),
+ ((Decimal('50'), Decimal('80')),
+  ((Decimal('19'), 6, Decimal('2.8'), Decimal('3.4')),
+   (Decimal('30'), 7, Decimal('3.6'), Decimal('4.6')),
+   (Decimal('46'), 8, Decimal('4.6'), Decimal('7')),
+   (Decimal('74'), 9, Decimal('6'), Decimal('9')),
+   (Decimal('120'), 10, Decimal('7'), Decimal('13')),
+   (Decimal('190'), 11, Decimal('9'), Decimal('19')),
+   (Decimal('300'), 12, Decimal('12'), Decimal('26')),
+   (Decimal('460'), 13, Decimal('16'), Decimal('40')),
+   (Decimal('740'), 14, Decimal('26'), Decimal('60')),
+   (Decimal('1200'), 15, Decimal('40'), Decimal('90')),
+   (Decimal('1900'), 16, Decimal('60'), Decimal('130')))),
+ ((Decimal('80'), Decimal('120')),
+  ((Decimal('22'), 6, Decimal('3.2'), Decimal('3.8')),
+   (Decimal('35'), 7, Decimal('4.2'), Decimal('5.4')),
+   (Decimal('54'), 8, Decimal('5.4'), Decimal('8')),
+   (Decimal('87'), 9, Decimal('7'), Decimal('10')),
+   (Decimal('140'), 10, Decimal('8'), Decimal('15')),
+   (Decimal('220'), 11, Decimal('10'), Decimal('22')),
+   (Decimal('350'), 12, Decimal('14'), Decimal('30')),
+   (Decimal('540'), 13, Decimal('20'), Decimal('46')),
+   (Decimal('870'), 14, Decimal('30'), Decimal('70')),
+   (Decimal('1400'), 15, Decimal('46'), Decimal('100')),
+   (Decimal('2200'), 16, Decimal('70'), Decimal('150')))),
+ ((Decimal('120'), Decimal('180')),
+  ((Decimal('25'), 6, Decimal('3.8'), Decimal('4.4')),
+   (Decimal('40'), 7, Decimal('4.8'), Decimal('6')),
+   (Decimal('63'), 8, Decimal('6'), Decimal('9')),
+   (Decimal('100'), 9, Decimal('8'), Decimal('12')),
+   (Decimal('160'), 10, Decimal('9'), Decimal('18')),
+   (Decimal('250'), 11, Decimal('12'), Decimal('25')),
+   (Decimal('400'), 12, Decimal('16'), Decimal('35')),
+   (Decimal('630'), 13, Decimal('22'), Decimal('52')),
+   (Decimal('1000'), 14, Decimal('35'), Decimal('80')),
+   (Decimal('1600'), 15, Decimal('52'), Decimal('120')),
+   (Decimal('2500'), 16, Decimal('80'), Decimal('180')))),
+ ((Decimal('180'), Decimal('250')),
+  ((Decimal('29'), 6, Decimal('4.4'), Decimal('5')),
+   (Decimal('46'), 7, Decimal('5.4'), Decimal('7')),
+   (Decimal('72'), 8, Decimal('7'), Decimal('10')),
+   (Decimal('115'), 9, Decimal('9'), Decimal('14')),
+   (Decimal('185'), 10, Decimal('10'), Decimal('20')),
+   (Decimal('290'), 11, Decimal('14'), Decimal('29')),
+   (Decimal('460'), 12, Decimal('18'), Decimal('40')),
+   (Decimal('720'), 13, Decimal('26'), Decimal('60')),
+   (Decimal('1150'), 14, Decimal('40'), Decimal('90')),
+   (Decimal('1850'), 15, Decimal('60'), Decimal('130')),
+   (Decimal('2900'), 16, Decimal('90'), Decimal('200')))),
+ ((Decimal('250'), Decimal('315')),
+  ((Decimal('32'), 6, Decimal('4.8'), Decimal('5.6')),
+   (Decimal('52'), 7, Decimal('6'), Decimal('8')),
+   (Decimal('81'), 8, Decimal('8'), Decimal('11')),
+   (Decimal('130'), 9, Decimal('10'), Decimal('16')),
+   (Decimal('210'), 10, Decimal('12'), Decimal('22')),
+   (Decimal('320'), 11, Decimal('16'), Decimal('32')),
+   (Decimal('520'), 12, Decimal('20'), Decimal('45')),
+   (Decimal('810'), 13, Decimal('28'), Decimal('66')),
+   (Decimal('1300'), 14, Decimal('45'), Decimal('100')),
+   (Decimal('2100'), 15, Decimal('66'), Decimal('150')),
+   (Decimal('3200'), 16, Decimal('100'), Decimal('220')))),
+ ((Decimal('315'), Decimal('400')),
+  ((Decimal('36'), 6, Decimal('5.4'), Decimal('6.2')),
+   (Decimal('57'), 7, Decimal('7'), Decimal('9')),
+   (Decimal('89'), 8, Decimal('9'), Decimal('12')),
+   (Decimal('140'), 9, Decimal('11'), Decimal('18')),
+   (Decimal('230'), 10, Decimal('14'), Decimal('25')),
+   (Decimal('360'), 11, Decimal('18'), Decimal('36')),
+   (Decimal('570'), 12, Decimal('22'), Decimal('50')),
+   (Decimal('890'), 13, Decimal('32'), Decimal('74')),
+   (Decimal('1400'), 14, Decimal('50'), Decimal('110')),
+   (Decimal('2300'), 15, Decimal('74'), Decimal('170')),
+   (Decimal('3600'), 16, Decimal('110'), Decimal('250')))),
+ ((Decimal('400'), Decimal('500')),
+  ((Decimal('40'), 6, Decimal('6'), Decimal('7')),
+   (Decimal('63'), 7, Decimal('8'), Decimal('10')),
+   (Decimal('97'), 8, Decimal('10'), Decimal('14')),
+   (Decimal('155'), 9, Decimal('12'), Decimal('20')),
+   (Decimal('250'), 10, Decimal('16'), Decimal('28')),
+   (Decimal('400'), 11, Decimal('20'), Decimal('40')),
+   (Decimal('630'), 12, Decimal('24'), Decimal('55')),
+   (Decimal('970'), 13, Decimal('36'), Decimal('80')),
+   (Decimal('1550'), 14, Decimal('55'), Decimal('120')),
+   (Decimal('2500'), 15, Decimal('80'), Decimal('190')),
+   (Decimal('4000'), 16, Decimal('120'), Decimal('280')))))
+
+gaugeNorminalItRaData = {'hole': {(6, 6): (((Decimal('0'), Decimal('120')), Decimal('0.05')),
+                   ((Decimal('120'), Decimal('315')), Decimal('0.1')),
+                   ((Decimal('315'), Decimal('500')), Decimal('0.2'))),
+          (7, 9): (((Decimal('0'), Decimal('120')), Decimal('0.1')),
+                   ((Decimal('120'), Decimal('315')), Decimal('0.2')),
+                   ((Decimal('315'), Decimal('500')), Decimal('0.4'))),
+          (10, 12): (((Decimal('0'), Decimal('120')), Decimal('0.2')),
+                     ((Decimal('120'), Decimal('315')), Decimal('0.4')),
+                     ((Decimal('315'), Decimal('500')), Decimal('0.8'))),
+          (13, 16): (((Decimal('0'), Decimal('120')), Decimal('0.4')),
+                     ((Decimal('120'), Decimal('315')), Decimal('0.8')),
+                     ((Decimal('315'), Decimal('500')), Decimal('0.8')))},
+ 'shaft': {(6, 9): (((Decimal('0'), Decimal('120')), Decimal('0.1')),
+                    ((Decimal('120'), Decimal('315')), Decimal('0.2')),
+                    ((Decimal('315'), Decimal('500')), Decimal('0.4'))),
+           (10, 12): (((Decimal('0'), Decimal('120')), Decimal('0.2')),
+                      ((Decimal('120'), Decimal('315')), Decimal('0.4')),
+                      ((Decimal('315'), Decimal('500')), Decimal('0.8'))),
+           (13, 16): (((Decimal('0'), Decimal('120')), Decimal('0.4')),
+                      ((Decimal('120'), Decimal('315')), Decimal('0.8')),
+                      ((Decimal('315'), Decimal('500')), Decimal('0.8')))}}
+
+settingPlugGaugeNorminalItRaData = {(6, 9): (((Decimal('0'), Decimal('120')), Decimal('0.05')),
+          ((Decimal('120'), Decimal('315')), Decimal('0.1')),
+          ((Decimal('315'), Decimal('500')), Decimal('0.2'))),
+ (10, 12): (((Decimal('0'), Decimal('120')), Decimal('0.1')),
+            ((Decimal('120'), Decimal('315')), Decimal('0.2')),
+            ((Decimal('315'), Decimal('500')), Decimal('0.4'))),
+ (13, 16): (((Decimal('0'), Decimal('120')), Decimal('0.2')),
+            ((Decimal('120'), Decimal('315')), Decimal('0.4')),
+            ((Decimal('315'), Decimal('500')), Decimal('0.4')))}
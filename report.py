@@ -0,0 +1,427 @@
+"""
+量规数据表：把批量计算的记录逐条写成交给量规车间的数据表，代替界面截图。
+
+两种版式：
+    summary  汇总表，一个零件一行，含通规、止规、磨损极限、TT/TS/ZT 校对塞规和粗糙度
+    sheets   每个零件一张数据表（零件参数 + 各量规的尺寸），HTML 打印时每张一页
+
+三种格式：HTML、CSV、XLSX。数值与界面相同，由 fmt 格式化（asRecord() 的字符串原样写出）。
+全部逐条写出，内存占用与零件数无关；HTML、CSV 可用 gzip 压缩，XLSX 本身即为 zip 压缩，
+用 zipfile 流式写入工作表，超出 Excel 行数上限时续写到下一个工作表。
+"""
+from gaugedesign import GAUGE_DIMENSION_SUFFIXES, GAUGE_FIELDS
+
+import csv
+import gzip
+import html
+import io
+import sys
+import zipfile
+from contextlib import ExitStack
+from typing import BinaryIO, Literal, TextIO
+from xml.sax.saxutils import escape
+
+REPORT_FORMATS = ('html', 'csv', 'xlsx')
+LAYOUTS = ('summary', 'sheets')
+
+# 量规名称，与界面一致
+GAUGE_TITLES = {
+    'goGauge': 'T 通规',
+    'noGoGauge': 'Z 止规',
+    'goGoSettingPlugGauge': 'TT “校通-通” 塞规',
+    'goWearSettingPlugGauge': 'TS “校通-损” 塞规',
+    'noGoGoSettingPlugGauge': 'ZT “校止-通” 塞规',
+}
+FEATURE_TITLES = {'shaft': '轴', 'hole': '孔'}
+DIMENSION_TITLES = {'NorminalSize': '名义尺寸', 'UpperDeviation': '上偏差', 'LowerDeviation': '下偏差', 'WearLimit': '磨损极限', 'Ra': '粗糙度Ra'}
+
+# 零件参数列：(字段, 标题, 是否数值)
+PART_COLUMNS = (
+    ('norminalSize', '名义尺寸', True),
+    ('upperDeviation', '上偏差', True),
+    ('lowerDeviation', '下偏差', True),
+    ('it', '公差等级', False),
+    ('t1', 'T1', True),
+    ('z1', 'Z1', True),
+)
+
+# 汇总表的列，顺序与界面从左到右、从上到下一致
+SUMMARY_COLUMNS = (
+    ('row', '行号', True),
+    ('id', '编号', False),
+    ('feature', '零件', False),
+    *PART_COLUMNS,
+    *(
+        (f'{name}{suffix}', f'{GAUGE_TITLES[name]} {DIMENSION_TITLES[suffix]}', True)
+        for name in GAUGE_FIELDS
+        for suffix in (('NorminalSize', 'UpperDeviation', 'LowerDeviation', 'WearLimit', 'Ra') if name == 'goGauge' else GAUGE_DIMENSION_SUFFIXES)
+    ),
+    ('error', '信息', False),
+)
+
+# 数据表中各量规一行的列
+SHEET_GAUGE_HEADER = ('量规', *(DIMENSION_TITLES[suffix] for suffix in ('NorminalSize', 'UpperDeviation', 'LowerDeviation', 'WearLimit', 'Ra')))
+
+# XLSX 工作表的最大行数
+XLSX_MAX_ROWS = 1_048_576
+
+class Number(str):
+    """
+    数值单元格：内容仍是 fmt 格式化的字符串，XLSX 中写为数值，便于在 Excel 中计算
+    """
+    __slots__ = ()
+
+def detectReportFormat(path: str, default: Literal['html', 'csv', 'xlsx'] = 'html') -> Literal['html', 'csv', 'xlsx']:
+    """
+    根据文件扩展名（忽略 .gz）判断报表格式
+
+    Args:
+        path (str): 文件路径，'-' 表示标准输出
+        default (str): 无法判断时使用的格式
+    """
+    lower = path.lower().removesuffix('.gz')
+    if lower.endswith(('.html', '.htm')):
+        return 'html'
+    if lower.endswith('.csv'):
+        return 'csv'
+    if lower.endswith('.xlsx'):
+        return 'xlsx'
+    return default
+
+def openReportStream(stack: ExitStack, path: str, reportFormat: Literal['html', 'csv', 'xlsx'], compress: bool = False) -> TextIO | BinaryIO:
+    """
+    打开报表输出流，'-' 表示标准输出；XLSX 为二进制流，其余为文本流
+
+    Args:
+        stack (ExitStack): 负责关闭打开的文件
+        compress (bool): 是否 gzip 压缩，XLSX 不能再压缩
+
+    Raises:
+        ValueError: 对 XLSX 要求 gzip 压缩
+    """
+    if reportFormat == 'xlsx':
+        if compress:
+            raise ValueError('XLSX 本身已是压缩格式，不能再 gzip 压缩')
+        if path == '-':
+            return sys.stdout.buffer
+        return stack.enter_context(open(path, 'wb'))
+    # CSV 带 BOM 以便 Excel 正确显示中文
+    encoding = 'utf-8-sig' if reportFormat == 'csv' else 'utf-8'
+    if not compress:
+        if path == '-':
+            return sys.stdout
+        return stack.enter_context(open(path, 'w', encoding=encoding, newline=''))
+    binary = sys.stdout.buffer if path == '-' else stack.enter_context(open(path, 'wb'))
+    compressed = stack.enter_context(gzip.GzipFile(fileobj=binary, mode='wb'))
+    return stack.enter_context(io.TextIOWrapper(compressed, encoding=encoding, newline=''))
+
+class ReportWriter:
+    """
+    逐条写出量规数据表，与 batch.RecordWriter 一样可交给 batch.runBatch()；写完后须调用 close() 写出结尾
+    """
+    def __init__(self, stream: TextIO | BinaryIO, reportFormat: Literal['html', 'csv', 'xlsx'], layout: Literal['summary', 'sheets'] = 'summary', title: str = '量规数据表'):
+        """
+        Args:
+            stream (TextIO | BinaryIO): 输出流，XLSX 为二进制流，见 openReportStream()
+            reportFormat (str): REPORT_FORMATS 之一
+            layout (str): LAYOUTS 之一
+            title (str): 报表标题
+
+        Raises:
+            ValueError: 不支持的格式或版式
+        """
+        match reportFormat:
+            case 'html':
+                self._sink = _HtmlSink(stream, title)
+            case 'csv':
+                self._sink = _CsvSink(stream)
+            case 'xlsx':
+                self._sink = _XlsxSink(stream)
+            case _:
+                raise ValueError(f'不支持的报表格式：{reportFormat}')
+        if layout not in LAYOUTS:
+            raise ValueError(f'不支持的版式：{layout}')
+        self.layout = layout
+        self.title = title
+        self._closed = False
+        if layout == 'summary':
+            self._sink.heading(title)
+            self._sink.tableHeader([text for _, text, _ in SUMMARY_COLUMNS])
+
+    def write(self, record: dict):
+        if self.layout == 'summary':
+            self._sink.row([_cell(record, field, numeric) for field, _, numeric in SUMMARY_COLUMNS])
+        else:
+            self._writeSheet(record)
+
+    def _writeSheet(self, record: dict):
+        """
+        一个零件的数据表：标题、零件参数、各量规尺寸（孔没有校对塞规）
+        """
+        name = record.get('id') or f'第 {record.get("row", "")} 行'
+        self._sink.sheetStart(f'{self.title}：{name}')
+        if 'error' in record:
+            self._sink.tableHeader(['名义尺寸', '信息'])
+            self._sink.row([record.get('norminalSize', ''), record['error']])
+            self._sink.sheetEnd()
+            return
+        self._sink.tableHeader(['零件', *(text for _, text, _ in PART_COLUMNS)])
+        self._sink.row([
+            FEATURE_TITLES.get(record['feature'], record['feature']),
+            *(_cell(record, field, numeric) for field, _, numeric in PART_COLUMNS)
+        ])
+        self._sink.tableEnd()
+        self._sink.tableHeader(SHEET_GAUGE_HEADER)
+        for gauge in GAUGE_FIELDS:
+            if not record.get(f'{gauge}NorminalSize'):
+                continue
+            self._sink.row([
+                GAUGE_TITLES[gauge],
+                *(_cell(record, f'{gauge}{suffix}', True) for suffix in ('NorminalSize', 'UpperDeviation', 'LowerDeviation', 'WearLimit', 'Ra'))
+            ])
+        self._sink.sheetEnd()
+
+    def close(self):
+        """
+        写出结尾（HTML 的闭合标签、XLSX 的工作簿目录），不关闭 stream
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _cell(record: dict, field: str, numeric: bool) -> str:
+    value = record.get(field, '')
+    if field == 'feature':
+        return FEATURE_TITLES.get(value, value)
+    if numeric and value != '' and value != '—':
+        return Number(value)
+    return str(value)
+
+class _CsvSink:
+    """
+    CSV：标题、表头、数据依次为一行，数据表之间空一行
+    """
+    def __init__(self, stream: TextIO):
+        self._writer = csv.writer(stream, lineterminator='\n')
+
+    def heading(self, text: str):
+        # 汇总表第一行即为表头，便于其他程序读取
+        pass
+
+    def tableHeader(self, cells):
+        self._writer.writerow(cells)
+
+    def row(self, cells):
+        self._writer.writerow(cells)
+
+    def tableEnd(self):
+        pass
+
+    def sheetStart(self, text: str):
+        self._writer.writerow([text])
+
+    def sheetEnd(self):
+        self._writer.writerow([])
+
+    def close(self):
+        pass
+
+class _HtmlSink:
+    """
+    HTML：汇总表为一个 table；每张数据表为一个 section，打印时分页
+    """
+    STYLE = (
+        'body{font-family:sans-serif;font-size:10pt}'
+        'table{border-collapse:collapse;margin:0 0 1em}'
+        'th,td{border:1px solid #888;padding:2px 6px}'
+        'td.n{text-align:right;font-variant-numeric:tabular-nums}'
+        'section{break-after:page}'
+        '@media screen{section{border-bottom:1px dashed #888;margin-bottom:2em}}'
+    )
+
+    def __init__(self, stream: TextIO, title: str):
+        self._stream = stream
+        self._inTable = False
+        stream.write(
+            f'<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{html.escape(title)}</title>\n<style>{self.STYLE}</style>\n</head>\n<body>\n'
+        )
+
+    def heading(self, text: str):
+        self._stream.write(f'<h1>{html.escape(text)}</h1>\n')
+
+    def tableHeader(self, cells):
+        self.tableEnd()
+        self._inTable = True
+        self._stream.write('<table>\n<thead><tr>')
+        self._stream.write(''.join(f'<th>{html.escape(cell)}</th>' for cell in cells))
+        self._stream.write('</tr></thead>\n<tbody>\n')
+
+    def row(self, cells):
+        self._stream.write('<tr>')
+        self._stream.write(''.join(
+            f'<td class="n">{html.escape(cell)}</td>' if isinstance(cell, Number) else f'<td>{html.escape(cell)}</td>'
+            for cell in cells
+        ))
+        self._stream.write('</tr>\n')
+
+    def tableEnd(self):
+        if self._inTable:
+            self._inTable = False
+            self._stream.write('</tbody>\n</table>\n')
+
+    def sheetStart(self, text: str):
+        self._stream.write(f'<section>\n<h2>{html.escape(text)}</h2>\n')
+
+    def sheetEnd(self):
+        self.tableEnd()
+        self._stream.write('</section>\n')
+
+    def close(self):
+        self.tableEnd()
+        self._stream.write('</body>\n</html>\n')
+
+class _XlsxSink:
+    """
+    XLSX（Office Open XML）：单元格用内联字符串和数值，不需要共享字符串表，因此可以逐行写出。
+    [Content_Types].xml 用扩展名默认类型覆盖所有工作表，工作表个数在写完后才写入 workbook.xml
+    """
+    NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    NS_PKG = 'http://schemas.openxmlformats.org/package/2006/relationships'
+    CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    )
+    ROOT_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="{NS_PKG}">'
+        f'<Relationship Id="rId1" Type="{NS_R}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    # 样式 0 为默认，1 为粗体（标题、表头）
+    STYLES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<styleSheet xmlns="{NS}">'
+        '<fonts count="2"><font><sz val="11"/><name val="等线"/></font><font><b/><sz val="11"/><name val="等线"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '</styleSheet>'
+    )
+
+    def __init__(self, stream: BinaryIO):
+        self._zip = zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED)
+        self._zip.writestr('[Content_Types].xml', self.CONTENT_TYPES)
+        self._zip.writestr('_rels/.rels', self.ROOT_RELS)
+        self._zip.writestr('xl/styles.xml', self.STYLES)
+        self._sheet = None
+        self._sheetCount = 0
+        self._rowCount = 0
+        # 当前表头，换工作表时重复
+        self._header = None
+        self._columnNames = []
+
+    def _openSheet(self):
+        self._closeSheet()
+        self._sheetCount += 1
+        self._rowCount = 0
+        # force_zip64：工作表大小事先未知，可能超过 2 GiB
+        self._sheet = self._zip.open(f'xl/worksheets/sheet{self._sheetCount}.xml', 'w', force_zip64=True)
+        self._sheet.write(
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{self.NS}"><sheetData>'.encode()
+        )
+
+    def _closeSheet(self):
+        if self._sheet is not None:
+            self._sheet.write(b'</sheetData></worksheet>')
+            self._sheet.close()
+            self._sheet = None
+
+    def _columnName(self, index: int) -> str:
+        while len(self._columnNames) <= index:
+            n = len(self._columnNames) + 1
+            name = ''
+            while n:
+                n, r = divmod(n - 1, 26)
+                name = chr(ord('A') + r) + name
+            self._columnNames.append(name)
+        return self._columnNames[index]
+
+    def _writeRow(self, cells, style: int = 0):
+        if self._sheet is None or self._rowCount >= XLSX_MAX_ROWS:
+            self._openSheet()
+            if self._header is not None and cells is not self._header:
+                self._writeRow(self._header, 1)
+        self._rowCount += 1
+        r = self._rowCount
+        parts = [f'<row r="{r}">']
+        styleAttribute = f' s="{style}"' if style else ''
+        for i, cell in enumerate(cells):
+            if cell == '':
+                continue
+            ref = f'{self._columnName(i)}{r}'
+            if isinstance(cell, Number):
+                parts.append(f'<c r="{ref}"{styleAttribute}><v>{cell}</v></c>')
+            else:
+                parts.append(f'<c r="{ref}" t="inlineStr"{styleAttribute}><is><t>{escape(cell)}</t></is></c>')
+        parts.append('</row>')
+        self._sheet.write(''.join(parts).encode())
+
+    def heading(self, text: str):
+        self._writeRow([text], 1)
+
+    def tableHeader(self, cells):
+        self._header = list(cells)
+        self._writeRow(self._header, 1)
+
+    def row(self, cells):
+        self._writeRow(cells)
+
+    def tableEnd(self):
+        pass
+
+    def sheetStart(self, text: str):
+        self._header = None
+        self._writeRow([text], 1)
+
+    def sheetEnd(self):
+        self._header = None
+        self._writeRow([])
+
+    def close(self):
+        if self._sheet is None:
+            self._openSheet()
+        self._closeSheet()
+        sheets = ''.join(
+            f'<sheet name="Sheet{i}" sheetId="{i}" r:id="rId{i}"/>' for i in range(1, self._sheetCount + 1)
+        )
+        self._zip.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{self.NS}" xmlns:r="{self.NS_R}"><sheets>{sheets}</sheets></workbook>'
+        ))
+        relationships = ''.join(
+            f'<Relationship Id="rId{i}" Type="{self.NS_R}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, self._sheetCount + 1)
+        )
+        self._zip.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{self.NS_PKG}">{relationships}'
+            f'<Relationship Id="rId{self._sheetCount + 1}" Type="{self.NS_R}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        self._zip.close()
@@ -0,0 +1,317 @@
+"""
+可选的磁盘结果缓存（SQLite，WAL 模式），跨会话、跨进程共用。
+
+以 (查询表版本, 零件特征, 名义尺寸, 上偏差, 下偏差) 为键保存 asRecord() 的结果；
+查询表有改动时 TABLES_VERSION 随之变化，旧条目不再命中，由淘汰或 vacuum 清除。
+"""
+from querydata import TABLES_VERSION
+from gaugedesign import RECORD_FIELDS, parseNumber
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+# 环境变量：设为 SQLite 文件路径时界面和批量计算使用磁盘缓存，设为 1 时使用 defaultCachePath()
+CACHE_ENV = 'PLAIN_LIMIT_GAUGE_DESIGNER_CACHE'
+
+# 默认最多保存的条目数，超出后先删除旧表版本的条目，再删除最久未用的条目
+DEFAULT_MAX_ENTRIES = 1_000_000
+# 超出上限多少比例后才淘汰，避免每次写入都删除
+EVICTION_SLACK = 0.1
+# 写入多少条后检查一次条目数
+EVICTION_CHECK_INTERVAL = 1000
+
+# 库中保存的表版本：TABLES_VERSION 的前 16 位十六进制数已足够区分，且每条记录都要保存一次
+VERSION_KEY = TABLES_VERSION[:16]
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    tablesVersion TEXT NOT NULL,
+    key TEXT NOT NULL,
+    record TEXT, -- 按 RECORD_FIELDS 顺序排列的 JSON 数组
+    error TEXT,
+    lastUsed INTEGER NOT NULL,
+    PRIMARY KEY (tablesVersion, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resultsLastUsed ON results (lastUsed);
+'''
+
+def defaultCachePath() -> str:
+    """
+    Returns:
+        str: Windows 为 %LOCALAPPDATA%，其他系统为 $XDG_CACHE_HOME 或 ~/.cache 下的 plain-limit-gauge-designer/results.sqlite3
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'plain-limit-gauge-designer', 'results.sqlite3')
+
+def cachePathFromEnv() -> str | None:
+    """
+    Returns:
+        str | None: 环境变量 CACHE_ENV 指定的缓存文件，未设置时为 None
+    """
+    value = os.environ.get(CACHE_ENV, '').strip()
+    if not value:
+        return None
+    return defaultCachePath() if value == '1' else value
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+def _loadRecord(text: str | None) -> dict | None:
+    return None if text is None else dict(zip(RECORD_FIELDS, json.loads(text)))
+
+class ResultCache:
+    """
+    SQLite 结果缓存。同一实例可在多个线程中使用；多个进程可同时打开同一文件。
+
+    写入先放在内存中，满 writeBatchSize 条或调用 flush() / close() 时一次提交；
+    命中时最近使用日期每天最多更新一次，读取基本不产生写入
+    """
+    def __init__(self, path: str | None = None, maxEntries: int = DEFAULT_MAX_ENTRIES, writeBatchSize: int = 256, timeout: float = 5.0):
+        self.path = path or defaultCachePath()
+        self.maxEntries = maxEntries
+        self.writeBatchSize = writeBatchSize
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._pending = {}
+        self._touched = set()
+        self._writesSinceCheck = EVICTION_CHECK_INTERVAL
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key: str) -> tuple[dict | None, str | None] | None:
+        """
+        Returns:
+            tuple | None: (记录, 公差等级错误信息)，二者之一为 None；未命中时为 None
+        """
+        with self._lock:
+            if key in self._pending:
+                record, error = self._pending[key]
+                self.hits += 1
+                return _loadRecord(record), error
+            row = self._connection.execute(
+                'SELECT record, error, lastUsed FROM results WHERE tablesVersion = ? AND key = ?',
+                (VERSION_KEY, key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            record, error, lastUsed = row
+            if lastUsed < _today():
+                self._touched.add(key)
+            return _loadRecord(record), error
+
+    def put(self, key: str, record: dict | None, error: str | None = None):
+        with self._lock:
+            self._pending[key] = (None if record is None else json.dumps([record[name] for name in RECORD_FIELDS], ensure_ascii=False), error)
+            if len(self._pending) >= self.writeBatchSize:
+                self._flush()
+
+    def flush(self):
+        """
+        提交尚未写入的结果
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending and not self._touched:
+            return
+        today = _today()
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT OR REPLACE INTO results (tablesVersion, key, record, error, lastUsed) VALUES (?, ?, ?, ?, ?)',
+                ((VERSION_KEY, key, record, error, today) for key, (record, error) in self._pending.items())
+            )
+            connection.executemany(
+                'UPDATE results SET lastUsed = ? WHERE tablesVersion = ? AND key = ? AND lastUsed < ?',
+                ((today, VERSION_KEY, key, today) for key in self._touched)
+            )
+            self.writes += len(self._pending)
+            self._writesSinceCheck += len(self._pending)
+            if self._writesSinceCheck >= EVICTION_CHECK_INTERVAL:
+                self._writesSinceCheck = 0
+                count = connection.execute('SELECT count(*) FROM results').fetchone()[0]
+                if count > self.maxEntries * (1 + EVICTION_SLACK):
+                    self._evict(count - self.maxEntries)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self, count: int) -> int:
+        """
+        先删除旧表版本的条目，再按最近使用日期删除，共删除 count 条
+        """
+        if count <= 0:
+            return 0
+        return self._connection.execute(
+            'DELETE FROM results WHERE (tablesVersion, key) IN ('
+            'SELECT tablesVersion, key FROM results ORDER BY tablesVersion = ?, lastUsed LIMIT ?)',
+            (VERSION_KEY, count)
+        ).rowcount
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: 文件、条目数（当前表版本 / 旧版本）、文件大小，以及本实例的命中、未命中、写入次数
+        """
+        with self._lock:
+            self._flush()
+            connection = self._connection
+            current, = connection.execute('SELECT count(*) FROM results WHERE tablesVersion = ?', (VERSION_KEY,)).fetchone()
+            total, = connection.execute('SELECT count(*) FROM results').fetchone()
+            pageCount, = connection.execute('PRAGMA page_count').fetchone()
+            pageSize, = connection.execute('PRAGMA page_size').fetchone()
+            freePages, = connection.execute('PRAGMA freelist_count').fetchone()
+        walPath = self.path + '-wal'
+        return {
+            'path': os.path.abspath(self.path),
+            'tablesVersion': VERSION_KEY,
+            'entries': total,
+            'currentEntries': current,
+            'staleEntries': total - current,
+            'maxEntries': self.maxEntries,
+            'fileBytes': pageCount * pageSize,
+            'freeBytes': freePages * pageSize,
+            'walBytes': os.path.getsize(walPath) if os.path.exists(walPath) else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes
+        }
+
+    def vacuum(self) -> dict:
+        """
+        删除旧表版本的条目，淘汰到 maxEntries 以内，然后整理文件
+
+        Returns:
+            dict: {'staleDeleted', 'evicted'}
+        """
+        with self._lock:
+            self._flush()
+            connection = self._connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                staleDeleted = connection.execute('DELETE FROM results WHERE tablesVersion != ?', (VERSION_KEY,)).rowcount
+                count, = connection.execute('SELECT count(*) FROM results').fetchone()
+                evicted = self._evict(count - self.maxEntries)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            connection.execute('VACUUM')
+        return {'staleDeleted': staleDeleted, 'evicted': evicted}
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._touched.clear()
+            self._connection.execute('DELETE FROM results')
+
+    def close(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            self._flush()
+            self._connection.close()
+            self._connection = None
+
+@dataclass(frozen=True, slots=True)
+class CachedDesign:
+    """
+    从磁盘缓存读出的设计结果，只提供 asRecord()
+    """
+    feature: str
+    record: dict
+
+    def asRecord(self) -> dict[str, str]:
+        return dict(self.record)
+
+def _canonical(value: Decimal) -> str:
+    sign, digits, exponent = value.as_tuple()
+    text = ''.join(map(str, digits))
+    stripped = text.rstrip('0')
+    if not stripped:
+        return '-0' if sign else '0'
+    return f'{"-" if sign else ""}{stripped}e{exponent + len(text) - len(stripped)}'
+
+class CachedDesignEngine:
+    """
+    先查磁盘缓存、未命中时再交给内部引擎计算的包装，
+    可代替 GaugeDesignEngine / FixedPointGaugeDesignEngine 用于界面和批量计算（只提供 designFromText）
+    """
+    def __init__(self, engine, cache: ResultCache):
+        self.engine = engine
+        self.cache = cache
+        self.queryData = engine.queryData
+
+    @staticmethod
+    def cacheKey(feature: str, norminalSize: Decimal, upperDeviation: Decimal, lowerDeviation: Decimal) -> str:
+        """
+        数值相等的输入得到相同的键（'20'、'20.0'、'2E+1'），但保留负零的符号，与显示结果一致；
+        键由 as_tuple() 去掉末尾的 0 得到，长度不超过输入的有效数字，'1e999999' 不会展开成一百万位
+        """
+        return f'{feature}\t{_canonical(norminalSize)}\t{_canonical(upperDeviation)}\t{_canonical(lowerDeviation)}'
+
+    def designFromText(self, feature: str, norminalSize: str, upperDeviation: str, lowerDeviation: str):
+        """
+        同 GaugeDesignEngine.designFromText()，命中时返回 CachedDesign
+
+        Raises:
+            GaugeDesignError: 输入不完整或不是数字，或数值超出计算范围（不缓存）
+            ToleranceGradeError: 公差等级超出 IT6-IT16（不缓存）
+        """
+        values = [parseNumber(text) for text in (norminalSize, upperDeviation, lowerDeviation)]
+        if feature not in ('hole', 'shaft') or any(value is None or value is False for value in values):
+            # 输入有误，交给内部引擎给出与界面相同的提示
+            return self.engine.designFromText(feature, norminalSize, upperDeviation, lowerDeviation)
+
+        key = CachedDesignEngine.cacheKey(feature, *values)
+        cached = self.cache.get(key)
+        # 只有 error 的条目是早期版本缓存的公差等级错误，重新计算
+        if cached is not None and cached[0] is not None:
+            return CachedDesign(feature, cached[0])
+
+        # 引擎拒绝的输入（GaugeDesignError）直接抛出，不写入缓存
+        design = self.engine.designFromText(feature, norminalSize, upperDeviation, lowerDeviation)
+        self.cache.put(key, design.asRecord())
+        return design
+
+    def cacheInfo(self) -> dict:
+        return self.engine.cacheInfo() | {'resultCache': {'hits': self.cache.hits, 'misses': self.cache.misses, 'writes': self.cache.writes}}
+
+    def cacheClear(self):
+        self.engine.cacheClear()
+
+    def flush(self):
+        self.cache.flush()
+
+    def close(self):
+        self.cache.close()
@@ -0,0 +1,7 @@
+from atlas import buildAtlas, DEFAULT_ATLAS_PATH
+
+import sys
+
+path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ATLAS_PATH
+header = buildAtlas(path)
+print(f'已生成 {path}：{header["nBands"]} 个尺寸段，{header["nSizes"]} 个优先尺寸，{header["nRaRows"]} 行粗糙度')
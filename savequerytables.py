@@ -0,0 +1,13 @@
+from querydata import QueryData, TABLES_VERSION
+
+import pprint
+
+norminalTolT1Z1Data, gaugeNorminalItRaData, settingPlugGaugeNorminalItRaData = QueryData.parseTables()
+
+with open('querytables.py', 'w', encoding='utf-8') as f:
+    f.write('# 由 savequerytables.py 根据 querydata.py 中内嵌的 JSON 表生成，请勿手工修改\n')
+    f.write('from decimal import Decimal\n\n')
+    f.write(f'sourceHash = {TABLES_VERSION!r}\n\n')
+    f.write(f'norminalTolT1Z1Data = {pprint.pformat(norminalTolT1Z1Data, width=120)}\n\n')
+    f.write(f'gaugeNorminalItRaData = {pprint.pformat({feature: dict(data) for feature, data in gaugeNorminalItRaData.items()}, width=120)}\n\n')
+    f.write(f'settingPlugGaugeNorminalItRaData = {pprint.pformat(dict(settingPlugGaugeNorminalItRaData), width=120)}\n')
@@ -0,0 +1,353 @@
+"""
+本机 HTTP/JSON 量规计算服务，基于 asyncio，无第三方依赖
+
+    python plain-limit-gauge-designer.py serve --port 8765
+
+    GET  /design?feature=shaft&norminalSize=20&upperDeviation=0.01&lowerDeviation=-0.01
+    GET  /design?fit=Ø20h7
+    POST /design   {"feature": "shaft", "norminalSize": "20", "upperDeviation": "0.01", "lowerDeviation": "-0.01"}
+    POST /batch    [{"id": "P1", "feature": "hole", ...}, ...]
+    GET  /stats
+
+单个计算请求的结果与 batch.designRow() 相同（即界面 onUpdateCalc 的计算），出错时 HTTP 状态为 422 并带 error 字段。
+同时到达的 /design 请求合并为一批，交给计算线程一次算完；某一行意外出错时只有该请求返回 500。
+"""
+from batch import createEngine, designRow, ENGINES, INPUT_FIELDS
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# 一批最多合并的 /design 请求数
+MAX_BATCH_SIZE = 256
+# 每个接口保留最近多少次请求的用时，用于计算百分位数
+LATENCY_SAMPLES = 10000
+# 请求体上限
+MAX_BODY_SIZE = 16 * 1024 * 1024
+# 请求头行数上限
+MAX_HEADERS = 100
+
+class HttpError(Exception):
+    """
+    以指定状态码返回 {'error': ...} 的请求错误
+    """
+    def __init__(self, status: HTTPStatus, message: str | None = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """
+    最近秩法百分位数
+
+    Args:
+        ordered (list[float]): 升序排列的样本，不能为空
+        fraction (float): 0-1
+
+    Returns:
+        float: 百分位数
+    """
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+class EndpointStats:
+    """
+    单个接口的请求数、错误数和最近若干次请求的用时
+    """
+    __slots__ = ('count', 'errors', 'latencies')
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.count = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=samples)
+
+    def record(self, elapsed: float, error: bool):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.latencies.append(elapsed)
+
+    def asDict(self) -> dict:
+        """
+        Returns:
+            dict: {'count', 'errors', 'samples', 'p50Ms', 'p90Ms', 'p99Ms', 'maxMs'}，无样本时不含用时
+        """
+        result = {'count': self.count, 'errors': self.errors, 'samples': len(self.latencies)}
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            result.update(
+                p50Ms=percentile(ordered, 0.5) * 1e3,
+                p90Ms=percentile(ordered, 0.9) * 1e3,
+                p99Ms=percentile(ordered, 0.99) * 1e3,
+                maxMs=ordered[-1] * 1e3
+            )
+        return result
+
+class DesignServer:
+    """
+    量规计算服务。所有计算在一个专用线程中进行，事件循环只负责收发请求和合并批次
+    """
+    def __init__(self, engineName: str = 'fixed', maxBatchSize: int = MAX_BATCH_SIZE, latencySamples: int = LATENCY_SAMPLES):
+        if engineName not in ENGINES:
+            raise ValueError(f'不支持的计算方式：{engineName}')
+        self.engineName = engineName
+        self.engine = createEngine(engineName)
+        self.maxBatchSize = maxBatchSize
+        self.endpointStats = {path: EndpointStats(latencySamples) for path in ('/design', '/batch', '/stats')}
+        self.batches = 0
+        self.batchedRequests = 0
+        self.largestBatch = 0
+        self.startTime = time.monotonic()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='design')
+        self._queue = None
+        self._batcher = None
+
+    def designRows(self, rows: list[dict]) -> list[dict]:
+        """
+        在计算线程中一次计算多行，结果不含 row 字段
+        """
+        if self.engineName == 'numpy':
+            from vectorized import designRowsVectorized
+            records = list(designRowsVectorized(rows, self.engine, len(rows)))
+            for record in records:
+                del record['row']
+            return records
+        return [designRow(self.engine, row) for row in rows]
+
+    def designEach(self, rows: list[dict]) -> list[dict | Exception]:
+        """
+        同 designRows，但整批计算出错时逐行重算，出错的行返回异常对象，不影响同批的其他行
+        """
+        try:
+            return self.designRows(rows)
+        except Exception:
+            results = []
+            for row in rows:
+                try:
+                    results.append(self.designRows([row])[0])
+                except Exception as e:
+                    results.append(e)
+            return results
+
+    async def design(self, row: dict) -> dict:
+        """
+        计算一行，与同时到达的其他请求合并为一批
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _runBatches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.maxBatchSize and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self.batches += 1
+            self.batchedRequests += len(batch)
+            self.largestBatch = max(self.largestBatch, len(batch))
+            try:
+                records = await loop.run_in_executor(self._executor, self.designEach, [row for row, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), record in zip(batch, records):
+                if future.done():
+                    continue
+                if isinstance(record, Exception):
+                    future.set_exception(record)
+                else:
+                    future.set_result(record)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: 运行时间、各接口请求数与用时百分位数（ms）、合并批次统计、计算缓存统计
+        """
+        return {
+            'uptimeSeconds': time.monotonic() - self.startTime,
+            'engine': self.engineName,
+            'endpoints': {path: stats.asDict() for path, stats in self.endpointStats.items()},
+            'batching': {
+                'batches': self.batches,
+                'requests': self.batchedRequests,
+                'meanBatchSize': self.batchedRequests / self.batches if self.batches else 0.0,
+                'largestBatch': self.largestBatch
+            },
+            'cache': self.engine.cacheInfo()
+        }
+
+    async def route(self, method: str, target: str, body: bytes) -> tuple[HTTPStatus, object]:
+        """
+        处理一个请求
+
+        Returns:
+            tuple: (状态码, 可转为 JSON 的响应)
+        """
+        url = urlsplit(target)
+        match url.path:
+            case '/design':
+                if method == 'GET':
+                    row = dict(parse_qsl(url.query, keep_blank_values=True))
+                elif method == 'POST':
+                    row = parseJson(body)
+                    if not isinstance(row, dict):
+                        raise HttpError(HTTPStatus.BAD_REQUEST, '请求体应为 JSON 对象')
+                else:
+                    raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+                record = await self.design({name: row[name] for name in INPUT_FIELDS if name in row})
+                return (HTTPStatus.UNPROCESSABLE_ENTITY if 'error' in record else HTTPStatus.OK), record
+            case '/batch':
+                if method != 'POST':
+                    raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+                rows = parseJson(body)
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    raise HttpError(HTTPStatus.BAD_REQUEST, '请求体应为 JSON 对象数组')
+                rows = [{name: row[name] for name in INPUT_FIELDS if name in row} for row in rows]
+                records = await asyncio.get_running_loop().run_in_executor(self._executor, self.designRows, rows)
+                for rowNo, record in enumerate(records, 1):
+                    record['row'] = rowNo
+                return HTTPStatus.OK, {'records': records, 'failed': sum('error' in record for record in records)}
+            case '/stats':
+                if method != 'GET':
+                    raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+                return HTTPStatus.OK, self.stats()
+            case _:
+                raise HttpError(HTTPStatus.NOT_FOUND)
+
+    async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        处理一个连接上的全部请求（HTTP/1.1 keep-alive）
+        """
+        try:
+            while True:
+                try:
+                    request = await readRequest(reader)
+                except HttpError as e:
+                    writeResponse(writer, e.status, {'error': str(e)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, keepAlive, body = request
+                start = time.perf_counter()
+                try:
+                    status, payload = await self.route(method, target, body)
+                except HttpError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f'{type(e).__name__}: {e}'}
+                path = urlsplit(target).path
+                writeResponse(writer, status, payload, keepAlive)
+                await writer.drain()
+                if path in self.endpointStats:
+                    self.endpointStats[path].record(time.perf_counter() - start, status >= 400)
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+        """
+        开始监听并启动合并批次的任务
+
+        Returns:
+            asyncio.Server: 监听端口为 port 0 时可从 server.sockets 读取实际端口
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._runBatches())
+        return await asyncio.start_server(self.handleConnection, host, port)
+
+    async def stop(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._executor.shutdown(wait=False)
+
+def parseJson(body: bytes):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f'请求体不是有效的 JSON：{e}')
+
+async def readRequest(reader: asyncio.StreamReader) -> tuple[str, str, bool, bytes] | None:
+    """
+    读取一个 HTTP/1.x 请求，不支持分块传输
+
+    Returns:
+        tuple | None: (方法, 请求目标, 是否保持连接, 请求体)，连接已关闭时为 None
+    """
+    # 超过 StreamReader 长度上限（64 KiB）的行，readline() 抛出 ValueError
+    try:
+        requestLine = await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(HTTPStatus.REQUEST_URI_TOO_LONG)
+    if not requestLine:
+        return None
+    try:
+        method, target, version = requestLine.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, '请求行无效')
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HttpError(HTTPStatus.LENGTH_REQUIRED, '不支持分块传输，请提供 Content-Length')
+    try:
+        length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Content-Length 无效')
+    if length < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Content-Length 无效')
+    if length > MAX_BODY_SIZE:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keepAlive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method.upper(), target, keepAlive, body
+
+def writeResponse(writer: asyncio.StreamWriter, status: HTTPStatus, payload, keepAlive: bool):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (
+        f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+        f'Content-Type: application/json; charset=utf-8\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f'Connection: {"keep-alive" if keepAlive else "close"}\r\n'
+        '\r\n'
+    )
+    writer.write(head.encode('latin-1') + body)
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, engineName: str = 'fixed', maxBatchSize: int = MAX_BATCH_SIZE):
+    """
+    运行服务直到被中断
+    """
+    designServer = DesignServer(engineName, maxBatchSize)
+    server = await designServer.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f'正在监听 http://{address[0]}:{address[1]}', flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await designServer.stop()
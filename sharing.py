@@ -0,0 +1,158 @@
+"""
+量规合并：找出零件目录中可以共用一只量规的零件，给出合并后的量规清单。
+
+每个零件的通规、止规各有一个制造公差带 [下极限, 上极限]（名义尺寸 + 下偏差、上偏差），通规还有磨损极限。
+同一零件特征（轴用卡规/环规、孔用塞规）、同一种量规（通规或止规）的若干零件，只要公差带有共同部分，
+按共同部分制造的一只量规对每个零件都合格，即可共用：
+    exact   只合并公差带和磨损极限完全相同的量规
+    overlap 按公差带的交集合并，交集宽度不小于 minTolerance（过窄的交集无法制造）
+
+overlap 是区间刺穿（interval stabbing）问题：把每个公差带的上极限减去 minTolerance，
+交集宽度不小于 minTolerance 等价于收缩后的区间有公共点。按上极限排序后贪心扫描一遍，
+每遇到一个与当前组不相交的区间就新开一组，得到的组数最少，总耗时 O(n log n)。
+共用通规的磨损极限取各零件中最严的一个：塞规（孔）磨损后变小，取最大的；卡规、环规（轴）磨损后变大，取最小的。
+校对塞规按共用后的工作量规另行设计，不在此合并。
+"""
+from fixedpoint import fmtNm, mmToNm, parseNm
+
+from decimal import Decimal
+from itertools import groupby
+from typing import Iterable, Literal, NamedTuple
+
+MODES = ('exact', 'overlap')
+
+# 默认最小共用公差带宽度：1 μm，即表 3 中最小的 T1
+DEFAULT_MIN_TOLERANCE_NM = 1000
+
+# 量规清单的列
+BILL_FIELDS = ('gauge', 'feature', 'kind', 'lowerLimit', 'upperLimit', 'wearLimit', 'count', 'parts')
+
+KIND_TITLES = {'goGauge': '通规', 'noGoGauge': '止规'}
+
+class GaugeZone(NamedTuple):
+    """
+    一个零件的一只工作量规，尺寸单位：nm
+    """
+    feature: Literal['hole', 'shaft']
+    kind: Literal['goGauge', 'noGoGauge']
+    lowerLimit: int
+    upperLimit: int
+    # 通规的磨损极限，止规为 None
+    wearLimit: int | None
+    part: str
+
+class SharedGauge(NamedTuple):
+    """
+    合并后的一只量规，尺寸单位：nm；lowerLimit、upperLimit 为各零件公差带的交集
+    """
+    feature: Literal['hole', 'shaft']
+    kind: Literal['goGauge', 'noGoGauge']
+    lowerLimit: int
+    upperLimit: int
+    wearLimit: int | None
+    parts: tuple[str, ...]
+
+    def asRecord(self, number: int) -> dict:
+        """
+        转为量规清单的一行，尺寸按 fmt 的规则格式化为 mm
+
+        Args:
+            number (int): 量规序号，从 1 开始
+        """
+        return {
+            'gauge': f'G{number}',
+            'feature': self.feature,
+            'kind': self.kind,
+            'lowerLimit': fmtNm(self.lowerLimit),
+            'upperLimit': fmtNm(self.upperLimit),
+            'wearLimit': '' if self.wearLimit is None else fmtNm(self.wearLimit),
+            'count': len(self.parts),
+            'parts': ' '.join(self.parts),
+        }
+
+def _nm(text: str) -> int:
+    value = parseNm(text)
+    return mmToNm(Decimal(text)) if value is None else value
+
+def gaugeZones(records: Iterable[dict]) -> list[GaugeZone]:
+    """
+    从 batch.designRows() 等输出的记录（或 batch 的输出文件）中取出每个零件的通规、止规公差带，跳过出错的行
+
+    Args:
+        records (Iterable[dict]): 输出记录，零件以 id 列区分，为空时为 '#行号'
+    """
+    zones = []
+    for position, record in enumerate(records, 1):
+        if record.get('error') or not record.get('goGaugeNorminalSize'):
+            continue
+        part = str(record.get('id') or '').strip() or f'#{record.get("row") or position}'
+        feature = record['feature']
+        for kind in KIND_TITLES:
+            norminalSize = _nm(record[f'{kind}NorminalSize'])
+            wearLimit = _nm(record['goGaugeWearLimit']) if kind == 'goGauge' else None
+            zones.append(GaugeZone(
+                feature, kind,
+                norminalSize + _nm(record[f'{kind}LowerDeviation']),
+                norminalSize + _nm(record[f'{kind}UpperDeviation']),
+                wearLimit, part
+            ))
+    return zones
+
+def _combineWearLimits(feature: str, wearLimits: Iterable[int | None]) -> int | None:
+    values = [value for value in wearLimits if value is not None]
+    if not values:
+        return None
+    return max(values) if feature == 'hole' else min(values)
+
+def shareGauges(zones: Iterable[GaugeZone], mode: Literal['exact', 'overlap'] = 'overlap', minTolerance: int = DEFAULT_MIN_TOLERANCE_NM) -> list[SharedGauge]:
+    """
+    合并可以共用的量规
+
+    Args:
+        zones (Iterable[GaugeZone]): gaugeZones() 的结果
+        mode (str): MODES 之一
+        minTolerance (int): overlap 时共用公差带的最小宽度，单位：nm；本身比它窄的公差带不与其他零件合并
+
+    Returns:
+        list[SharedGauge]: 按零件特征、量规种类、下极限排序
+    """
+    if mode not in MODES:
+        raise ValueError(f'不支持的合并方式：{mode}')
+    if minTolerance < 0:
+        raise ValueError(f'最小公差带宽度不能为负：{minTolerance}')
+    shared = []
+    if mode == 'exact':
+        ordered = sorted(zones, key=lambda zone: zone[:5])
+        for key, group in groupby(ordered, key=lambda zone: zone[:5]):
+            shared.append(SharedGauge(*key, tuple(zone.part for zone in group)))
+    else:
+        ordered = sorted(zones, key=lambda zone: (zone.feature, zone.kind, zone.upperLimit, zone.lowerLimit))
+        group = []
+        # 当前组收缩后的公共点：组内最小的上极限减去 minTolerance
+        point = None
+        for zone in ordered:
+            if zone.upperLimit - zone.lowerLimit < minTolerance:
+                # 本身就比最小宽度窄，单独制造，不影响当前组
+                shared.append(_sharedGauge([zone]))
+                continue
+            if group and (zone.feature, zone.kind) == (group[0].feature, group[0].kind) and zone.lowerLimit <= point:
+                group.append(zone)
+                continue
+            if group:
+                shared.append(_sharedGauge(group))
+            group = [zone]
+            point = zone.upperLimit - minTolerance
+        if group:
+            shared.append(_sharedGauge(group))
+    shared.sort(key=lambda gauge: (gauge.feature, gauge.kind, gauge.lowerLimit, gauge.upperLimit))
+    return shared
+
+def _sharedGauge(group: list[GaugeZone]) -> SharedGauge:
+    first = group[0]
+    return SharedGauge(
+        first.feature, first.kind,
+        max(zone.lowerLimit for zone in group),
+        first.upperLimit,
+        _combineWearLimits(first.feature, (zone.wearLimit for zone in group)),
+        tuple(zone.part for zone in group)
+    )
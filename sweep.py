@@ -0,0 +1,189 @@
+"""
+名义尺寸、公差带和偏差的扫描，用于生成“如果……会怎样”的完整量规表，
+例如 h7 在 1-500 mm 的全部优先尺寸上，或 Ø20 的 h6-h16。
+
+sweepRows() 惰性生成与 batch.readRows() 相同格式的输入行，交给 batch.designRows() 等逐行计算、逐行输出，
+内存占用与扫描点数无关。尺寸按尺寸段分组：公差带代号在每个 ISO 286 尺寸段（表 3 尺寸段的细分）只查一次偏差，
+IT/T1/Z1 由计算引擎按 (表 3 尺寸段, 公差) 缓存，每个尺寸段只查一次；粗糙度与量规尺寸有关，仍逐点查。
+"""
+from gaugedesign import GaugeDesignError, fmt
+
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator, Literal, NamedTuple
+
+# 优先数系：R40 依次每 2、4、8 个取一个得到 R20、R10、R5
+SERIES = ('R5', 'R10', 'R20', 'R40')
+
+class LinearRange(NamedTuple):
+    """
+    从 start 到 stop（含）按 step 的等差数列，可重复迭代，不预先生成全部数值
+    """
+    start: Decimal
+    stop: Decimal
+    step: Decimal
+
+    def __iter__(self) -> Iterator[Decimal]:
+        return linearValues(self.start, self.stop, self.step)
+
+def parseRange(text: str) -> list[Decimal] | LinearRange:
+    """
+    解析单个数值或 'FROM:TO:STEP' 形式的等差范围（包含 TO）
+
+    Returns:
+        list[Decimal] | LinearRange: 单个数值时为只含它的列表，范围时为惰性的 LinearRange
+
+    Raises:
+        ValueError: 格式不正确或步长为 0、方向与范围相反
+    """
+    try:
+        parts = [Decimal(part) for part in text.split(':')]
+    except InvalidOperation:
+        raise ValueError(f'应为数值或 FROM:TO:STEP：{text}')
+    if not all(part.is_finite() for part in parts):
+        raise ValueError(f'应为数值或 FROM:TO:STEP：{text}')
+    if len(parts) == 1:
+        return parts
+    if len(parts) != 3:
+        raise ValueError(f'应为数值或 FROM:TO:STEP：{text}')
+    start, stop, step = parts
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError(f'步长 {step} 不能从 {start} 到达 {stop}')
+    return LinearRange(start, stop, step)
+
+def linearValues(start: Decimal, stop: Decimal, step: Decimal) -> Iterator[Decimal]:
+    """
+    从 start 到 stop（含）按 step 递增或递减的等差数列，用 Decimal 计算不累积误差
+
+    Raises:
+        ValueError: 步长为 0 或方向与范围相反
+    """
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError(f'步长 {step} 不能从 {start} 到达 {stop}')
+    i = 0
+    while True:
+        value = start + step * i
+        if (value > stop) if step > 0 else (value < stop):
+            return
+        yield value
+        i += 1
+
+def preferredSizes(series: Literal['R5', 'R10', 'R20', 'R40'] = 'R20', start: Decimal = Decimal(1), stop: Decimal = Decimal(500)) -> Iterator[Decimal]:
+    """
+    ISO 3 优先数系中 start 到 stop（含）之间的名义尺寸，升序
+
+    Args:
+        series (str): SERIES 之一
+        start (Decimal): 下限，单位：mm
+        stop (Decimal): 上限，单位：mm
+    """
+    from atlas import R40
+
+    if series not in SERIES:
+        raise ValueError(f'不支持的优先数系：{series}，应为 {"、".join(SERIES)}')
+    numbers = [Decimal(text) for text in R40[::2 ** (3 - SERIES.index(series))]]
+    for exponent in range(-2, 4):
+        for number in numbers:
+            size = number.scaleb(exponent)
+            if start <= size <= stop:
+                yield size
+
+def expandFitCodes(codes: Iterable[str], grades: Iterable[int] | None = None) -> list[str]:
+    """
+    把只有基本偏差代号的 'h'、'H' 按 grades 展开为 'h6'、'h7' ……，已带公差等级的代号原样保留
+    """
+    grades = list(grades or ())
+    expanded = []
+    for code in codes:
+        code = code.strip()
+        if code.isalpha():
+            if not grades:
+                raise ValueError(f'公差带代号 {code} 没有公差等级，请同时指定公差等级范围')
+            expanded.extend(f'{code}{it}' for it in grades)
+        else:
+            expanded.append(code)
+    return expanded
+
+def parseGrades(text: str) -> list[int]:
+    """
+    解析 '6-16'、'7' 或 '6,7,8' 形式的公差等级
+    """
+    grades = []
+    for part in text.split(','):
+        first, _, last = part.strip().upper().removeprefix('IT').partition('-')
+        grades.extend(range(int(first), int(last.removeprefix('IT') or first) + 1))
+    return grades
+
+def sweepRows(
+    sizes: Iterable[Decimal],
+    fitCodes: Iterable[str] = (),
+    feature: Literal['hole', 'shaft'] | None = None,
+    upperDeviations: Iterable[Decimal] = (),
+    lowerDeviations: Iterable[Decimal] = ()
+) -> Iterator[dict]:
+    """
+    惰性生成扫描的输入行：每个尺寸依次为各公差带代号，以及 feature 下上下偏差的全部组合
+
+    Args:
+        sizes (Iterable[Decimal]): 名义尺寸，单位：mm，可以是生成器
+        fitCodes (Iterable[str]): 不含尺寸的公差带代号，如 'h7'、'H8'
+        feature (str | None): 按偏差扫描时的零件特征
+        upperDeviations, lowerDeviations (Iterable[Decimal]): 按偏差扫描时的上、下偏差，单位：mm；
+            每个尺寸都要重新迭代，应为列表或 LinearRange 等可重复迭代的对象，不能是生成器
+
+    Yields:
+        dict: batch 输入行，id 为 'Ø20h7' 或 'Ø20 0.01/-0.01'；查不到偏差的代号保留在 fit 列，由计算时报告原因
+    """
+    from fits import FitData, parseFitCode
+
+    fitData = FitData()
+    fits = [parseFitCode(code)[1:] for code in fitCodes]
+    # 上下偏差的组合在每个尺寸下用嵌套循环逐个生成，不预先展开
+    hasDeviations = next(iter(upperDeviations), None) is not None and next(iter(lowerDeviations), None) is not None
+    if hasDeviations and feature not in ('hole', 'shaft'):
+        raise GaugeDesignError(f'零件特征只能为 hole 或 shaft：{feature}')
+
+    # 当前 ISO 286 尺寸段及其中各代号的偏差，尺寸跨出该段时才重新查
+    rangeIndex = rangeMin = rangeMax = None
+    resolved = {}
+    for size in sizes:
+        if rangeIndex is None or not rangeMin < size <= rangeMax:
+            rangeIndex = fitData.queryRange(size)
+            resolved.clear()
+            if rangeIndex is not None:
+                rangeMin, rangeMax = fitData.rangeBounds(rangeIndex)
+        sizeText = fmt(size)
+        for code, it in fits:
+            # 超出范围和 1 mm 及以下（有特殊限制）的尺寸逐个查
+            limits = None
+            if rangeIndex is not None and size > 1:
+                if (code, it) not in resolved:
+                    try:
+                        resolved[(code, it)] = fitData.queryDeviations(size, code, it)
+                    except GaugeDesignError:
+                        resolved[(code, it)] = None
+                limits = resolved[(code, it)]
+            if limits is None:
+                # 由计算时的 fits.FitData.resolve() 给出与逐个输入相同的结果或提示
+                yield {'id': f'Ø{sizeText}{code}{it}', 'norminalSize': sizeText, 'fit': f'{code}{it}'}
+                continue
+            upper, lower = limits
+            yield {
+                'id': f'Ø{sizeText}{code}{it}',
+                'feature': 'shaft' if code.islower() else 'hole',
+                'norminalSize': sizeText,
+                'upperDeviation': fmt(upper),
+                'lowerDeviation': fmt(lower)
+            }
+        if not hasDeviations:
+            continue
+        for upper in upperDeviations:
+            upperText = fmt(upper)
+            for lower in lowerDeviations:
+                lowerText = fmt(lower)
+                yield {
+                    'id': f'Ø{sizeText} {upperText}/{lowerText}',
+                    'feature': feature,
+                    'norminalSize': sizeText,
+                    'upperDeviation': upperText,
+                    'lowerDeviation': lowerText
+                }
@@ -0,0 +1,330 @@
+"""
+基于 NumPy 的批量查表与量规计算，所有尺寸均为 nm 整数（int64）。
+
+NumPy 为可选依赖，只有批量计算用到本模块时才会导入，界面启动时不导入。
+"""
+from querydata import DECIMAL_CONTEXT
+from fixedpoint import FixedPointTables, fmtNm
+from gaugedesign import GAUGE_FIELDS, GAUGE_DIMENSION_SUFFIXES
+
+import numpy as np
+from decimal import localcontext
+
+# 把 (行号, 数值) 编码为 行号 * _ROW_STRIDE + 数值，使各行的有序断点拼接后整体仍有序，可用一次 searchsorted 完成逐行查找
+_ROW_STRIDE = 10 ** 13
+_VALUE_MIN = -1
+_VALUE_MAX = _ROW_STRIDE - 1
+
+# 公差等级按数值直接作为行号，Ra 表的行号为 特征序号 * _IT_ROWS + 公差等级
+_IT_ROWS = 32
+FEATURES = ('shaft', 'hole')
+
+# 结果中 error 的取值
+ERROR_NONE = 0
+ERROR_FEATURE = 1
+ERROR_TOLERANCE_GRADE = 2
+
+_SETTING_PLUG_FIELDS = frozenset(f'{name}{suffix}' for name in GAUGE_FIELDS[2:] for suffix in GAUGE_DIMENSION_SUFFIXES)
+
+class VectorTables:
+    """
+    FixedPointTables 转换成的 NumPy 数组，进程内只生成一次
+    """
+    _instance = None
+
+    def __init__(self, tables: FixedPointTables):
+        self.bandMaxs = np.array(tables.bandMaxs, dtype=np.int64)
+        self.bandMins = np.array(tables.bandMins, dtype=np.int64)
+        self.columns = max(len(tols) for tols in tables.bandTols)
+        # 各尺寸段的公差值按 (尺寸段, 公差值) 编码后展平；不足的列用 _VALUE_MAX 填充，查不到
+        self.tolKeys = np.array([
+            band * _ROW_STRIDE + (tols[i] if i < len(tols) else _VALUE_MAX)
+            for band, tols in enumerate(tables.bandTols)
+            for i in range(self.columns)
+        ], dtype=np.int64)
+        itT1Z1s = [
+            itT1Z1s[i] if i < len(itT1Z1s) else (0, 0, 0)
+            for itT1Z1s in tables.bandItT1Z1s
+            for i in range(self.columns)
+        ]
+        self.its = np.array([it for it, _, _ in itT1Z1s], dtype=np.int64)
+        self.t1s = np.array([t1 for _, t1, _ in itT1Z1s], dtype=np.int64)
+        self.z1s = np.array([z1 for _, _, z1 in itT1Z1s], dtype=np.int64)
+
+        self.gaugeRa = VectorTables._compileRaIndex([tables.gaugeRaIndex[feature] for feature in FEATURES])
+        self.settingPlugGaugeRa = VectorTables._compileRaIndex([tables.settingPlugGaugeRaIndex])
+
+    @staticmethod
+    def _compileRaIndex(indexes: list[dict]) -> tuple:
+        """
+        把 [{IT: (尺寸下限, 尺寸上限, 粗糙度)}] 展平为按 (特征, IT, 尺寸下限) 排序的数组，粗糙度单位换算为 nm
+        """
+        rows = []
+        with localcontext(DECIMAL_CONTEXT):
+            for featureIndex, index in enumerate(indexes):
+                for it, (norminalMins, norminalMaxs, ras) in index.items():
+                    row = featureIndex * _IT_ROWS + it
+                    for norminalMin, norminalMax, ra in zip(norminalMins, norminalMaxs, ras):
+                        rows.append((row * _ROW_STRIDE + norminalMin, row, norminalMax, int(ra * 1000)))
+        rows.sort()
+        return tuple(np.array(column, dtype=np.int64) for column in zip(*rows))
+
+    @classmethod
+    def shared(cls) -> 'VectorTables':
+        if cls._instance is None:
+            cls._instance = cls(FixedPointTables.shared())
+        return cls._instance
+
+def _lookupRa(compiled: tuple, row: np.ndarray, gaugeNorminal: np.ndarray) -> np.ma.MaskedArray:
+    keys, rows, norminalMaxs, ras = compiled
+    value = np.clip(gaugeNorminal, _VALUE_MIN, _VALUE_MAX)
+    i = np.searchsorted(keys, row * _ROW_STRIDE + value, side='right') - 1
+    iClipped = np.clip(i, 0, len(keys) - 1)
+    found = (i >= 0) & (rows[iClipped] == row) & (gaugeNorminal < norminalMaxs[iClipped]) & (gaugeNorminal >= keys[iClipped] - row * _ROW_STRIDE)
+    return np.ma.masked_array(ras[iClipped], mask=~found)
+
+def queryItT1Z1Array(norminalSize, tolerance, tables: VectorTables | None = None) -> tuple[np.ma.MaskedArray, np.ma.MaskedArray, np.ma.MaskedArray]:
+    """
+    批量版 QueryData.queryItT1Z1。
+
+    Args:
+        norminalSize (array_like): 零件尺寸，单位：nm
+        tolerance (array_like): 零件公差，单位：nm
+
+    Returns:
+        tuple: (IT, T1, Z1)，T1、Z1 单位为 nm；超出 IT6-IT16 或尺寸超出 0-500 mm 的行被屏蔽
+    """
+    if tables is None:
+        tables = VectorTables.shared()
+    norminalSize = np.asarray(norminalSize, dtype=np.int64)
+    tolerance = np.asarray(tolerance, dtype=np.int64)
+
+    # 尺寸段：sizeMin < norminalSize <= sizeMax
+    band = np.searchsorted(tables.bandMaxs, norminalSize, side='left')
+    bandClipped = np.clip(band, 0, len(tables.bandMaxs) - 1)
+    valid = (band < len(tables.bandMaxs)) & (tables.bandMins[bandClipped] < norminalSize)
+
+    # 不超过零件公差的最大公差值
+    i = np.searchsorted(tables.tolKeys, bandClipped * _ROW_STRIDE + np.clip(tolerance, _VALUE_MIN, _VALUE_MAX - 1), side='right') - 1
+    valid &= i >= bandClipped * tables.columns
+    iClipped = np.clip(i, 0, len(tables.tolKeys) - 1)
+
+    mask = ~valid
+    return (
+        np.ma.masked_array(tables.its[iClipped], mask=mask),
+        np.ma.masked_array(tables.t1s[iClipped], mask=mask),
+        np.ma.masked_array(tables.z1s[iClipped], mask=mask)
+    )
+
+def _featureIndex(feature) -> np.ndarray:
+    """
+    'shaft' -> 0，'hole' -> 1，其他 -> -1
+    """
+    feature = np.asarray(feature)
+    return np.where(feature == 'shaft', 0, np.where(feature == 'hole', 1, -1))
+
+def queryRaArray(feature, gaugeNorminal, it, tables: VectorTables | None = None) -> np.ma.MaskedArray:
+    """
+    批量版 QueryData.queryRa。
+
+    Args:
+        feature (array_like): 'hole' 或 'shaft'
+        gaugeNorminal (array_like): 量规公称尺寸，单位：nm
+        it (array_like): 零件公差等级
+
+    Returns:
+        np.ma.MaskedArray: 粗糙度，单位：nm（0.1 μm 即 100）；查不到的行被屏蔽
+    """
+    if tables is None:
+        tables = VectorTables.shared()
+    featureIndex = _featureIndex(feature)
+    it = np.ma.filled(np.ma.asarray(it, dtype=np.int64), 0)
+    row = np.where((featureIndex >= 0) & (it >= 0) & (it < _IT_ROWS), featureIndex * _IT_ROWS + it, -1)
+    return _lookupRa(tables.gaugeRa, row, np.asarray(gaugeNorminal, dtype=np.int64))
+
+def querySettingPlugGaugeRaArray(gaugeNorminal, it, tables: VectorTables | None = None) -> np.ma.MaskedArray:
+    """
+    批量版 QueryData.querySettingPlugGaugeRa，参数和结果单位同 queryRaArray
+    """
+    if tables is None:
+        tables = VectorTables.shared()
+    it = np.ma.filled(np.ma.asarray(it, dtype=np.int64), 0)
+    row = np.where((it >= 0) & (it < _IT_ROWS), it, -1)
+    return _lookupRa(tables.settingPlugGaugeRa, row, np.asarray(gaugeNorminal, dtype=np.int64))
+
+class GaugeDesignArrays:
+    """
+    批量设计结果，每个字段一个数组（nm），字段名与 GaugeDesign.asRecord() 一致。
+    error 不为 ERROR_NONE 的行，以及孔的校对塞规字段被屏蔽。
+    """
+    def __init__(self, feature: np.ndarray, fields: dict[str, np.ndarray], error: np.ndarray):
+        self.feature = feature
+        self.fields = fields
+        self.error = error
+
+    def __len__(self):
+        return len(self.error)
+
+    def __getitem__(self, name: str) -> np.ma.MaskedArray:
+        return self.fields[name]
+
+    def asRecords(self):
+        """
+        逐行生成与 FixedGaugeDesign.asRecord() 相同的记录；出错的行只有 error 字段，内容与界面提示相同
+
+        Yields:
+            dict: 记录
+        """
+        columns = [(name, np.ma.getdata(array).tolist(), np.ma.getmaskarray(array).tolist()) for name, array in self.fields.items()]
+        features = self.feature.tolist()
+        for row, error in enumerate(self.error.tolist()):
+            if error == ERROR_FEATURE:
+                yield {'error': f'零件特征只能为 hole 或 shaft：{features[row]}'}
+                continue
+            if error == ERROR_TOLERANCE_GRADE:
+                yield {'error': '轴孔公差等级过低或过高，仅适用于IT6-IT16公差等级尺寸'}
+                continue
+            record = {'feature': features[row]}
+            for name, values, masked in columns:
+                if masked[row]:
+                    # 孔没有校对塞规；查不到粗糙度时与 fmt(None) 一致
+                    record[name] = '' if name in _SETTING_PLUG_FIELDS and features[row] == 'hole' else '—'
+                elif name.endswith('Ra'):
+                    # 粗糙度单位为 nm，按 μm 显示
+                    record[name] = fmtNm(values[row] * 1000)
+                elif name == 'it':
+                    record[name] = f'IT{values[row]}'
+                else:
+                    record[name] = fmtNm(values[row])
+            yield record
+
+def designArrays(feature, norminalSize, upperDeviation, lowerDeviation, tables: VectorTables | None = None) -> GaugeDesignArrays:
+    """
+    批量计算量规尺寸，一次处理整批轴和孔，计算方法同 GaugeDesignEngine.design。
+
+    Args:
+        feature (array_like): 'hole' 或 'shaft'
+        norminalSize (array_like): 零件名义尺寸，单位：nm
+        upperDeviation (array_like): 零件上偏差，单位：nm
+        lowerDeviation (array_like): 零件下偏差，单位：nm
+
+    Returns:
+        GaugeDesignArrays: 设计结果
+    """
+    if tables is None:
+        tables = VectorTables.shared()
+    feature = np.asarray(feature)
+    norminalSize = np.asarray(norminalSize, dtype=np.int64)
+    upperDeviation = np.asarray(upperDeviation, dtype=np.int64)
+    lowerDeviation = np.asarray(lowerDeviation, dtype=np.int64)
+
+    featureIndex = _featureIndex(feature)
+    isShaft = featureIndex == 0
+
+    upperLimit = norminalSize + upperDeviation
+    lowerLimit = norminalSize + lowerDeviation
+    it, t1, z1 = queryItT1Z1Array(norminalSize, upperDeviation - lowerDeviation, tables)
+
+    error = np.where(featureIndex < 0, ERROR_FEATURE, np.where(np.ma.getmaskarray(it), ERROR_TOLERANCE_GRADE, ERROR_NONE))
+    invalid = error != ERROR_NONE
+    it, t1, z1 = np.ma.getdata(it), np.ma.getdata(t1), np.ma.getdata(z1)
+    halfT1 = t1 // 2
+    zero = np.zeros_like(t1)
+
+    def masked(values, mask=invalid):
+        return np.ma.masked_array(values, mask=mask)
+
+    def maskedRa(ra, mask=invalid):
+        return np.ma.masked_array(np.ma.getdata(ra), mask=mask | np.ma.getmaskarray(ra))
+
+    goNorminalSize = np.where(isShaft, upperLimit - z1 - halfT1, lowerLimit + z1 + halfT1)
+    noGoNorminalSize = np.where(isShaft, lowerLimit, upperLimit)
+    fields = {
+        'norminalSize': masked(norminalSize),
+        'upperDeviation': masked(upperDeviation),
+        'lowerDeviation': masked(lowerDeviation),
+        'it': masked(it),
+        't1': masked(t1),
+        'z1': masked(z1),
+        'goGaugeNorminalSize': masked(goNorminalSize),
+        'goGaugeUpperDeviation': masked(np.where(isShaft, t1, zero)),
+        'goGaugeLowerDeviation': masked(np.where(isShaft, zero, -t1)),
+        'goGaugeWearLimit': masked(np.where(isShaft, upperLimit, lowerLimit)),
+        'goGaugeRa': maskedRa(queryRaArray(feature, goNorminalSize, it, tables)),
+        'noGoGaugeNorminalSize': masked(noGoNorminalSize),
+        'noGoGaugeUpperDeviation': masked(np.where(isShaft, t1, zero)),
+        'noGoGaugeLowerDeviation': masked(np.where(isShaft, zero, -t1)),
+        'noGoGaugeRa': maskedRa(queryRaArray(feature, noGoNorminalSize, it, tables)),
+    }
+
+    # 校对塞规只用于轴
+    settingPlugMask = invalid | ~isShaft
+    for name, settingPlugNorminalSize in (
+        ('goGoSettingPlugGauge', upperLimit - z1),
+        ('goWearSettingPlugGauge', upperLimit),
+        ('noGoGoSettingPlugGauge', lowerLimit + halfT1),
+    ):
+        fields[f'{name}NorminalSize'] = masked(settingPlugNorminalSize, settingPlugMask)
+        fields[f'{name}UpperDeviation'] = masked(zero, settingPlugMask)
+        fields[f'{name}LowerDeviation'] = masked(-halfT1, settingPlugMask)
+        fields[f'{name}Ra'] = maskedRa(querySettingPlugGaugeRaArray(settingPlugNorminalSize, it, tables), settingPlugMask)
+
+    return GaugeDesignArrays(feature, fields, error)
+
+def designRowsVectorized(rows, engine=None, chunkSize: int = 8192):
+    """
+    按块批量计算 batch.readRows() 读出的输入行，输出与 batch.designRows() 相同。
+    不能精确转为 nm 整数的行和带公差带代号的行逐行交给 FixedPointGaugeDesignEngine 计算。
+
+    Args:
+        rows (Iterable[dict]): 输入行
+        engine (FixedPointGaugeDesignEngine | None): 逐行计算用的引擎，默认新建
+        chunkSize (int): 每块行数，决定内存占用上限
+
+    Yields:
+        dict: 输出记录，row 为从 1 开始的输入序号
+    """
+    from batch import designRow
+    from fixedpoint import FixedPointGaugeDesignEngine, parseNm
+    from itertools import islice
+
+    if engine is None:
+        engine = FixedPointGaugeDesignEngine()
+    tables = VectorTables.shared()
+    rows = iter(rows)
+    rowNo = 0
+    while chunk := list(islice(rows, chunkSize)):
+        records = [None] * len(chunk)
+        indexes, features, norminalSizes, upperDeviations, lowerDeviations = [], [], [], [], []
+        for i, row in enumerate(chunk):
+            if not row.get('error') and not row.get('fit'):
+                values = [parseNm('' if row.get(name) is None else str(row.get(name))) for name in ('norminalSize', 'upperDeviation', 'lowerDeviation')]
+                feature = '' if row.get('feature') is None else str(row.get('feature')).strip()
+                if None not in values and feature in FEATURES:
+                    indexes.append(i)
+                    features.append(feature)
+                    norminalSizes.append(values[0])
+                    upperDeviations.append(values[1])
+                    lowerDeviations.append(values[2])
+                    continue
+            records[i] = designRow(engine, row)
+
+        if indexes:
+            results = designArrays(np.array(features), norminalSizes, upperDeviations, lowerDeviations, tables)
+            for i, record in zip(indexes, results.asRecords()):
+                row = chunk[i]
+                if 'error' in record:
+                    record = {
+                        'feature': str(row.get('feature')).strip(),
+                        'norminalSize': str(row.get('norminalSize')),
+                        'upperDeviation': str(row.get('upperDeviation')),
+                        'lowerDeviation': str(row.get('lowerDeviation')),
+                        **record
+                    }
+                record['id'] = '' if row.get('id') is None else str(row.get('id'))
+                records[i] = record
+
+        for record in records:
+            rowNo += 1
+            record['row'] = rowNo
+            yield record
@@ -0,0 +1,865 @@
+"""
+构建前检查，任何一项不通过时以非 0 退出码结束
+"""
+import sys
+
+def verifyQueryTables() -> list[str]:
+    """
+    检查 querytables.py 与 querydata.py 中内嵌的 JSON 表是否一致
+    """
+    from querydata import QueryData, TABLES_VERSION
+    import querytables
+
+    errors = []
+    if querytables.sourceHash != TABLES_VERSION:
+        errors.append('querytables.py 已过期，请运行 savequerytables.py 重新生成')
+
+    norminalTolT1Z1Data, gaugeNorminalItRaData, settingPlugGaugeNorminalItRaData = QueryData.parseTables()
+    if repr(querytables.norminalTolT1Z1Data) != repr(norminalTolT1Z1Data):
+        errors.append('querytables.norminalTolT1Z1Data 与表 3 不一致')
+    if repr(querytables.gaugeNorminalItRaData) != repr({feature: dict(data) for feature, data in gaugeNorminalItRaData.items()}):
+        errors.append('querytables.gaugeNorminalItRaData 与表 4 不一致')
+    if repr(querytables.settingPlugGaugeNorminalItRaData) != repr(dict(settingPlugGaugeNorminalItRaData)):
+        errors.append('querytables.settingPlugGaugeNorminalItRaData 与表 A.1 不一致')
+    return errors
+
+def fixedPointGrid():
+    """
+    差分检查用的输入网格：每个尺寸段的边界附近和段内各点、
+    每个公差等级的公差值附近，以及整数路径需要回退到 Decimal 的输入
+    """
+    from querydata import QueryData
+    from decimal import Decimal
+
+    queryData = QueryData()
+    breakpoints = {0, 120, 315, 500}
+    for (sizeMin, sizeMax), _ in queryData.norminalTolT1Z1Data:
+        breakpoints.update((int(sizeMin), int(sizeMax)))
+
+    sizes = {Decimal(x) / 4 for x in range(-4, 2010 * 2, 3)}
+    for b in breakpoints:
+        for d in ('0', '0.000001', '0.0001', '0.0035', '0.02', '0.3', '1.7'):
+            sizes.update((b + Decimal(d), b - Decimal(d)))
+
+    bandTols = {}
+    for (sizeMin, sizeMax), tolT1Z1List in queryData.norminalTolT1Z1Data:
+        tols = {Decimal(0), Decimal('-0.001')}
+        for tol, _, _, _ in tolT1Z1List:
+            tol = tol / 1000
+            tols.update((tol, tol - Decimal('0.000001'), tol + Decimal('0.0001')))
+        tols.add(tol * 3)
+        bandTols[sizeMax] = sorted(tols)
+
+    for size in sorted(sizes):
+        band = next((sizeMax for (sizeMin, sizeMax), _ in queryData.norminalTolT1Z1Data if sizeMin < size <= sizeMax), Decimal(500))
+        for tolerance in bandTols[band]:
+            for upper in (tolerance, Decimal(0), tolerance / 2, tolerance - Decimal('0.0071')):
+                for feature in ('shaft', 'hole'):
+                    yield feature, str(size), str(upper), str(upper - tolerance)
+
+    # 整数路径不能精确表示、需要回退的输入
+    for text in ('-0', '-0.000', '0.', '1e1', '20.0000001', '2499.999999', '2500', '-3000', ' 20 ', '+20', '١٢', 'abc', '', '1e1000000', '-9e999999'):
+        for feature in ('shaft', 'hole', 'cone'):
+            yield feature, text, '0.01', '-0.01'
+            yield feature, '20', text, '-0.01'
+            yield feature, '20', '0.01', text
+    yield 'shaft', '20', '2400', '-2400'
+
+def verifyFixedPoint() -> list[str]:
+    """
+    差分检查：FixedPointGaugeDesignEngine 与 GaugeDesignEngine 在整个输入网格上的输出完全一致
+    """
+    from gaugedesign import GaugeDesignEngine, GaugeDesignError
+    from fixedpoint import FixedPointGaugeDesignEngine, parseNm
+
+    def run(engine, args):
+        try:
+            return engine.designFromText(*args).asRecord()
+        except GaugeDesignError as e:
+            return (type(e).__name__, str(e))
+
+    decimalEngine = GaugeDesignEngine()
+    fixedEngine = FixedPointGaugeDesignEngine()
+    errors = []
+    count = 0
+    columnInputs = []
+    for args in fixedPointGrid():
+        count += 1
+        expected, actual = run(decimalEngine, args), run(fixedEngine, args)
+        if expected != actual:
+            errors.append(f'{args}：Decimal {expected} != 整数 {actual}')
+            if len(errors) >= 10:
+                break
+        values = [parseNm(text) for text in args[1:]]
+        if args[0] in ('hole', 'shaft') and None not in values:
+            columnInputs.append((args, (args[0], *values)))
+
+    # 按列保存后读回的结果与直接计算相同
+    columns = fixedEngine.designColumns(*zip(*(values for _, values in columnInputs)))
+    for i, (args, _) in enumerate(columnInputs):
+        expected = run(fixedEngine, args)
+        try:
+            actual = columns[i].asRecord()
+        except GaugeDesignError as e:
+            actual = (type(e).__name__, str(e))
+        if expected != actual:
+            errors.append(f'{args}：按列保存 {actual} != {expected}')
+            if len(errors) >= 10:
+                break
+    if not errors:
+        print(f'  已比较 {count} 组输入')
+    return errors
+
+def verifyVectorized() -> list[str]:
+    """
+    差分检查：vectorized.designArrays 与 FixedPointGaugeDesignEngine 在整个输入网格上的输出一致（未安装 NumPy 时跳过）
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print('  未安装 NumPy，跳过')
+        return []
+    from gaugedesign import GaugeDesignError
+    from fixedpoint import FixedPointGaugeDesignEngine, parseNm
+    from vectorized import designArrays
+
+    rows = []
+    for feature, *texts in fixedPointGrid():
+        values = [parseNm(text) for text in texts]
+        if None not in values:
+            rows.append((feature, *values))
+    results = designArrays(np.array([row[0] for row in rows]), *(np.array([row[i] for row in rows]) for i in (1, 2, 3)))
+
+    engine = FixedPointGaugeDesignEngine()
+    errors = []
+    for row, actual in zip(rows, results.asRecords()):
+        try:
+            expected = engine.design(*row).asRecord()
+        except GaugeDesignError as e:
+            expected = {'error': str(e)}
+        if expected != actual:
+            errors.append(f'{row}：整数 {expected} != NumPy {actual}')
+            if len(errors) >= 10:
+                break
+    if not errors:
+        print(f'  已比较 {len(rows)} 组输入')
+    return errors
+
+def verifyThreadSafety() -> list[str]:
+    """
+    检查导入各模块不修改全局 Decimal 上下文，计算结果不受调用方上下文影响，
+    以及多线程共用一个引擎时与单线程结果一致
+    """
+    from decimal import DefaultContext, ROUND_FLOOR, getcontext, localcontext
+    from itertools import islice
+    from batch import createEngine, designRows, designRowsThreaded
+    from gaugedesign import GaugeDesignEngine, GaugeDesignError
+
+    errors = []
+    if getcontext().prec != DefaultContext.prec:
+        errors.append(f'全局 Decimal 上下文被修改：prec = {getcontext().prec}')
+
+    def run(engine, args):
+        try:
+            return engine.designFromText(*args).asRecord()
+        except GaugeDesignError as e:
+            return (type(e).__name__, str(e))
+
+    grid = list(islice(fixedPointGrid(), 0, None, 7))
+    expected = [run(GaugeDesignEngine(), args) for args in grid]
+    engine = GaugeDesignEngine()
+    with localcontext(prec=3, rounding=ROUND_FLOOR):
+        for args, record in zip(grid, expected):
+            if run(engine, args) != record:
+                errors.append(f'{args}：调用方 Decimal 上下文为 prec=3 时结果不同')
+                if len(errors) >= 10:
+                    return errors
+
+    rows = [dict(zip(('feature', 'norminalSize', 'upperDeviation', 'lowerDeviation'), args)) for args in grid]
+    # 超出 Decimal 指数范围的行应只记为该行出错，不中断整批计算
+    rows.append({'id': 'b', 'feature': 'shaft', 'norminalSize': '1e1000000', 'upperDeviation': '0', 'lowerDeviation': '0'})
+    for engineName in ('decimal', 'fixed'):
+        single = list(designRows(rows, createEngine(engineName)))
+        if 'error' not in single[-1]:
+            errors.append(f'{rows[-1]}：{engineName} 未记为出错行')
+        threaded = designRowsThreaded(rows, 8, engineName, chunkSize=257)
+        for row, a, b in zip(rows, single, threaded):
+            if a != b:
+                errors.append(f'{row}：{engineName} 多线程结果 {b} != 单线程 {a}')
+                if len(errors) >= 10:
+                    return errors
+    if not errors:
+        print(f'  已比较 {len(grid)} 组输入')
+    return errors
+
+def verifyServer() -> list[str]:
+    """
+    用本机客户端并发请求 server.DesignServer，结果应与 batch.designRow() 一致
+    """
+    import asyncio
+    import json
+    from itertools import islice
+    from urllib.parse import urlencode
+    from batch import createEngine, designRow
+    from server import DesignServer
+
+    names = ('feature', 'norminalSize', 'upperDeviation', 'lowerDeviation')
+    rows = [dict(zip(names, args), id=str(i)) for i, args in enumerate(islice(fixedPointGrid(), 0, None, 401))]
+    engine = createEngine('fixed')
+    expected = [designRow(engine, row) for row in rows]
+
+    async def request(port, method, target, payload=None):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        writer.write(f'{method} {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(body)
+
+    async def rawRequest(port, data: bytes):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+
+    async def run():
+        designServer = DesignServer()
+        server = await designServer.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            singles = await asyncio.gather(*(
+                request(port, 'GET', '/design?' + urlencode(row)) if i % 2 else request(port, 'POST', '/design', row)
+                for i, row in enumerate(rows)
+            ))
+            batch = await request(port, 'POST', '/batch', rows)
+            stats = await request(port, 'GET', '/stats')
+            # 超过 StreamReader 长度上限的请求行和请求头应返回错误状态，而不是直接断开
+            oversize = await asyncio.gather(
+                rawRequest(port, b'GET /design?' + b'x' * 70000 + b' HTTP/1.1\r\n\r\n'),
+                rawRequest(port, b'GET /stats HTTP/1.1\r\nX-Long: ' + b'x' * 70000 + b'\r\n\r\n')
+            )
+        finally:
+            server.close()
+            await designServer.stop()
+        return singles, batch, stats, oversize
+
+    singles, (_, batch), (_, stats), oversize = asyncio.run(run())
+    errors = []
+    if oversize != [414, 431]:
+        errors.append(f'过长的请求行、请求头返回 {oversize} != [414, 431]')
+    for row, record, (status, actual) in zip(rows, expected, singles):
+        if actual != record or status != (422 if 'error' in record else 200):
+            errors.append(f'{row}：/design 返回 {status} {actual} != {record}')
+    for rowNo, (row, record, actual) in enumerate(zip(rows, expected, batch['records']), 1):
+        if actual != record | {'row': rowNo}:
+            errors.append(f'{row}：/batch 返回 {actual} != {record}')
+    if stats['endpoints']['/design']['count'] != len(rows):
+        errors.append(f'/stats 中 /design 请求数 {stats["endpoints"]["/design"]["count"]} != {len(rows)}')
+    if not errors:
+        print(f'  已比较 {len(rows)} 组输入，平均每批 {stats["batching"]["meanBatchSize"]:.1f} 个请求')
+    return errors[:10]
+
+def verifyResultCache() -> list[str]:
+    """
+    经过磁盘结果缓存（未命中、命中、淘汰后）的结果与直接计算一致
+    """
+    import os
+    import tempfile
+    from itertools import islice
+    from gaugedesign import GaugeDesignEngine, GaugeDesignError
+    from resultcache import CachedDesignEngine, ResultCache
+
+    def run(engine, args):
+        try:
+            return engine.designFromText(*args).asRecord()
+        except GaugeDesignError as e:
+            return (type(e).__name__, str(e))
+
+    grid = list(islice(fixedPointGrid(), 0, None, 97))
+    engine = GaugeDesignEngine()
+    expected = [run(engine, args) for args in grid]
+    errors = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.sqlite3')
+        for attempt in ('未命中', '命中'):
+            with ResultCache(path, maxEntries=len(grid) // 3) as cache:
+                cachedEngine = CachedDesignEngine(GaugeDesignEngine(), cache)
+                for args, record in zip(grid, expected):
+                    actual = run(cachedEngine, args)
+                    if actual != record:
+                        errors.append(f'{args}：缓存{attempt}时 {actual} != {record}')
+                        if len(errors) >= 10:
+                            return errors
+                hits = cache.hits
+        if not hits:
+            errors.append('第二次计算没有命中缓存')
+    if not errors:
+        print(f'  已比较 {len(grid)} 组输入')
+    return errors
+
+def verifyAtlas() -> list[str]:
+    """
+    生成设计图集到临时目录，逐项与整数查表和计算结果比较
+    """
+    from atlas import DesignAtlas, DESIGN_FIELDS, FEATURES, RA_KINDS, buildAtlas
+    from fixedpoint import FixedPointGaugeDesignEngine, FixedPointTables
+    from querydata import TABLES_VERSION
+    import os
+    import tempfile
+
+    tables = FixedPointTables.shared()
+    engine = FixedPointGaugeDesignEngine()
+
+    def nm(ra):
+        return None if ra is None else int(ra * 1000)
+
+    errors = []
+    compared = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'atlas.bin')
+        buildAtlas(path)
+        with DesignAtlas(path) as atlas:
+            if atlas.tablesVersion != TABLES_VERSION:
+                errors.append('图集中的查询表版本与 TABLES_VERSION 不一致')
+            bounds = sorted(set(tables.bandMins) | set(tables.bandMaxs))
+            sizes = sorted({x + d for x in bounds for d in (-1, 0, 1)} | set(atlas.sizes))
+            tolerances = sorted({x + d for tols in tables.bandTols for x in tols for d in (-1, 0, 1)})
+            for size in sizes:
+                if atlas.queryBand(size) != tables.queryBand(size):
+                    errors.append(f'{size} nm：尺寸段 {atlas.queryBand(size)} != {tables.queryBand(size)}')
+                for tolerance in tolerances:
+                    compared += 1
+                    if atlas.queryItT1Z1(size, tolerance) != tables.queryItT1Z1(size, tolerance):
+                        errors.append(f'{size} nm、{tolerance} nm：IT/T1/Z1 {atlas.queryItT1Z1(size, tolerance)} != {tables.queryItT1Z1(size, tolerance)}')
+                for it in range(5, 18):
+                    for kind in RA_KINDS:
+                        compared += 1
+                        if kind == 'settingPlugGauge':
+                            actual, expected = atlas.querySettingPlugGaugeRa(size, it), nm(tables.querySettingPlugGaugeRa(size, it))
+                        else:
+                            actual, expected = atlas.queryRa(kind, size, it), nm(tables.queryRa(kind, size, it))
+                        if actual != expected:
+                            errors.append(f'{kind} {size} nm IT{it}：Ra {actual} != {expected}')
+                if len(errors) >= 10:
+                    return errors
+
+            for feature in FEATURES:
+                for size in atlas.sizes:
+                    for tolerance in tables.bandTols[tables.queryBand(size)]:
+                        design = engine.design(feature, size, *((tolerance, 0) if feature == 'hole' else (0, -tolerance)))
+                        expected = [design.it, design.t1, design.z1]
+                        for i, gauge in enumerate((design.goGauge, design.noGoGauge, design.goGoSettingPlugGauge, design.goWearSettingPlugGauge, design.noGoGoSettingPlugGauge)):
+                            expected += (None,) * 4 if gauge is None else (gauge.norminalSize, gauge.upperDeviation, gauge.lowerDeviation, nm(gauge.ra))
+                            if i == 0:
+                                expected.append(design.goGaugeWearLimit)
+                        compared += 1
+                        actual = atlas.design(feature, size, design.it)
+                        if actual != dict(zip(DESIGN_FIELDS, expected)):
+                            errors.append(f'{feature} {size} nm IT{design.it}：{actual}')
+                            if len(errors) >= 10:
+                                return errors
+    if not errors:
+        print(f'  已比较 {compared} 项')
+    return errors
+
+def verifyFits() -> list[str]:
+    """
+    ISO 286 标准公差 IT6-IT16 与表 3 的公差值一致，若干公差带与 GB/T 1800.2 表中的极限偏差一致，
+    批量计算中的公差带代号与直接输入偏差结果相同
+    """
+    from batch import designRow
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from fits import FitData
+    from querydata import QueryData
+    from decimal import Decimal
+
+    fitData = FitData()
+    queryData = QueryData()
+    # 表 3 中 30-50 mm 的 IT15、IT16 为 840、1300 μm（与 18-30 mm 相同），ISO 286 为 1000、1600 μm；
+    # 按两者查得的公差等级相同，保留表 3 原值
+    known = {(Decimal(50), 15), (Decimal(50), 16)}
+    errors = []
+    for (sizeMin, sizeMax), tolT1Z1List in queryData.norminalTolT1Z1Data:
+        for tol, it, _, _ in tolT1Z1List:
+            if fitData.queryIt(sizeMax, it) != tol and (sizeMax, it) not in known:
+                errors.append(f'{sizeMin}-{sizeMax} mm IT{it}：{fitData.queryIt(sizeMax, it)} != 表 3 {tol}')
+
+    # GB/T 1800.2 中的极限偏差，单位：μm
+    expected = {
+        'Ø20h7': (0, -21), 'Ø50H8': (39, 0), 'Ø25k6': (15, 2), 'Ø40m6': (25, 9), 'Ø10j6': (7, -2),
+        'Ø25P7': (-14, -35), 'Ø40M7': (0, -25), 'Ø100K7': (10, -25), 'Ø60N7': (-9, -39), 'Ø2N9': (-4, -29),
+        'Ø20S7': (-27, -48), 'Ø80U7': (-91, -121), 'Ø280M6': (-9, -41), 'Ø30JS6': (Decimal('6.5'), Decimal('-6.5')),
+        'Ø20js7': (10, -10), 'Ø10J7': (8, -7), 'Ø20G6': (20, 7), 'Ø60f7': (-30, -60), 'Ø120d9': (-120, -207),
+        'Ø5cd7': (-46, -58), 'Ø200a11': (-660, -950), 'Ø25t6': (54, 41), 'Ø400e8': (-125, -214)
+    }
+    for code, (upper, lower) in expected.items():
+        fit = fitData.resolve(code)
+        actual = (fit.upperDeviation * 1000, fit.lowerDeviation * 1000)
+        if actual != (upper, lower):
+            errors.append(f'{code}：{actual} != {(upper, lower)}')
+
+    engine = FixedPointGaugeDesignEngine()
+    for code in expected:
+        fit = fitData.resolve(code)
+        withCode = designRow(engine, {'fit': code})
+        withDeviations = designRow(engine, {
+            'feature': fit.feature, 'norminalSize': str(fit.norminalSize),
+            'upperDeviation': str(fit.upperDeviation), 'lowerDeviation': str(fit.lowerDeviation)
+        })
+        if withCode != withDeviations:
+            errors.append(f'{code}：批量计算 {withCode} != {withDeviations}')
+    if not errors:
+        print(f'  已比较 {len(expected)} 个公差带')
+    return errors
+
+def verifySweep() -> list[str]:
+    """
+    扫描按尺寸段只查一次偏差，结果应与逐个输入带尺寸的公差带代号相同
+    """
+    from batch import designRow
+    from decimal import Decimal
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from sweep import preferredSizes, sweepRows
+
+    engine = FixedPointGaugeDesignEngine()
+    codes = ['h7', 'H8', 'js6', 'K7', 'N9', 't6', 'a11', 'U7']
+    errors = []
+    count = 0
+    for row in sweepRows(preferredSizes('R40', Decimal('0.5')), codes):
+        swept = designRow(engine, row)
+        single = designRow(engine, {'id': row['id'], 'norminalSize': row['norminalSize'], 'fit': row['id']})
+        if swept != single:
+            errors.append(f'{row["id"]}：扫描 {swept} != 逐个 {single}')
+        count += 1
+    if not errors:
+        print(f'  已比较 {count} 行')
+    return errors
+
+def verifyReports() -> list[str]:
+    """
+    三种格式的汇总表读回后应与批量计算的记录逐格相同，gzip 压缩后内容不变
+    """
+    import csv
+    import gzip
+    import io
+    import zipfile
+    from xml.etree import ElementTree
+    from batch import designRows
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from report import SUMMARY_COLUMNS, ReportWriter, _cell
+    from sweep import preferredSizes, sweepRows
+
+    records = list(designRows(sweepRows(preferredSizes('R20'), ['h7', 'H8', 'js6', 't6']), FixedPointGaugeDesignEngine()))
+    expected = [[str(_cell(record, field, numeric)) for field, _, numeric in SUMMARY_COLUMNS] for record in records]
+    errors = []
+
+    def render(reportFormat, layout='summary'):
+        stream = io.BytesIO() if reportFormat == 'xlsx' else io.StringIO()
+        with ReportWriter(stream, reportFormat, layout) as writer:
+            for record in records:
+                writer.write(record)
+        return stream.getvalue()
+
+    rows = list(csv.reader(io.StringIO(render('csv'))))[1:]
+    if rows != expected:
+        errors.append('CSV 汇总表与计算结果不同')
+
+    ns = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+    with zipfile.ZipFile(io.BytesIO(render('xlsx'))) as workbook:
+        sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+    rows = []
+    # 前两行为标题和表头
+    for row in sheet.findall('x:sheetData/x:row', ns)[2:]:
+        cells = [''] * len(SUMMARY_COLUMNS)
+        for cell in row:
+            column = 0
+            for letter in cell.get('r').rstrip('0123456789'):
+                column = column * 26 + ord(letter) - ord('A') + 1
+            cells[column - 1] = ''.join(cell.itertext())
+        rows.append(cells)
+    if rows != expected:
+        errors.append('XLSX 汇总表与计算结果不同')
+
+    text = render('html', 'sheets')
+    if text.count('<section>') != len(records) or not text.endswith('</html>\n'):
+        errors.append('HTML 数据表的零件数不对或未写完')
+    stream = io.BytesIO()
+    with gzip.GzipFile(fileobj=stream, mode='wb') as compressed, io.TextIOWrapper(compressed, encoding='utf-8', newline='') as wrapper:
+        with ReportWriter(wrapper, 'html', 'sheets') as writer:
+            for record in records:
+                writer.write(record)
+    if gzip.decompress(stream.getvalue()).decode() != text:
+        errors.append('gzip 压缩后的 HTML 数据表与未压缩时不同')
+    if not errors:
+        print(f'  已比较 {len(records)} 个零件')
+    return errors
+
+def verifyIncremental() -> list[str]:
+    """
+    增量计算只重新计算改动的行，完整结果与重新批量计算相同
+    """
+    from batch import designRows
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from incremental import CatalogState
+
+    engine = FixedPointGaugeDesignEngine()
+    catalog = [
+        {'id': f'P{i}', 'feature': 'shaft' if i % 2 else 'hole', 'norminalSize': str(1 + i * 2), 'upperDeviation': '0.02', 'lowerDeviation': '0'}
+        for i in range(200)
+    ]
+    errors = []
+    with CatalogState(':memory:') as state:
+        first = state.update(catalog, engine)
+        if (first.added, first.modified, first.removed) != (200, 0, 0):
+            errors.append(f'首次运行：{first}')
+        # 改 3 行（其中 P5 只改写法，尺寸不变），删 1 行，加 1 行，调换 2 行
+        catalog[3] = dict(catalog[3], upperDeviation='0.03')
+        catalog[5] = dict(catalog[5], upperDeviation='0.020')
+        catalog[7] = dict(catalog[7], feature='hole')
+        del catalog[10]
+        catalog.append({'id': 'NEW', 'fit': 'Ø30h6'})
+        catalog[20], catalog[21] = catalog[21], catalog[20]
+        second = state.update(catalog, engine)
+        changedIds = sorted({entry['id'] for entry in second.diff})
+        if (second.added, second.modified, second.changed, second.removed, second.unchanged) != (1, 3, 2, 1, 196):
+            errors.append(f'第二次运行：{second}')
+        if changedIds != ['NEW', 'P10', 'P3', 'P7']:
+            errors.append(f'差异中的零件：{changedIds}')
+        expected = list(designRows(catalog, engine))
+        if list(state.records()) != expected:
+            errors.append('增量计算的完整结果与重新批量计算不同')
+    if not errors:
+        print(f'  已比较 {len(catalog)} 行')
+    return errors
+
+def verifySharing() -> list[str]:
+    """
+    合并后的每只量规都在所含零件的公差带内、宽度不小于最小宽度，磨损极限最严；组数与逐个尝试的最少组数相同
+    """
+    import random
+    from batch import designRows
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from sharing import DEFAULT_MIN_TOLERANCE_NM, gaugeZones, shareGauges
+
+    rng = random.Random(286)
+    rows = [
+        {'id': f'P{i}', 'fit': f'Ø{rng.randint(3, 60)}{rng.choice(["h6", "h7", "g6", "js7", "H7", "H8", "G7", "K7"])}'}
+        for i in range(3000)
+    ]
+    zones = gaugeZones(designRows(rows, FixedPointGaugeDesignEngine()))
+    byPart = {(zone.part, zone.kind): zone for zone in zones}
+    errors = []
+    bill = shareGauges(zones)
+    if sorted(part for gauge in bill for part in gauge.parts) != sorted(zone.part for zone in zones):
+        errors.append('合并后的量规没有恰好覆盖每个零件一次')
+    for gauge in bill:
+        members = [byPart[(part, gauge.kind)] for part in gauge.parts]
+        if len(members) > 1 and gauge.upperLimit - gauge.lowerLimit < DEFAULT_MIN_TOLERANCE_NM:
+            errors.append(f'{gauge}：公差带过窄')
+        for zone in members:
+            if zone.feature != gauge.feature or not zone.lowerLimit <= gauge.lowerLimit <= gauge.upperLimit <= zone.upperLimit:
+                errors.append(f'{gauge}：不在 {zone} 的公差带内')
+            if gauge.kind == 'goGauge' and (zone.wearLimit > gauge.wearLimit if gauge.feature == 'hole' else zone.wearLimit < gauge.wearLimit):
+                errors.append(f'{gauge}：磨损极限比 {zone} 宽')
+    # 组数最少：各组中上极限最小的公差带（收缩 minTolerance 后）两两不相交，任何合并方式都至少需要这么多只；
+    # 本身比最小宽度窄的公差带只能单独制造
+    for feature in ('hole', 'shaft'):
+        for kind in ('goGauge', 'noGoGauge'):
+            firsts = [
+                min((byPart[(part, kind)] for part in gauge.parts), key=lambda zone: zone.upperLimit)
+                for gauge in bill if (gauge.feature, gauge.kind) == (feature, kind)
+            ]
+            firsts = sorted(
+                (zone for zone in firsts if zone.upperLimit - zone.lowerLimit >= DEFAULT_MIN_TOLERANCE_NM),
+                key=lambda zone: zone.upperLimit
+            )
+            for previous, zone in zip(firsts, firsts[1:]):
+                if zone.lowerLimit <= previous.upperLimit - DEFAULT_MIN_TOLERANCE_NM:
+                    errors.append(f'{feature} {kind}：{previous.part} 与 {zone.part} 所在的两组可以合并')
+    exact = shareGauges(zones, 'exact')
+    if any(len({byPart[(part, gauge.kind)][:5] for part in gauge.parts}) != 1 for gauge in exact):
+        errors.append('exact 合并了不完全相同的量规')
+    if not errors:
+        print(f'  {len(zones)} 只工作量规合并为 {len(bill)} 只（完全相同的合并为 {len(exact)} 只）')
+    return errors
+
+def verifyGaugeIndex() -> list[str]:
+    """
+    反查索引的结果与逐个比较全部公差带相同
+    """
+    import os
+    import random
+    import tempfile
+    from batch import designRows
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from gaugeindex import GaugeIndex, buildGaugeIndex
+    from sharing import gaugeZones
+
+    rng = random.Random(1957)
+    rows = [
+        {'id': f'零件{i}', 'fit': f'Ø{rng.randint(3, 80)}{rng.choice(["h6", "h7", "f7", "js7", "H7", "H9", "F8", "M7"])}'}
+        for i in range(2000)
+    ]
+    zones = gaugeZones(designRows(rows, FixedPointGaugeDesignEngine()))
+    errors = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'parts.gidx')
+        buildGaugeIndex(zones, path)
+        with GaugeIndex(path) as index:
+            for _ in range(500):
+                zone = rng.choice(zones)
+                size = rng.randint(min(zone.lowerLimit, zone.wearLimit or zone.lowerLimit) - 2000, max(zone.upperLimit, zone.wearLimit or 0) + 2000)
+                for worn in (False, True):
+                    expected = []
+                    for other in zones:
+                        if (other.feature, other.kind) != (zone.feature, zone.kind):
+                            continue
+                        inZone = other.lowerLimit <= size <= other.upperLimit
+                        limits = (other.lowerLimit, other.upperLimit, *(() if other.wearLimit is None else (other.wearLimit,)))
+                        if inZone or (worn and min(limits) <= size <= max(limits)):
+                            expected.append((other.part, not inZone))
+                    found = [(match.part, match.worn) for match in index.query(zone.feature, zone.kind, size, worn)]
+                    if sorted(found) != sorted(expected):
+                        errors.append(f'{zone.feature} {zone.kind} {size} nm（worn={worn}）：{sorted(found)} != {sorted(expected)}')
+    if not errors:
+        print(f'  已在 {len(zones)} 只工作量规中比较 1000 次查询')
+    return errors
+
+def verifyCalibration() -> list[str]:
+    """
+    差分检查：calibration.calibrateRows 的按块判定与逐只用 Decimal 判定一致（未安装 NumPy 时跳过）
+    """
+    try:
+        from calibration import CalibrationSummary, GaugeSpecs, calibrateRows
+    except ImportError:
+        print('  未安装 NumPy，跳过')
+        return []
+    import random
+    from decimal import Decimal
+    from batch import designRows
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from gaugedesign import GAUGE_FIELDS
+
+    rng = random.Random(2024)
+    parts = [
+        {'id': f'零件{i}', 'fit': f'Ø{rng.randint(3, 200)}{rng.choice(["h6", "h7", "f7", "js7", "k6", "H7", "H9", "F8", "M7"])}'}
+        for i in range(300)
+    ]
+    parts.append({'id': '出错', 'fit': 'Ø20x7'})
+    records = {record['id']: record for record in designRows(parts, FixedPointGaugeDesignEngine())}
+    specs = GaugeSpecs(records.values())
+
+    def expected(row: dict) -> str:
+        record = records.get(row['id'])
+        if record is None or record.get('error') or row['kind'] not in GAUGE_FIELDS or not record.get(f'{row["kind"]}NorminalSize'):
+            return 'unmatched'
+        size = Decimal(row['size'])
+        if size.copy_abs() >= 2500:
+            return 'unmatched'
+        norminalSize = Decimal(record[f'{row["kind"]}NorminalSize'])
+        lower = norminalSize + Decimal(record[f'{row["kind"]}LowerDeviation'])
+        upper = norminalSize + Decimal(record[f'{row["kind"]}UpperDeviation'])
+        if lower <= size <= upper:
+            return 'inTolerance'
+        if row['kind'] != 'goGauge':
+            return 'outOfTolerance'
+        wearLimit = Decimal(record['goGaugeWearLimit'])
+        if record['feature'] == 'shaft' and size > upper:
+            return 'inWearAllowance' if size <= wearLimit else 'wornOut'
+        if record['feature'] == 'hole' and size < lower:
+            return 'inWearAllowance' if size >= wearLimit else 'wornOut'
+        return 'outOfTolerance'
+
+    rows = []
+    for i in range(20000):
+        part = rng.choice(parts)['id'] if rng.random() < 0.97 else '不存在'
+        kind = rng.choice(GAUGE_FIELDS) if rng.random() < 0.99 else 'xx'
+        record = records[part] if part in records else records['零件0']
+        center = Decimal(record.get('goGaugeNorminalSize') or '20')
+        if kind in GAUGE_FIELDS and record.get(f'{kind}NorminalSize'):
+            center = Decimal(record[f'{kind}NorminalSize'])
+        rows.append({'gauge': f'G{i}', 'id': part, 'kind': kind, 'size': str(center + Decimal(rng.randint(-12000, 12000)) / 1000000)})
+    # 超出 int64 或 Decimal 指数范围的实测尺寸记为 unmatched，不中断整块
+    for i, size in enumerate(('1e30', '-1e30', '1e1000000', '2500')):
+        rows.insert(rng.randrange(len(rows)), {'gauge': f'GX{i}', 'id': '零件0', 'kind': 'goGauge', 'size': size})
+
+    errors = []
+    summary = CalibrationSummary()
+    counts = {}
+    for row, result in zip(rows, calibrateRows(rows, specs, summary=summary, chunkSize=1000)):
+        status = expected(row)
+        counts[status] = counts.get(status, 0) + 1
+        if result['status'] != status:
+            errors.append(f'{row}：{result["status"]} != {status}')
+        if result['gauge'] != row['gauge']:
+            errors.append(f'{row}：输出顺序不正确')
+    totals = list(summary.records())[-1]
+    if totals['total'] != len(rows) or any(totals[status] != count for status, count in counts.items()):
+        errors.append(f'汇总不正确：{totals} != {counts}')
+    if not errors:
+        print(f'  已比较 {len(rows)} 只量规：{counts}')
+    return errors[:20]
+
+def verifyWearTrend() -> list[str]:
+    """
+    磨损趋势：分几次、乱序并重复导入读数后，在线更新的直线与用全部历史一次拟合的结果一致，校准日期符合规则
+    """
+    import math
+    import random
+    import statistics
+    from datetime import date, timedelta
+    from batch import designRows
+    from fixedpoint import FixedPointGaugeDesignEngine
+    from sharing import gaugeZones
+    from weartrend import SECONDS_PER_DAY, WearState, WearTrend
+
+    rng = random.Random(2031)
+    parts = [{'id': f'零件{i}', 'fit': f'Ø{rng.randint(3, 200)}{rng.choice(["h7", "f7", "H7", "H8"])}'} for i in range(200)]
+    zones = gaugeZones(designRows(parts, FixedPointGaugeDesignEngine()))
+    goZones = {zone.part: zone for zone in zones if zone.kind == 'goGauge'}
+    readings = []
+    for part, zone in goZones.items():
+        direction = 1 if zone.feature == 'shaft' else -1
+        start = (zone.lowerLimit + zone.upperLimit) // 2
+        rate = rng.choice([0, 2, 10, 40])
+        for day in rng.sample(range(0, 720, 7), rng.randint(1, 12)):
+            size = start + direction * rate * day + rng.randint(-300, 300)
+            readings.append({'gauge': f'G-{part}', 'id': part, 'kind': 'T', 'size': f'{size / 1000000:.6f}', 'date': (date(2025, 1, 1) + timedelta(days=day)).isoformat()})
+    rng.shuffle(readings)
+    errors = []
+    with WearState(':memory:') as state:
+        third = len(readings) // 3
+        for batch in (readings[:third], readings[third:2 * third], readings[third:]):
+            state.update(batch, zones)
+        summary = state.update(readings[:50], zones)
+        if summary.added or summary.duplicate != 50:
+            errors.append(f'重复读数：新增 {summary.added}，重复 {summary.duplicate}')
+        # 日期或尺寸超出范围的读数只记为出错行，不中断更新，之后的计划仍可计算
+        part = next(iter(goZones))
+        bad = [
+            {'gauge': f'G-{part}', 'id': part, 'kind': 'T', 'size': '10', 'date': '9999-12-31'},
+            {'gauge': f'G-{part}', 'id': part, 'kind': 'T', 'size': '1e30', 'date': '2025-01-02'},
+        ]
+        summary = state.update(bad, zones)
+        if summary.added or len(summary.errors) != len(bad):
+            errors.append(f'超出范围的读数：新增 {summary.added}，出错 {summary.errors}')
+        list(state.schedule(maxInterval=10 ** 9))
+        asOf = date(2027, 1, 1)
+        for record in state.schedule(asOf, maxInterval=365, lead=30):
+            history = state.history(record['gauge'])
+            zone = goZones[record['id']]
+            days = [time / SECONDS_PER_DAY for time, _ in history]
+            sizes = [size for _, size in history]
+            if record['readings'] != len(history):
+                errors.append(f'{record["gauge"]}：读数 {record["readings"]} != {len(history)}')
+            trend = WearTrend()
+            for t, y in zip(days, sizes):
+                trend.add(t, y)
+            lastDay = max(days)
+            due = lastDay + 365
+            if len(set(days)) >= 2:
+                slope, intercept = statistics.linear_regression(days, sizes)
+                if not math.isclose(trend.slope, slope, rel_tol=1e-6, abs_tol=1e-6):
+                    errors.append(f'{record["gauge"]}：斜率 {trend.slope} != {slope}')
+                direction = 1 if zone.feature == 'shaft' else -1
+                if slope * direction > 0:
+                    predicted = (zone.wearLimit - intercept) / slope
+                    due = min(due, max(predicted - 30, lastDay))
+            if sizes[days.index(lastDay)] * (1 if zone.feature == 'shaft' else -1) > zone.wearLimit * (1 if zone.feature == 'shaft' else -1):
+                expected = ('wornOut', date(1970, 1, 1) + timedelta(days=math.floor(lastDay)))
+            else:
+                dueDate = date(1970, 1, 1) + timedelta(days=math.floor(due))
+                expected = ('due' if dueDate <= asOf else 'scheduled', dueDate)
+            # 浮点误差可能使日期差一天
+            actual = (record['status'], date.fromisoformat(record['dueDate']))
+            if actual[0] != expected[0] or abs((actual[1] - expected[1]).days) > 1:
+                errors.append(f'{record["gauge"]}：{actual} != {expected}')
+    if not errors:
+        print(f'  已比较 {len(goZones)} 只通规的 {len(readings)} 条读数')
+    return errors[:20]
+
+def verifyWorksheet() -> list[str]:
+    """
+    界面零件表：粘贴的表格解析正确，后台线程分块计算、中途放弃后重新提交的结果与 batch.designRow 相同（不需要显示器）
+    """
+    import random
+    import time
+    from batch import designRow
+    from gaugedesign import GaugeDesign, GaugeDesignEngine
+    from worksheet import WorksheetCalculator, parseTable
+
+    errors = []
+    rows = parseTable('零件编号\t特征\t名义尺寸\t上偏差\t下偏差\n"A\n1"\t轴\t20\t0\t-0.021\n\t\t\t\t\nB\t孔\t30\t0.033\t0\n')
+    if rows != [
+        {'id': 'A\n1', 'feature': 'shaft', 'norminalSize': '20', 'upperDeviation': '0', 'lowerDeviation': '-0.021'},
+        {'id': 'B', 'feature': 'hole', 'norminalSize': '30', 'upperDeviation': '0.033', 'lowerDeviation': '0'},
+    ]:
+        errors.append(f'带表头的表格解析不正确：{rows}')
+    rows = parseTable('C\t\t25\t\t\tg6')
+    if rows != [{'id': 'C', 'feature': '', 'norminalSize': '25', 'upperDeviation': '', 'lowerDeviation': '', 'fit': 'g6'}]:
+        errors.append(f'无表头的表格解析不正确：{rows}')
+
+    rng = random.Random(25)
+    rows = []
+    for i in range(3000):
+        if i % 4 == 0:
+            rows.append({'id': f'P{i}', 'norminalSize': str(rng.randint(1, 500)), 'fit': rng.choice(['h7', 'H8', 'f7', 'js6', 'x9'])})
+        else:
+            rows.append({'id': f'P{i}', 'feature': rng.choice(['shaft', 'hole', ' shaft', 'hole ']), 'norminalSize': str(rng.randint(1, 500)), 'upperDeviation': f'0.0{rng.randint(0, 9)}', 'lowerDeviation': f'-0.0{rng.randint(0, 9)}'})
+    calculator = WorksheetCalculator(GaugeDesignEngine(), chunkSize=100)
+    results = [None] * len(rows)
+    calculator.submit(0, rows[:1000])
+    calculator.reset()
+    calculator.submit(0, rows[:1500])
+    calculator.submit(1500, rows[1500:])
+    deadline = time.monotonic() + 60
+    while calculator.pending and time.monotonic() < deadline:
+        for start, chunk in calculator.poll():
+            results[start:start + len(chunk)] = chunk
+        time.sleep(0.01)
+    if calculator.pending:
+        errors.append(f'后台计算超时，尚有 {calculator.pending} 行')
+    engine = GaugeDesignEngine()
+    for row, result in zip(rows, results):
+        expected = designRow(engine, row)
+        actual = {'id': row['id'], **result.asRecord()} if isinstance(result, GaugeDesign) else {'error': result}
+        if ('error' in expected) != ('error' in actual) or ('error' not in expected and actual != expected):
+            errors.append(f'{row}：{actual} != {expected}')
+    if not errors:
+        print(f'  已比较 {len(rows)} 行')
+    return errors[:20]
+
+CHECKS = (
+    ('查询表', verifyQueryTables),
+    ('整数计算与 Decimal 计算一致', verifyFixedPoint),
+    ('NumPy 批量计算与整数计算一致', verifyVectorized),
+    ('Decimal 上下文与多线程', verifyThreadSafety),
+    ('HTTP 计算服务', verifyServer),
+    ('磁盘结果缓存', verifyResultCache),
+    ('设计图集', verifyAtlas),
+    ('ISO 286 公差带代号', verifyFits),
+    ('尺寸与公差带扫描', verifySweep),
+    ('量规数据表', verifyReports),
+    ('增量计算', verifyIncremental),
+    ('量规合并', verifySharing),
+    ('量规反查索引', verifyGaugeIndex),
+    ('量规校准验收', verifyCalibration),
+    ('通规磨损趋势', verifyWearTrend),
+    ('界面零件表', verifyWorksheet),
+)
+
+def main() -> int:
+    failed = False
+    for name, check in CHECKS:
+        errors = check()
+        print(f'{name}：{"通过" if not errors else "不通过"}')
+        for error in errors:
+            print(f'  {error}')
+        failed = failed or bool(errors)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+通规磨损趋势与重新校准计划。
+
+每只通规保存历次实测尺寸，并在线维护实测尺寸对时间的最小二乘直线（Welford 式的均值和协方差更新，
+每条新读数 O(1)，不需要重读历史），由直线外推实测尺寸到达磨损极限的日期，据此给出下次校准日期：
+    dueDate = min(预计到达磨损极限的日期 - lead, 最近一次测量 + maxInterval)
+读数少于 2 次、各次在同一时刻、或尺寸未向磨损方向变化时只按 maxInterval 排期。
+塞规（孔）磨损后变小，卡规、环规（轴）磨损后变大；磨损极限取自零件目录的计算结果（goGaugeWearLimit），
+目录改动后下次更新时随之改变。
+
+状态保存在 SQLite 文件中（WAL，每次更新一次提交）：gauges 表每只量规一行保存回归的累计量，
+readings 表保存历史读数；同一量规同一时刻的读数只记一次，重复导入同一测量文件不会改变结果。
+"""
+from fixedpoint import fmtNm, parseMeasuredNm
+from gaugedesign import KIND_ALIASES
+
+import math
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS gauges (
+    gauge TEXT PRIMARY KEY,
+    part TEXT NOT NULL,
+    direction INTEGER NOT NULL, -- 磨损方向：轴 +1，孔 -1
+    wearLimit INTEGER NOT NULL, -- nm
+    n INTEGER NOT NULL,
+    meanT REAL NOT NULL, -- 测量时刻的均值，单位：天（自 1970-01-01 UTC）
+    meanY REAL NOT NULL, -- 实测尺寸的均值，单位：nm
+    cTT REAL NOT NULL, -- 时刻的离差平方和
+    cTY REAL NOT NULL, -- 时刻与尺寸的离差积和
+    lastTime INTEGER NOT NULL, -- 最近一次测量，单位：s
+    lastSize INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS readings (
+    gauge TEXT NOT NULL,
+    time INTEGER NOT NULL, -- s（自 1970-01-01 UTC）
+    size INTEGER NOT NULL, -- nm
+    PRIMARY KEY (gauge, time)
+) WITHOUT ROWID;
+'''
+
+# 测量文件中各项的默认列名；gauge 为空时以零件编号作为量规编号（每个零件一只通规）
+DEFAULT_COLUMNS = {'gauge': 'gauge', 'id': 'id', 'kind': 'kind', 'size': 'size', 'date': 'date'}
+
+# 校准计划的列：wearRate 为向磨损方向的磨损速度（mm/年），remaining 为按趋势线最近一次测量时距磨损极限的余量（mm）
+SCHEDULE_FIELDS = ('gauge', 'id', 'readings', 'lastDate', 'lastSize', 'wearLimit', 'wearRate', 'remaining', 'predictedDate', 'dueDate', 'status')
+
+# wornOut：最近一次实测已超过磨损极限；due：dueDate 不晚于计划日期；scheduled：尚未到期
+SCHEDULE_STATUSES = ('wornOut', 'due', 'scheduled')
+
+SECONDS_PER_DAY = 86400
+DAYS_PER_YEAR = 365.25
+
+DEFAULT_MAX_INTERVAL_DAYS = 365
+# 只给出 100 年以内的预计日期
+MAX_PREDICTION_DAYS = 100 * DAYS_PER_YEAR
+DEFAULT_LEAD_DAYS = 30
+
+EPOCH = date(1970, 1, 1)
+MIN_DAY = (date.min - EPOCH).days
+MAX_DAY = (date.max - EPOCH).days
+# 可以导入的测量日期范围，超出的多为录入错误
+MIN_MEASUREMENT_DATE = date(1900, 1, 1)
+MAX_MEASUREMENT_DATE = date(2999, 12, 31)
+
+@dataclass
+class WearTrend:
+    """
+    一只通规的实测尺寸对时间的在线最小二乘直线，时间单位：天，尺寸单位：nm
+    """
+    n: int = 0
+    meanT: float = 0.0
+    meanY: float = 0.0
+    cTT: float = 0.0
+    cTY: float = 0.0
+
+    def add(self, t: float, y: float):
+        self.n += 1
+        dt = t - self.meanT
+        self.meanT += dt / self.n
+        self.meanY += (y - self.meanY) / self.n
+        self.cTT += dt * (t - self.meanT)
+        self.cTY += dt * (y - self.meanY)
+
+    @property
+    def slope(self) -> float | None:
+        """
+        Returns:
+            float | None: 尺寸变化速度（nm/天），读数不足以确定直线时为 None
+        """
+        if self.n < 2 or self.cTT <= 0:
+            return None
+        return self.cTY / self.cTT
+
+    def predict(self, t: float) -> float:
+        slope = self.slope
+        return self.meanY if slope is None else self.meanY + slope * (t - self.meanT)
+
+def parseTime(text) -> int | None:
+    """
+    解析测量时刻：ISO 8601 日期或日期时间，不带时区时按 UTC
+
+    Returns:
+        int | None: 自 1970-01-01 UTC 的秒数，无法解析或不在 MIN_MEASUREMENT_DATE 至 MAX_MEASUREMENT_DATE 之间时为 None
+    """
+    text = '' if text is None else str(text).strip()
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if not MIN_MEASUREMENT_DATE <= value.date() <= MAX_MEASUREMENT_DATE:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return math.floor(value.timestamp())
+
+def _date(days: float) -> date:
+    # 外推日期或 maxInterval 很大时限制在 date 的范围内
+    days = min(max(math.floor(days), MIN_DAY), MAX_DAY)
+    return EPOCH + timedelta(days=days)
+
+@dataclass
+class WearUpdateSummary:
+    total: int = 0
+    # 新记录的读数、已有的重复读数、不是通规而跳过的读数
+    added: int = 0
+    duplicate: int = 0
+    skipped: int = 0
+    # 新登记的量规、本次有新读数的量规
+    newGauges: int = 0
+    updatedGauges: int = 0
+    # 无法使用的读数：(行号, 原因)
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+class WearState:
+    """
+    全部通规的磨损趋势状态。同一时间只应有一个进程更新同一状态文件
+    """
+    def __init__(self, path: str, timeout: float = 5.0):
+        """
+        Args:
+            path (str): 状态文件路径，不存在时新建；':memory:' 表示不保存
+        """
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT count(*) FROM gauges').fetchone()[0]
+
+    def update(self, rows: Iterable[dict], zones: Iterable, columns: dict[str, str] | None = None) -> WearUpdateSummary:
+        """
+        记录新的读数并更新各量规的趋势，一次提交；同时按目录刷新已登记量规的磨损极限
+
+        Args:
+            rows (Iterable[dict]): 测量行，如 batch.readRows() 读出的 CMM 导出文件；没有量规种类列时全部视为通规
+            zones (Iterable[sharing.GaugeZone]): 零件目录的 sharing.gaugeZones()，只用其中的通规
+            columns (dict | None): 各项的列名，默认 DEFAULT_COLUMNS
+
+        Returns:
+            WearUpdateSummary: 各类读数和量规的数目
+        """
+        columns = DEFAULT_COLUMNS | (columns or {})
+        limits = {
+            zone.part: (1 if zone.feature == 'shaft' else -1, zone.wearLimit)
+            for zone in zones if zone.kind == 'goGauge'
+        }
+        summary = WearUpdateSummary()
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            # 全部量规的累计量读入内存（每只一行，5 万只约 10 MB），更新后只写回有变化的量规
+            gauges = {
+                gauge: [part, direction, wearLimit, WearTrend(n, meanT, meanY, cTT, cTY), lastTime, lastSize]
+                for gauge, part, direction, wearLimit, n, meanT, meanY, cTT, cTY, lastTime, lastSize
+                in connection.execute('SELECT * FROM gauges')
+            }
+            changed, measured = set(), set()
+            for gauge, state in gauges.items():
+                if state[0] in limits and (state[1], state[2]) != limits[state[0]]:
+                    state[1], state[2] = limits[state[0]]
+                    changed.add(gauge)
+
+            for rowNo, row in enumerate(rows, 1):
+                summary.total += 1
+                values = {name: '' if row.get(column) is None else str(row[column]).strip() for name, column in columns.items()}
+                if values['kind'] and KIND_ALIASES.get(values['kind'].lower()) != 'goGauge':
+                    summary.skipped += 1
+                    continue
+                time = parseTime(values['date'])
+                gauge = values['gauge'] or values['id']
+                if time is None:
+                    summary.errors.append((rowNo, f'测量日期不正确或超出范围：{values["date"]}' if values['date'] else '缺少测量日期'))
+                    continue
+                try:
+                    size = parseMeasuredNm(values['size'])
+                except ValueError as e:
+                    summary.errors.append((rowNo, str(e)))
+                    continue
+                if size is None:
+                    summary.errors.append((rowNo, f'实测尺寸不是数字：{values["size"]}' if values['size'] else '缺少实测尺寸'))
+                    continue
+                if not gauge:
+                    summary.errors.append((rowNo, '缺少量规编号和零件编号'))
+                    continue
+                state = gauges.get(gauge)
+                if state is None:
+                    if values['id'] not in limits:
+                        summary.errors.append((rowNo, f'目录中没有零件：{values["id"]}' if values['id'] else '缺少零件编号'))
+                        continue
+                    state = gauges[gauge] = [values['id'], *limits[values['id']], WearTrend(), time, size]
+                    summary.newGauges += 1
+                cursor = connection.execute('INSERT OR IGNORE INTO readings (gauge, time, size) VALUES (?, ?, ?)', (gauge, time, size))
+                if cursor.rowcount == 0:
+                    summary.duplicate += 1
+                    continue
+                summary.added += 1
+                state[3].add(time / SECONDS_PER_DAY, size)
+                if time >= state[4]:
+                    state[4], state[5] = time, size
+                changed.add(gauge)
+                measured.add(gauge)
+
+            updates = [(gauge, *gauges[gauge]) for gauge in changed]
+            connection.executemany(
+                'INSERT OR REPLACE INTO gauges VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    (gauge, part, direction, wearLimit, trend.n, trend.meanT, trend.meanY, trend.cTT, trend.cTY, lastTime, lastSize)
+                    for gauge, part, direction, wearLimit, trend, lastTime, lastSize in updates
+                )
+            )
+            summary.updatedGauges = len(measured)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return summary
+
+    def history(self, gauge: str) -> list[tuple[int, int]]:
+        """
+        Returns:
+            list[tuple[int, int]]: 一只量规按时间排序的 (时刻 s, 实测尺寸 nm)
+        """
+        return self._connection.execute('SELECT time, size FROM readings WHERE gauge = ? ORDER BY time', (gauge,)).fetchall()
+
+    def schedule(self, asOf: date | None = None, maxInterval: int = DEFAULT_MAX_INTERVAL_DAYS, lead: int = DEFAULT_LEAD_DAYS) -> Iterator[dict]:
+        """
+        校准计划，按 dueDate、量规编号排序
+
+        Args:
+            asOf (date | None): 计划日期，dueDate 不晚于它的为 due；默认今天（UTC）
+            maxInterval (int): 最长校准间隔，单位：天
+            lead (int): 在预计到达磨损极限之前多少天校准
+
+        Yields:
+            dict: 每只量规一行，列见 SCHEDULE_FIELDS
+        """
+        if asOf is None:
+            asOf = datetime.now(timezone.utc).date()
+        entries = []
+        for gauge, part, direction, wearLimit, n, meanT, meanY, cTT, cTY, lastTime, lastSize in self._connection.execute('SELECT * FROM gauges'):
+            trend = WearTrend(n, meanT, meanY, cTT, cTY)
+            lastDay = lastTime / SECONDS_PER_DAY
+            due = lastDay + maxInterval
+            slope = trend.slope
+            rate = None if slope is None else slope * direction
+            predicted = None
+            if rate is not None and rate > 0:
+                predicted = trend.meanT + (wearLimit - trend.meanY) / slope
+                due = min(due, max(predicted - lead, lastDay))
+                if abs(predicted - lastDay) > MAX_PREDICTION_DAYS:
+                    # 磨损极慢，外推已无意义
+                    predicted = None
+            remaining = (wearLimit - trend.predict(lastDay)) * direction
+            if (lastSize - wearLimit) * direction > 0:
+                status, due = 'wornOut', lastDay
+            else:
+                status = 'due' if _date(due) <= asOf else 'scheduled'
+            entries.append((_date(due), gauge, {
+                'gauge': gauge,
+                'id': part,
+                'readings': n,
+                'lastDate': _date(lastDay).isoformat(),
+                'lastSize': fmtNm(lastSize),
+                'wearLimit': fmtNm(wearLimit),
+                'wearRate': '' if rate is None else fmtNm(round(rate * DAYS_PER_YEAR)),
+                'remaining': fmtNm(round(remaining)),
+                'predictedDate': '' if predicted is None else _date(predicted).isoformat(),
+                'dueDate': _date(due).isoformat(),
+                'status': status,
+            }))
+        entries.sort(key=lambda entry: entry[:2])
+        for entry in entries:
+            yield entry[2]
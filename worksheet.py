@@ -0,0 +1,452 @@
+"""
+界面的零件表：一次设计整个装配的全部零件。
+
+从 Excel 粘贴（制表符分隔）或打开与批量计算相同的 CSV/JSONL 文件，行数可达数千。计算在后台线程中按块进行，
+结果放入队列，由 Tk 主循环用 after() 定时取回，粘贴大量行时窗口不会卡住。
+
+Treeview 只有可见的几行，滚动时改写这几行的内容，而不是为每个零件建立一项；
+计算结果以 GaugeDesign 保存，只在显示时格式化可见的行。
+"""
+from gaugedesign import GaugeDesign, GaugeDesignEngine, GaugeDesignError
+
+import csv
+import io
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Iterable
+
+# 显示的列：(字段, 标题, 宽度)；'row' 为行号，'fit' 为输入的公差带代号，其余同 GaugeDesign.asRecord()
+COLUMNS = (
+    ('row', '#', 44),
+    ('id', '零件编号', 80),
+    ('feature', '特征', 40),
+    ('fit', '公差带代号', 72),
+    ('norminalSize', '名义尺寸', 64),
+    ('upperDeviation', '上偏差', 64),
+    ('lowerDeviation', '下偏差', 64),
+    ('it', '公差等级', 56),
+    ('goGaugeNorminalSize', 'T 名义尺寸', 72),
+    ('goGaugeUpperDeviation', 'T 上偏差', 64),
+    ('goGaugeLowerDeviation', 'T 下偏差', 64),
+    ('goGaugeWearLimit', 'T 磨损极限', 72),
+    ('noGoGaugeNorminalSize', 'Z 名义尺寸', 72),
+    ('noGoGaugeUpperDeviation', 'Z 上偏差', 64),
+    ('noGoGaugeLowerDeviation', 'Z 下偏差', 64),
+    ('error', '信息', 240),
+)
+
+FEATURE_TITLES = {'shaft': '轴', 'hole': '孔'}
+
+# 粘贴时表头的写法：字段名（不区分大小写）或中文标题；没有表头时按 batch.INPUT_FIELDS 的顺序
+HEADER_ALIASES = {
+    'id': 'id', '零件编号': 'id', '编号': 'id',
+    'feature': 'feature', '特征': 'feature',
+    'norminalsize': 'norminalSize', 'nominalsize': 'norminalSize', '名义尺寸': 'norminalSize',
+    'upperdeviation': 'upperDeviation', '上偏差': 'upperDeviation',
+    'lowerdeviation': 'lowerDeviation', '下偏差': 'lowerDeviation',
+    'fit': 'fit', '公差带代号': 'fit', '公差带': 'fit',
+}
+FEATURE_ALIASES = {'轴': 'shaft', '孔': 'hole'}
+
+# 可见行数，与窗口高度对应
+VISIBLE_ROWS = 14
+# 后台计算每块的行数，每块完成后交给主循环一次
+CHUNK_SIZE = 200
+# 主循环取回结果的间隔，单位：ms
+POLL_INTERVAL_MS = 50
+
+def parseTable(text: str) -> list[dict]:
+    """
+    解析从 Excel 复制的表格（制表符分隔，单元格内有换行时带引号），空行忽略
+
+    Returns:
+        list[dict]: 输入行，字段同 batch.INPUT_FIELDS
+    """
+    from batch import INPUT_FIELDS
+
+    lines = [cells for cells in csv.reader(io.StringIO(text, newline=''), delimiter='\t') if any(cell.strip() for cell in cells)]
+    if not lines:
+        return []
+    fields = INPUT_FIELDS
+    header = [HEADER_ALIASES.get(cell.strip().lower()) for cell in lines[0]]
+    if any(header):
+        fields = header
+        lines = lines[1:]
+    rows = []
+    for cells in lines:
+        row = {field: cell.strip() for field, cell in zip(fields, cells) if field}
+        if 'feature' in row:
+            row['feature'] = FEATURE_ALIASES.get(row['feature'], row['feature'])
+        rows.append(row)
+    return rows
+
+def designEntry(engine: GaugeDesignEngine, row: dict) -> GaugeDesign | str:
+    """
+    计算一行输入，与 batch.designRow() 相同，但不格式化
+
+    Returns:
+        GaugeDesign | str: 计算结果，出错时为原因
+    """
+    from batch import applyFitCode
+
+    if row.get('error'):
+        return str(row['error'])
+    try:
+        row = applyFitCode(row)
+        feature, norminalSize, upperDeviation, lowerDeviation = (
+            '' if row.get(name) is None else str(row[name]) for name in ('feature', 'norminalSize', 'upperDeviation', 'lowerDeviation')
+        )
+        # 与 batch.designRow() 一样去掉零件特征两端的空白
+        return engine.designFromText(feature.strip(), norminalSize, upperDeviation, lowerDeviation)
+    except GaugeDesignError as e:
+        return str(e)
+
+class WorksheetCalculator:
+    """
+    后台计算线程。submit()、poll()、reset() 只应在主线程中调用
+    """
+    def __init__(self, engine: GaugeDesignEngine, chunkSize: int = CHUNK_SIZE):
+        self.engine = engine
+        self.chunkSize = chunkSize
+        # reset() 后递增，旧的任务和结果都丢弃
+        self.generation = 0
+        # 已提交、尚未取回结果的行数
+        self.pending = 0
+        self._jobs = queue.SimpleQueue()
+        self._results = queue.SimpleQueue()
+        self._thread = None
+
+    def submit(self, start: int, rows: list[dict]):
+        """
+        提交计算 rows，其结果依次对应零件表的第 start 行起
+        """
+        if not rows:
+            return
+        self.pending += len(rows)
+        self._jobs.put((self.generation, start, rows))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='worksheet', daemon=True)
+            self._thread.start()
+
+    def reset(self):
+        """
+        放弃尚未完成的计算（零件表清空或删除行后行号已变化）
+        """
+        self.generation += 1
+        self.pending = 0
+
+    def poll(self) -> list[tuple[int, list]]:
+        """
+        Returns:
+            list[tuple[int, list]]: 已完成的 (起始行, 结果) 块，不等待
+        """
+        done = []
+        while True:
+            try:
+                generation, start, results = self._results.get_nowait()
+            except queue.Empty:
+                return done
+            if generation == self.generation:
+                self.pending -= len(results)
+                done.append((start, results))
+
+    def _run(self):
+        while True:
+            generation, start, rows = self._jobs.get()
+            for offset in range(0, len(rows), self.chunkSize):
+                if generation != self.generation:
+                    break
+                results = []
+                for row in rows[offset:offset + self.chunkSize]:
+                    try:
+                        results.append(designEntry(self.engine, row))
+                    except Exception as e:
+                        results.append(f'计算出错：{e!r}')
+                self._results.put((generation, start + offset, results))
+
+def clampOffset(offset: int, total: int, visible: int = VISIBLE_ROWS) -> int:
+    """
+    滚动位置：第一可见行的行号，不超过最后一页
+    """
+    return max(0, min(offset, total - visible))
+
+class WorksheetFrame(tk.Frame):
+    """
+    零件表页
+    """
+    def __init__(self, master, engine: GaugeDesignEngine | None = None, onOpenRow: Callable[[dict], None] | None = None):
+        """
+        Args:
+            engine (GaugeDesignEngine | None): 后台线程使用的计算引擎，默认新建一个
+            onOpenRow (Callable | None): 双击一行时以该行的 asRecord()（出错时为输入行）调用，用于在单个零件页中打开
+        """
+        super().__init__(master, width=1, height=1)
+        # 不按 Treeview 各列的总宽度撑大窗口，大小由单个零件页决定，多出的列横向滚动
+        self.grid_propagate(False)
+        self.onOpenRow = onOpenRow
+        self.calculator = WorksheetCalculator(engine if engine is not None else GaugeDesignEngine())
+        self.rows: list[dict] = []
+        self.results: list[GaugeDesign | str | None] = []
+        self.offset = 0
+        # 选中的行号（不是 Treeview 项），滚动后仍然保留
+        self.selectedRow = None
+        # 在 Treeview 中的项数，其余的已移出
+        self._attached = VISIBLE_ROWS
+        self._pollPending = None
+        self.createWidgets()
+
+    def createWidgets(self):
+        toolbar = tk.Frame(self)
+        toolbar.grid(row=0, column=0, columnspan=2, sticky=tk.EW)
+        tk.Button(toolbar, text='粘贴', command=self.pasteRows).pack(side=tk.LEFT)
+        tk.Button(toolbar, text='打开…', command=self.openRows).pack(side=tk.LEFT)
+        tk.Button(toolbar, text='导出…', command=self.exportRows).pack(side=tk.LEFT)
+        tk.Button(toolbar, text='删除行', command=self.deleteSelectedRow).pack(side=tk.LEFT)
+        tk.Button(toolbar, text='清空', command=self.clearRows).pack(side=tk.LEFT)
+        self.statusVar = tk.StringVar(value='从 Excel 复制零件表后按 Ctrl+V 粘贴，双击一行在单个零件页中打开')
+        tk.Label(toolbar, textvariable=self.statusVar, anchor=tk.W).pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.tree = ttk.Treeview(self, columns=[name for name, _, _ in COLUMNS], show='headings', height=VISIBLE_ROWS, selectmode='browse')
+        for name, title, width in COLUMNS:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, minwidth=width, stretch=False, anchor=tk.W if name in ('id', 'error') else tk.E)
+        # 固定的 VISIBLE_ROWS 项，iid 为在可见区中的位置
+        for slot in range(VISIBLE_ROWS):
+            self.tree.insert('', tk.END, iid=str(slot))
+        self.tree.grid(row=1, column=0, sticky=tk.NSEW)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.onScroll)
+        self.scrollbar.grid(row=1, column=1, sticky=tk.NS)
+        xScrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        xScrollbar.grid(row=2, column=0, sticky=tk.EW)
+        self.tree.configure(xscrollcommand=xScrollbar.set)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree.bind('<<TreeviewSelect>>', self.onSelect)
+        self.tree.bind('<Double-1>', self.onDoubleClick)
+        self.tree.bind('<<Paste>>', lambda event: self.pasteRows())
+        self.tree.bind('<Delete>', lambda event: self.deleteSelectedRow())
+        self.tree.bind('<MouseWheel>', lambda event: self.scrollBy(-1 if event.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda event: self.scrollBy(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda event: self.scrollBy(1, 'units'))
+        self.tree.bind('<Prior>', lambda event: self.scrollBy(-1, 'pages'))
+        self.tree.bind('<Next>', lambda event: self.scrollBy(1, 'pages'))
+        self.render()
+
+    def destroy(self):
+        if self._pollPending is not None:
+            self.after_cancel(self._pollPending)
+            self._pollPending = None
+        self.calculator.reset()
+        super().destroy()
+
+    def rowValues(self, index: int) -> tuple:
+        """
+        格式化一行的显示内容；计算完成前显示输入
+        """
+        row, result = self.rows[index], self.results[index]
+        if isinstance(result, GaugeDesign):
+            record = result.asRecord()
+            record['error'] = ''
+        else:
+            record = {name: '' if row.get(name) is None else str(row[name]) for name in ('id', 'feature', 'norminalSize', 'upperDeviation', 'lowerDeviation')}
+            record['error'] = '计算中…' if result is None else result
+        record['id'] = '' if row.get('id') is None else str(row['id'])
+        record['fit'] = '' if row.get('fit') is None else str(row['fit'])
+        record['feature'] = FEATURE_TITLES.get(record.get('feature'), record.get('feature', ''))
+        record['row'] = index + 1
+        return tuple(record.get(name, '') for name, _, _ in COLUMNS)
+
+    def render(self):
+        """
+        只改写可见的 VISIBLE_ROWS 项
+        """
+        total = len(self.rows)
+        self.offset = clampOffset(self.offset, total)
+        shown = min(VISIBLE_ROWS, total - self.offset)
+        selected = ()
+        for slot in range(VISIBLE_ROWS):
+            iid = str(slot)
+            if slot < shown:
+                if slot >= self._attached:
+                    self.tree.move(iid, '', slot)
+                self.tree.item(iid, values=self.rowValues(self.offset + slot))
+                if self.offset + slot == self.selectedRow:
+                    selected = (iid,)
+            elif slot < self._attached:
+                # 行数不足一页时多余的项先移出，不显示空行
+                self.tree.detach(iid)
+        self._attached = shown
+        if self.tree.selection() != selected:
+            self.tree.selection_set(selected)
+        if total <= VISIBLE_ROWS:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + VISIBLE_ROWS) / total)
+
+    def onScroll(self, action, value, unit=None):
+        """
+        纵向滚动条的 command：('moveto', 比例) 或 ('scroll', 数目, 'units' / 'pages')
+        """
+        if action == 'moveto':
+            self.offset = round(float(value) * len(self.rows))
+            self.render()
+        elif action == 'scroll':
+            self.scrollBy(int(value), unit)
+
+    def scrollBy(self, count: int, unit: str):
+        self.offset += count * (VISIBLE_ROWS - 1 if unit == 'pages' else 3)
+        self.render()
+        return 'break'
+
+    def onSelect(self, event=None):
+        # 选中的行滚出可见区时 render() 会清除选择，此时保留 selectedRow
+        selection = self.tree.selection()
+        if selection:
+            self.selectedRow = self.offset + int(selection[0])
+
+    def onDoubleClick(self, event):
+        slot = self.tree.identify_row(event.y)
+        if not slot or self.onOpenRow is None:
+            return
+        index = self.offset + int(slot)
+        result = self.results[index]
+        self.onOpenRow(result.asRecord() if isinstance(result, GaugeDesign) else self.rows[index])
+
+    def addRows(self, rows: Iterable[dict]):
+        """
+        追加到零件表末尾并交给后台计算
+        """
+        rows = list(rows)
+        start = len(self.rows)
+        self.rows.extend(rows)
+        self.results.extend([None] * len(rows))
+        self.calculator.submit(start, rows)
+        self.schedulePoll()
+        self.render()
+        self.updateStatus()
+
+    def pasteRows(self):
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            self.statusVar.set('剪贴板中没有文本')
+            return 'break'
+        rows = parseTable(text)
+        if not rows:
+            self.statusVar.set('剪贴板中没有零件行')
+            return 'break'
+        self.addRows(rows)
+        return 'break'
+
+    def openRows(self):
+        """
+        追加 CSV/JSONL 零件目录（与批量计算的输入相同）
+        """
+        from tkinter import filedialog
+        from batch import detectFormat, readRows
+
+        path = filedialog.askopenfilename(
+            parent=self, title='选择零件目录', filetypes=[('CSV', '*.csv'), ('JSONL', '*.jsonl'), ('全部文件', '*')]
+        )
+        if not path:
+            return
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                rows = list(readRows(stream, detectFormat(path)))
+        except (OSError, UnicodeDecodeError) as e:
+            self.statusVar.set(f'打开失败：{e}')
+            return
+        self.addRows(rows)
+
+    def exportRows(self):
+        """
+        把零件表的计算结果导出为与批量计算输出相同的 CSV
+        """
+        from tkinter import filedialog
+        from batch import RecordWriter
+
+        if self.calculator.pending:
+            self.statusVar.set('正在计算，完成后再导出')
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, initialfile='零件表.csv', defaultextension='.csv', filetypes=[('CSV', '*.csv')]
+        )
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8-sig', newline='') as stream:
+                writer = RecordWriter(stream, 'csv')
+                for index, (row, result) in enumerate(zip(self.rows, self.results), 1):
+                    record = {'row': index, 'id': '' if row.get('id') is None else str(row['id'])}
+                    if isinstance(result, GaugeDesign):
+                        record.update(result.asRecord())
+                    else:
+                        record['error'] = result
+                    writer.write(record)
+        except OSError as e:
+            self.statusVar.set(f'导出失败：{e}')
+            return
+        self.statusVar.set(f'已导出 {len(self.rows)} 行：{path}')
+
+    def deleteSelectedRow(self):
+        if self.selectedRow is None:
+            return
+        del self.rows[self.selectedRow]
+        del self.results[self.selectedRow]
+        if self.selectedRow >= len(self.rows):
+            self.selectedRow = len(self.rows) - 1 if self.rows else None
+        if self.calculator.pending:
+            # 未完成的结果行号已变化，重新提交尚未计算的行
+            self.calculator.reset()
+            index = 0
+            while index < len(self.results):
+                if self.results[index] is not None:
+                    index += 1
+                    continue
+                end = index
+                while end < len(self.results) and self.results[end] is None:
+                    end += 1
+                self.calculator.submit(index, self.rows[index:end])
+                index = end
+        self.render()
+        self.updateStatus()
+
+    def clearRows(self):
+        self.calculator.reset()
+        self.rows.clear()
+        self.results.clear()
+        self.offset = 0
+        self.selectedRow = None
+        self.render()
+        self.updateStatus()
+
+    def schedulePoll(self):
+        if self._pollPending is None:
+            self._pollPending = self.after(POLL_INTERVAL_MS, self.pollResults)
+
+    def pollResults(self):
+        """
+        取回后台计算的结果，只在结果落在可见区时重绘
+        """
+        self._pollPending = None
+        visible = False
+        for start, results in self.calculator.poll():
+            self.results[start:start + len(results)] = results
+            visible = visible or (start < self.offset + VISIBLE_ROWS and start + len(results) > self.offset)
+        if visible:
+            self.render()
+        self.updateStatus()
+        if self.calculator.pending:
+            self.schedulePoll()
+
+    def updateStatus(self):
+        total = len(self.rows)
+        if self.calculator.pending:
+            self.statusVar.set(f'正在计算：{total - self.calculator.pending} / {total}')
+            return
+        failed = sum(1 for result in self.results if isinstance(result, str))
+        self.statusVar.set(f'共 {total} 行，{failed} 行出错')